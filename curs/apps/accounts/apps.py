@@ -5,3 +5,7 @@ class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.accounts"
     label = "accounts"
+
+    def ready(self):
+        # регистрируют обработчики user_logged_in / request_finished
+        from . import db_hygiene, identity  # noqa: F401
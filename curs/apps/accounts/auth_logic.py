@@ -2,21 +2,31 @@ from django.contrib.auth.backends import BaseBackend
 from django.contrib.auth.hashers import check_password
 from django.db import connection
 
+from .identity import IDENTITY_COLUMNS, IDENTITY_FROM, Identity
+
 
 class SQLAuthBackend(BaseBackend):
     def authenticate(self, request, login=None, password=None, **kwargs):
         with connection.cursor() as cur:
+            # пароль и контекст личности (профиль, архив) — одним запросом
             cur.execute(
-                "SELECT user_id, login, password_hash, role FROM users WHERE login = %s",
+                f"""
+                SELECT {IDENTITY_COLUMNS}, u.login, u.password_hash
+                {IDENTITY_FROM}
+                WHERE u.login = %s
+                """,
                 [login],
             )
             row = cur.fetchone()
             if not row:
                 return None
-            user_id, login, pw_hash, role = row
+            *ident_row, login, pw_hash = row
             if check_password(password, pw_hash):
                 # вернуть прокси-пользователя (User-like объект)
                 from .models import User
 
-                return User(user_id=user_id, login=login, role=role)
+                identity = Identity.from_row(ident_row)
+                user = User(user_id=identity.user_id, login=login, role=identity.role)
+                user._identity = identity  # подхватит обработчик user_logged_in
+                return user
         return None
@@ -0,0 +1,57 @@
+"""
+Гигиена постоянных подключений (CONN_MAX_AGE > 0).
+
+Соединение переживает запрос, поэтому всё, что запрос оставил на уровне
+сессии PostgreSQL (SET ROLE, app.current_user_id), обязано быть сброшено до
+того, как соединение достанется следующему пользователю. Если сброс не удался —
+соединение закрывается, а не переиспользуется.
+"""
+
+from django.core.signals import request_finished
+from django.db import connections
+from django.dispatch import receiver
+
+# DISCARD ALL не подходит: он сбрасывает и TimeZone, который Django выставляет
+# один раз при открытии соединения. Поэтому сбрасываем только наше состояние.
+RESET_SQL = "RESET ROLE; SELECT set_config('app.current_user_id', '', false)"
+
+_DIRTY_ATTR = "_db_role_dirty"
+
+
+def mark_dirty(conn):
+    """Вызывается после SET ROLE уровня сессии."""
+    setattr(conn, _DIRTY_ATTR, True)
+
+
+def is_dirty(conn) -> bool:
+    return getattr(conn, _DIRTY_ATTR, False)
+
+
+def reset_connection(conn) -> bool:
+    """
+    Возвращает соединение в исходное состояние.
+    True — соединение сброшено и годно к переиспользованию;
+    False — при сбросе была ошибка, соединение закрыто.
+    """
+    setattr(conn, _DIRTY_ATTR, False)
+    if conn.connection is None:
+        return True
+    try:
+        if conn.in_atomic_block:
+            # незавершённая транзакция — переиспользовать нельзя
+            raise RuntimeError("connection left inside atomic block")
+        if not conn.get_autocommit():
+            conn.rollback()
+        with conn.connection.cursor() as cur:
+            cur.execute(RESET_SQL)
+    except Exception:
+        conn.close()
+        return False
+    return True
+
+
+@receiver(request_finished)
+def _reset_dirty_connections(**kwargs):
+    for conn in connections.all(initialized_only=True):
+        if is_dirty(conn):
+            reset_connection(conn)
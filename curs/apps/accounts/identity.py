@@ -0,0 +1,121 @@
+"""
+Контекст личности пользователя: роль, id профиля (student/professor/admin)
+и признак архива. Резолвится одним запросом при входе, живёт в сессии и
+доступен во вьюхах как request.identity.
+"""
+
+import time
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in
+from django.db import connection
+from django.dispatch import receiver
+
+SESSION_KEY = "_identity"
+
+IDENTITY_COLUMNS = """
+    u.user_id, u.role, (u.archived_at IS NOT NULL) AS is_archived,
+    s.student_id, p.professor_id, a.admin_id
+"""
+IDENTITY_FROM = """
+    FROM users u
+    LEFT JOIN students   s ON s.user_id = u.user_id
+    LEFT JOIN professors p ON p.user_id = u.user_id
+    LEFT JOIN admins     a ON a.user_id = u.user_id
+"""
+
+
+@dataclass(frozen=True)
+class Identity:
+    user_id: int
+    role: str
+    is_archived: bool = False
+    student_id: int | None = None
+    professor_id: int | None = None
+    admin_id: int | None = None
+    resolved_at: float = 0.0
+
+    @property
+    def profile_id(self) -> int | None:
+        return {
+            "STUDENT": self.student_id,
+            "PROFESSOR": self.professor_id,
+            "ADMIN": self.admin_id,
+        }.get(self.role)
+
+    @classmethod
+    def from_row(cls, row) -> "Identity":
+        user_id, role, is_archived, student_id, professor_id, admin_id = row
+        return cls(
+            user_id=user_id,
+            role=role,
+            is_archived=bool(is_archived),
+            student_id=student_id,
+            professor_id=professor_id,
+            admin_id=admin_id,
+            resolved_at=time.time(),
+        )
+
+
+def resolve_identity(user_id: int) -> Identity | None:
+    """Один запрос вместо отдельных SELECT по students/professors."""
+    with connection.cursor() as cur:
+        cur.execute(
+            f"SELECT {IDENTITY_COLUMNS} {IDENTITY_FROM} WHERE u.user_id = %s",
+            [user_id],
+        )
+        row = cur.fetchone()
+        return Identity.from_row(row) if row else None
+
+
+def store_identity(request, identity: Identity | None):
+    if identity is None:
+        request.session.pop(SESSION_KEY, None)
+    else:
+        request.session[SESSION_KEY] = asdict(identity)
+
+
+def _is_fresh(identity: Identity, user) -> bool:
+    # Роль сверяем с request.user (он и так грузится AuthenticationMiddleware):
+    # смена роли в user_edit сразу сбрасывает закешированный контекст.
+    max_age = getattr(settings, "IDENTITY_MAX_AGE", 300)
+    return (
+        identity.user_id == user.pk
+        and identity.role == getattr(user, "role", None)
+        and time.time() - identity.resolved_at < max_age
+    )
+
+
+def get_identity(request) -> Identity | None:
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    raw = request.session.get(SESSION_KEY)
+    if raw:
+        try:
+            identity = Identity(**raw)
+        except TypeError:
+            identity = None
+        if identity and _is_fresh(identity, user):
+            return identity
+    identity = resolve_identity(user.pk)
+    store_identity(request, identity)
+    return identity
+
+
+def invalidate_identity(request, user_id: int):
+    """
+    Сбрасывает контекст после изменения роли/профиля.
+    Свою сессию чистим сразу, чужие пересоберутся по несовпадению роли или TTL.
+    """
+    if getattr(request.user, "pk", None) == user_id:
+        request.session.pop(SESSION_KEY, None)
+        request.identity = None
+
+
+@receiver(user_logged_in)
+def _identity_on_login(sender, request, user, **kwargs):
+    identity = getattr(user, "_identity", None) or resolve_identity(user.pk)
+    store_identity(request, identity)
+    request.identity = identity
@@ -23,6 +23,25 @@ SQL_ORDER = [
     "21_func.sql",
     "22_roles_seed.sql",
     "23_seed.sql",
+    "24_project_stats.sql",
+    "25_task_last_report.sql",
+    "26_search_trgm.sql",
+    "27_keyset_indexes.sql",
+    "28_report_blobs.sql",
+    "29_upload_sessions.sql",
+    "30_jobs.sql",
+    "31_report_artifacts.sql",
+    "32_report_search.sql",
+    "33_report_similarity.sql",
+    "34_admin_logs_partitioned.sql",
+    "35_analytics_mv.sql",
+    "36_review_latency.sql",
+    "37_project_activity.sql",
+    "38_project_risk.sql",
+    "39_gradebook_index.sql",
+    "40_reports_file_path_index.sql",
+    "41_project_stats_lock.sql",
+    "42_analytics_refresh_log.sql",
 ]
 
 
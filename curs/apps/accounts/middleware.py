@@ -1,6 +1,10 @@
-from contextlib import suppress
+from contextlib import contextmanager
+from django.conf import settings
 from django.db import connection
 
+from .db_hygiene import mark_dirty, reset_connection
+from .identity import get_identity
+
 ROLE_MAP = {
     "STUDENT": "role_student",
     "PROFESSOR": "role_professor",
@@ -8,26 +12,121 @@ ROLE_MAP = {
 }
 SKIP_PREFIXES = ("/login", "/logout", "/admin")  # не включаем SET ROLE на этих URL
 
+# Служебные команды транзакции нельзя предварять SELECT: в упавшей транзакции
+# он сам завершится ошибкой и не даст выполнить ROLLBACK TO SAVEPOINT.
+_TX_CONTROL = ("SAVEPOINT", "RELEASE", "ROLLBACK", "COMMIT", "BEGIN", "START")
+
+
+def _is_static_path(path: str) -> bool:
+    prefixes = [p for p in (settings.STATIC_URL, settings.MEDIA_URL) if p]
+    return any(path.startswith(p if p.startswith("/") else "/" + p) for p in prefixes)
+
+
+def _skip_prefixes():
+    return SKIP_PREFIXES + tuple(getattr(settings, "DB_ROLE_SKIP_PREFIXES", ()))
+
+
+def _role_prefix(role_name: str, user_id: int) -> str:
+    # role_name — только из ROLE_MAP, user_id — int: подставляем литералами,
+    # чтобы не смешивать с параметрами основного запроса.
+    return (
+        f"SELECT set_config('role', '{role_name}', true), "
+        f"set_config('app.current_user_id', '{int(user_id)}', true);\n"
+    )
+
+
+class _LocalRoleWrapper:
+    """
+    execute_wrapper: приклеивает SET LOCAL роли и app.current_user_id к каждому
+    запросу. В autocommit каждый запрос — своя транзакция, поэтому роль живёт
+    ровно один statement и не переживает запрос; лишних round trip нет.
+    """
+
+    def __init__(self, role_name: str, user_id: int):
+        self.prefix = _role_prefix(role_name, user_id)
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:9].upper().startswith(_TX_CONTROL):
+            return execute(sql, params, many, context)
+        raw = getattr(context["cursor"], "cursor", None)
+        if many or getattr(raw, "name", None):
+            # executemany и серверные (именованные) курсоры не принимают
+            # несколько statement'ов — ставим роль отдельной командой
+            # (эффект сохранится только внутри transaction.atomic()).
+            with context["connection"].connection.cursor() as raw_cur:
+                raw_cur.execute(self.prefix)
+            return execute(sql, params, many, context)
+        return execute(self.prefix + sql, params, many, context)
+
+
+def _resolve_role(request):
+    ident = getattr(request, "identity", None)
+    if ident is None:
+        return None, None
+    return ROLE_MAP.get(ident.role), ident.user_id
+
+
+@contextmanager
+def db_role_context(request):
+    """
+    Роль БД для кода, который выполняется вне get_response
+    (например, генератор StreamingHttpResponse).
+    """
+    role_name, user_id = _resolve_role(request)
+    mode = getattr(settings, "DB_ROLE_MODE", "local")
+    if not role_name or mode == "off":
+        yield
+        return
+    if mode == "session":
+        mark_dirty(connection)
+        with connection.cursor() as cur:
+            cur.execute(f"SET ROLE {role_name}")
+        try:
+            yield
+        finally:
+            # не удалось сбросить — соединение закрыто и другому запросу не достанется
+            reset_connection(connection)
+        return
+    with connection.execute_wrapper(_LocalRoleWrapper(role_name, user_id)):
+        yield
+
 
 def set_db_role(get_response):
+    """
+    DB_ROLE_MODE:
+      "local"   — SET LOCAL в том же round trip, что и сам запрос (по умолчанию);
+      "session" — старое поведение: отдельные SET ROLE / RESET ROLE;
+      "off"     — без переключения ролей.
+    DB_ROLE_SKIP_PREFIXES — доп. префиксы URL, которым роль не нужна.
+    """
+
     def middleware(request):
+        # статику/медиа пропускаем до обращения к request.user — никакой БД
+        if _is_static_path(request.path):
+            return get_response(request)
         # пропускаем спец-маршруты
-        if any(request.path.startswith(p) for p in SKIP_PREFIXES):
+        if any(request.path.startswith(p) for p in _skip_prefixes()):
             return get_response(request)
 
-        user = getattr(request, "user", None)
-        role = getattr(user, "role", None)
-        role_name = ROLE_MAP.get(role) if isinstance(role, str) else None
-        try:
-            if role_name:
-                with suppress(Exception):
-                    with connection.cursor() as cur:
-                        cur.execute(f"SET ROLE {role_name}")
+        # ошибки SET ROLE не глотаем: лучше 500, чем запрос под ролью подключения
+        with db_role_context(request):
             return get_response(request)
-        finally:
-            if role_name:
-                with suppress(Exception):
-                    with connection.cursor() as cur:
-                        cur.execute("RESET ROLE")
+
+    return middleware
+
+
+def attach_identity(get_response):
+    """
+    Кладёт в request.identity контекст личности из сессии.
+    Должен стоять до set_db_role: при промахе контекст резолвится ещё под
+    ролью подключения, до SET ROLE.
+    """
+
+    def middleware(request):
+        if _is_static_path(request.path):
+            request.identity = None
+        else:
+            request.identity = get_identity(request)
+        return get_response(request)
 
     return middleware
@@ -1,3 +1,116 @@
-from django.test import TestCase
+from django.core.signals import request_finished
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
 
-# Create your tests here.
+from .db_hygiene import mark_dirty
+from .identity import Identity
+from .middleware import ROLE_MAP, set_db_role
+
+PROBE_SQL = """
+    SELECT current_user::text, session_user::text,
+           COALESCE(current_setting('app.current_user_id', true), '')
+"""
+
+
+class RoleIsolationTests(TransactionTestCase):
+    """
+    Одно постоянное соединение последовательно обслуживает запросы разных
+    пользователей: роль и app.current_user_id одного не должны быть видны другому.
+    TransactionTestCase — чтобы запросы шли в autocommit, как в бою.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        try:
+            with connection.cursor() as cur:
+                for role_name in ROLE_MAP.values():
+                    cur.execute(
+                        "SELECT 1 FROM pg_roles WHERE rolname = %s", [role_name]
+                    )
+                    if not cur.fetchone():
+                        cur.execute(f"CREATE ROLE {role_name} NOLOGIN")
+                    cur.execute(f"GRANT {role_name} TO CURRENT_USER")
+        except DatabaseError as e:
+            raise cls.failureException(f"cannot prepare DB roles: {e}")
+
+    def setUp(self):
+        self.rf = RequestFactory()
+        self.seen = []
+
+    def _view(self, request):
+        with connection.cursor() as cur:
+            cur.execute(PROBE_SQL)
+            self.seen.append(cur.fetchone())
+        return HttpResponse("ok")
+
+    def _request(self, role=None, user_id=None, view=None):
+        request = self.rf.get("/projects/my/")
+        request.identity = Identity(user_id=user_id, role=role) if role else None
+        response = set_db_role(view or self._view)(request)
+        request_finished.send(sender=self.__class__)
+        return response
+
+    def _session_user(self):
+        with connection.cursor() as cur:
+            cur.execute("SELECT session_user::text")
+            return cur.fetchone()[0]
+
+    def _assert_clean(self, probe):
+        current_user, session_user, app_user = probe
+        self.assertEqual(current_user, session_user)
+        self.assertEqual(app_user, "")
+
+    def _assert_sequence_isolated(self):
+        self._request("STUDENT", 11)
+        self._request()  # аноним на том же соединении
+        self._request("PROFESSOR", 22)
+        self._request()
+
+        student, anon1, professor, anon2 = self.seen
+        self.assertEqual(student[:1] + student[2:], ("role_student", "11"))
+        self.assertEqual(professor[:1] + professor[2:], ("role_professor", "22"))
+        self._assert_clean(anon1)
+        self._assert_clean(anon2)
+
+    def test_local_mode_role_does_not_leak(self):
+        with override_settings(DB_ROLE_MODE="local"):
+            self._assert_sequence_isolated()
+        # и вне middleware соединение чистое
+        with connection.cursor() as cur:
+            cur.execute(PROBE_SQL)
+            self._assert_clean(cur.fetchone())
+
+    def test_session_mode_role_does_not_leak(self):
+        with override_settings(DB_ROLE_MODE="session"):
+            self._assert_sequence_isolated()
+
+    def test_session_mode_resets_after_view_error(self):
+        def failing_view(request):
+            self._view(request)
+            raise RuntimeError("boom")
+
+        with override_settings(DB_ROLE_MODE="session"):
+            with self.assertRaises(RuntimeError):
+                self._request("ADMIN", 33, view=failing_view)
+            self._request()
+
+        admin, anon = self.seen
+        self.assertEqual(admin[0], "role_admin")
+        self._assert_clean(anon)
+
+    def test_dirty_connection_is_reset_or_closed_on_request_finished(self):
+        session_user = self._session_user()
+        with connection.cursor() as cur:
+            cur.execute("SET ROLE role_student")
+            cur.execute("SELECT set_config('app.current_user_id', '44', false)")
+        mark_dirty(connection)
+
+        request_finished.send(sender=self.__class__)
+
+        with connection.cursor() as cur:
+            cur.execute(PROBE_SQL)
+            probe = cur.fetchone()
+        self.assertEqual(probe[1], session_user)
+        self._assert_clean(probe)
@@ -0,0 +1,100 @@
+"""
+Выгрузки админки: users / projects / tasks / reports.
+
+Запрос строится из тех же фильтров, что и HTML-списки (filters.py), но без
+пагинации и ранжирования: порядок по id, чтобы план шёл по PK и первые строки
+уходили клиенту сразу. Используется и view export, и manage.py export_data;
+алиасы колонок совпадают с header — COPY ... HEADER берёт их же.
+"""
+
+from typing import NamedTuple
+
+from .filters import projects_filter, reports_filter, tasks_filter, users_filter
+
+
+class Export(NamedTuple):
+    header: list
+    sql: str
+    params: list
+
+
+_SPECS = {
+    "users": (
+        users_filter,
+        [
+            "user_id", "login", "role", "last_name", "first_name", "middle_name",
+            "created_at", "archived_at",
+        ],
+        """
+        SELECT u.user_id, u.login, u.role, u.last_name, u.first_name, u.middle_name,
+               u.created_at, u.archived_at
+        FROM users u
+        WHERE {where}
+        ORDER BY u.user_id
+        """,
+    ),
+    "projects": (
+        projects_filter,
+        [
+            "project_id", "project_name", "project_status", "specialization",
+            "created_at", "release_date", "archived_at",
+        ],
+        """
+        SELECT p.project_id, p.project_name, p.project_status, p.specialization,
+               p.created_at, p.release_date, p.archived_at
+        FROM projects p
+        WHERE {where}
+        ORDER BY p.project_id
+        """,
+    ),
+    "tasks": (
+        tasks_filter,
+        [
+            "task_id", "project_id", "project_name", "task_name", "task_status",
+            "last_report_status", "executor", "task_deadline", "archived_at",
+        ],
+        """
+        SELECT t.task_id, p.project_id, p.project_name, t.task_name, t.task_status,
+               t.last_report_status, eu.full_name AS executor, t.task_deadline, t.archived_at
+        FROM tasks t
+        JOIN projects p       ON p.project_id = t.project_id
+        LEFT JOIN students es ON es.student_id = t.executor_student
+        LEFT JOIN users eu    ON eu.user_id = es.user_id
+        WHERE {where}
+        ORDER BY t.task_id
+        """,
+    ),
+    "reports": (
+        reports_filter,
+        [
+            "report_id", "project_id", "task_id", "task_name", "student",
+            "status", "submitted_at", "reviewed_at", "reviewer", "review_comment",
+            "file_path", "external_url", "archived_at",
+        ],
+        """
+        SELECT r.report_id, t.project_id, t.task_id, t.task_name, su.full_name AS student,
+               r.status, r.submitted_at, r.reviewed_at, pu.full_name AS reviewer, r.review_comment,
+               r.file_path, r.external_url, r.archived_at
+        FROM reports r
+        JOIN tasks t          ON t.task_id = r.task_id
+        JOIN students s       ON s.student_id = r.student_id
+        JOIN users su         ON su.user_id = s.user_id
+        LEFT JOIN professors pr ON pr.professor_id = r.reviewed_by_prof
+        LEFT JOIN users pu      ON pu.user_id = pr.user_id
+        WHERE {where}
+        ORDER BY r.report_id
+        """,
+    ),
+}
+
+KINDS = tuple(_SPECS)
+
+
+def build_export(kind: str, get) -> Export | None:
+    """None — неизвестный вид выгрузки."""
+    spec = _SPECS.get(kind)
+    if spec is None:
+        return None
+    build_filter, header, sql = spec
+    f = build_filter(get)
+    return Export(header, sql.format(where=f.where), f.params)
@@ -0,0 +1,208 @@
+"""
+Фильтры списков админки: один разбор GET-параметров для HTML-списков
+и экспорта (views.*_list, views.export, manage.py export_data).
+
+Каждый построитель принимает dict-подобный объект (request.GET или dict
+из опций команды) и возвращает ListFilter: SQL-условие с параметрами,
+поиск (для ранжирования в списках) и нормализованные значения для шаблона.
+Алиасы таблиц фиксированы: users u, projects p, tasks t, reports r,
+admin_logs l.
+"""
+
+import json
+from typing import NamedTuple
+
+from django.utils.dateparse import parse_date
+
+from apps.common import search
+
+ROLES = ("ADMIN", "PROFESSOR", "STUDENT")
+PROJECT_STATUSES = ("active", "paused", "archived")
+TASK_STATUSES = ("open", "in_review", "done")
+REPORT_STATUSES = ("submitted", "needs_fix", "approved")
+
+
+class ListFilter(NamedTuple):
+    where: str
+    params: list
+    search: search.Search
+    values: dict
+
+
+def _get(get, name: str, default: str = "") -> str:
+    return (get.get(name) or default).strip()
+
+
+def _archived_sql(alias: str, show: str, default: str) -> str:
+    return {
+        "active": f"{alias}.archived_at IS NULL",
+        "archived": f"{alias}.archived_at IS NOT NULL",
+        "all": "TRUE",
+    }.get(show, default)
+
+
+def _digits(value: str) -> str | None:
+    return value if value.isdigit() else None
+
+
+def _date(value: str):
+    try:
+        return parse_date(value) if value else None
+    except ValueError:  # формат верный, даты нет (2024-02-30)
+        return None
+
+
+def users_filter(get) -> ListFilter:
+    q = _get(get, "q")
+    role = _get(get, "role").upper()
+    show = _get(get, "show", "active").lower()  # active|archived|all
+    role_param = role if role in ROLES else None
+
+    s = search.build(q, ["u.search_text"], "u.user_id DESC")
+    where = f"""
+        {s.where}
+        AND ({_archived_sql("u", show, "u.archived_at IS NULL")})
+        AND (%s IS NULL OR u.role = %s)
+    """
+    return ListFilter(
+        where,
+        [*s.where_params, role_param, role_param],
+        s,
+        {"q": q, "role": role_param or "", "show": show},
+    )
+
+
+def projects_filter(get) -> ListFilter:
+    q = _get(get, "q")
+    status = _get(get, "status")
+    show = _get(get, "show", "all").lower()  # active|archived|all — по archived_at
+    status_param = status if status in PROJECT_STATUSES else None
+
+    s = search.build(q, ["p.search_text"], "p.project_id DESC")
+    where = f"""
+        {s.where}
+        AND (%s IS NULL OR p.project_status = %s::project_status)
+        AND ({_archived_sql("p", show, "TRUE")})
+    """
+    return ListFilter(
+        where,
+        [*s.where_params, status_param, status_param],
+        s,
+        {"q": q, "status": status_param or "", "show": show},
+    )
+
+
+def tasks_filter(get) -> ListFilter:
+    q = _get(get, "q")
+    status = _get(get, "status")
+    show = _get(get, "show", "active").lower()  # active|archived|all по t.archived_at
+    status_param = status if status in TASK_STATUSES else None
+    proj_param = _digits(_get(get, "project_id"))
+
+    s = search.build(q, ["t.search_text"], "t.task_id DESC")
+    where = f"""
+        {s.where}
+        AND (%s IS NULL OR t.task_status = %s::task_status)
+        AND (%s IS NULL OR t.project_id = %s::bigint)
+        AND ({_archived_sql("t", show, "t.archived_at IS NULL")})
+    """
+    return ListFilter(
+        where,
+        [*s.where_params, status_param, status_param, proj_param, proj_param],
+        s,
+        {
+            "q": q,
+            "status": status_param or "",
+            "project_id": proj_param or "",
+            "show": show,
+        },
+    )
+
+
+def reports_filter(get) -> ListFilter:
+    """Отдельного списка нет — только экспорт (по проекту/задаче/статусу)."""
+    status = _get(get, "status")
+    show = _get(get, "show", "all").lower()
+    status_param = status if status in REPORT_STATUSES else None
+    proj_param = _digits(_get(get, "project_id"))
+    task_param = _digits(_get(get, "task_id"))
+
+    s = search.build("", [], "r.report_id")
+    where = f"""
+        (%s IS NULL OR r.status = %s::report_status)
+        AND (%s IS NULL OR t.project_id = %s::bigint)
+        AND (%s IS NULL OR r.task_id = %s::bigint)
+        AND ({_archived_sql("r", show, "TRUE")})
+    """
+    return ListFilter(
+        where,
+        [status_param, status_param, proj_param, proj_param, task_param, task_param],
+        s,
+        {
+            "status": status_param or "",
+            "project_id": proj_param or "",
+            "task_id": task_param or "",
+            "show": show,
+        },
+    )
+
+
+# ключи details, по которым журнал фильтруется через details @> (GIN)
+AUDIT_DETAIL_KEYS = ("project_id", "task_id", "report_id", "user_id", "member_id")
+
+
+def audit_filter(get) -> ListFilter:
+    """
+    Журнал admin_logs: действие, автор, период и вхождение в details.
+    Условия добавляются только заданные — чтобы планировщик видел
+    details @> как есть (индекс GIN) и отсекал секции по датам.
+    """
+    action = _get(get, "action").upper()[:100]
+    actor = _digits(_get(get, "actor"))
+    date_from = _date(_get(get, "from"))
+    date_to = _date(_get(get, "to"))
+
+    contains = {}
+    for key in AUDIT_DETAIL_KEYS:
+        value = _digits(_get(get, key))
+        if value:
+            contains[key] = int(value)
+    raw = _get(get, "details")
+    details_error = ""
+    if raw:
+        try:
+            extra = json.loads(raw)
+        except ValueError:
+            extra = None
+        if isinstance(extra, dict):
+            contains.update(extra)
+        else:
+            details_error = "details должен быть JSON-объектом"
+
+    conds, params = ["TRUE"], []
+    if action:
+        conds.append("l.admin_action = %s")
+        params.append(action)
+    if actor:
+        conds.append("l.actor_user_id = %s::bigint")
+        params.append(actor)
+    if date_from:
+        conds.append("l.log_created_at >= %s::date")
+        params.append(date_from)
+    if date_to:
+        conds.append("l.log_created_at < %s::date + 1")
+        params.append(date_to)
+    if contains:
+        conds.append("l.details @> %s::jsonb")
+        params.append(json.dumps(contains, ensure_ascii=False))
+
+    values = {
+        "action": action,
+        "actor": actor or "",
+        "from": date_from.isoformat() if date_from else "",
+        "to": date_to.isoformat() if date_to else "",
+        "details": raw,
+        "details_error": details_error,
+        **{key: _digits(_get(get, key)) or "" for key in AUDIT_DETAIL_KEYS},
+    }
+    return ListFilter(" AND ".join(conds), params, search.build("", [], "l.admin_log_id"), values)
@@ -0,0 +1,37 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from apps.jobs.registry import job
+
+from . import risk
+
+logger = logging.getLogger(__name__)
+
+
+@job("adminboard.audit_partitions", every=timedelta(days=1), priority=200)
+def audit_partitions(payload: dict):
+    """Секции admin_logs на месяцы вперёд и удаление вышедших за срок хранения."""
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute(
+                "SELECT fn_admin_logs_ensure_partitions(%s)",
+                [settings.AUDIT_LOG_PARTITIONS_AHEAD],
+            )
+            created = cur.fetchone()[0]
+            cur.execute(
+                "SELECT fn_admin_logs_drop_partitions(%s)",
+                [settings.AUDIT_LOG_RETENTION_MONTHS],
+            )
+            dropped = [r[0] for r in cur.fetchall()]
+    if created or dropped:
+        logger.info("admin_logs partitions: created %s, dropped %s", created, dropped)
+
+
+@job("adminboard.project_risk", every=timedelta(hours=1), priority=150)
+def project_risk(payload: dict):
+    """Балл риска не успеть к релизу (страница adminboard:project-risk)."""
+    count = risk.refresh()
+    logger.info("project_risk: %s projects scored", count)
@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.adminboard import risk
+
+
+def _tasks(n: int, projects: int, now: float, rng: np.random.Generator) -> risk.TaskColumns:
+    """Синтетические задачи: релизы ±10 недель от now, дедлайны до релиза, ~40% закрыто."""
+    project_id = rng.integers(1, projects + 1, size=n)
+    release_by_project = now + rng.uniform(-2, 10, size=projects + 1) * risk.WEEK
+    release_at = release_by_project[project_id]
+    deadline = release_at - rng.uniform(0, 12, size=n) * risk.WEEK
+    deadline[rng.random(n) < 0.1] = np.nan
+    done = rng.random(n) < 0.4
+    last_report_at = now - rng.exponential(10, size=n) * risk.DAY
+    last_report_at[rng.random(n) < 0.3] = np.nan
+    done_at = np.where(done, now - rng.uniform(0, 12, size=n) * risk.WEEK, np.nan)
+    return risk.TaskColumns(
+        project_id=project_id,
+        release_at=release_at,
+        deadline=deadline,
+        done=done,
+        pending_review=~done & (rng.random(n) < 0.2),
+        last_report_at=last_report_at,
+        done_at=done_at,
+    )
+
+
+class Command(BaseCommand):
+    help = "Benchmark vectorized project risk scoring on synthetic tasks (no database access)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=100_000, help="Number of tasks (default: 100000).")
+        parser.add_argument("--projects", type=int, default=2_000, help="Number of projects (default: 2000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs, best is reported (default: 5).")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        now = time.time()
+        tasks = _tasks(opts["tasks"], opts["projects"], now, np.random.default_rng(opts["seed"]))
+        self.stdout.write(f"{opts['tasks']} tasks over {opts['projects']} projects")
+
+        timings = []
+        for _ in range(max(1, opts["repeat"])):
+            started = time.perf_counter()
+            result = risk.score(tasks, now)
+            timings.append(time.perf_counter() - started)
+
+        top = np.argsort(-result.score)[:5]
+        self.stdout.write(f"scored {len(result.project_id)} projects: best {min(timings) * 1000:.1f} ms")
+        for i in top:
+            self.stdout.write(
+                f"  project {result.project_id[i]}: {result.score[i]:.1f} ({result.main_factor[i]})"
+            )
@@ -0,0 +1,51 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.adminboard.exports import KINDS, build_export
+
+
+class Command(BaseCommand):
+    help = (
+        "Export users/projects/tasks/reports to CSV via COPY ... TO STDOUT "
+        "(same filters as the admin lists)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=KINDS)
+        parser.add_argument("-o", "--output", default="-", help="file path or '-' for stdout")
+        parser.add_argument("--q", default="")
+        parser.add_argument("--role", default="")
+        parser.add_argument("--status", default="")
+        parser.add_argument("--show", default="all", help="active|archived|all")
+        parser.add_argument("--project-id", default="")
+        parser.add_argument("--task-id", default="")
+
+    def handle(self, *args, **opts):
+        get = {
+            "q": opts["q"],
+            "role": opts["role"],
+            "status": opts["status"],
+            "show": opts["show"],
+            "project_id": opts["project_id"],
+            "task_id": opts["task_id"],
+        }
+        exp = build_export(opts["kind"], get)
+
+        with connection.cursor() as cur:
+            # COPY не принимает параметры — подставляем их драйвером заранее
+            query = cur.mogrify(exp.sql, exp.params).decode()
+            copy_sql = f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+            if opts["output"] == "-":
+                cur.copy_expert(copy_sql, sys.stdout.buffer)
+                return
+            try:
+                with open(opts["output"], "wb") as fh:
+                    cur.copy_expert(copy_sql, fh)
+                    size = fh.tell()
+            except OSError as e:
+                raise CommandError(f"cannot write {opts['output']}: {e}")
+        self.stdout.write(
+            self.style.SUCCESS(f"{opts['kind']}: {size} bytes -> {opts['output']}")
+        )
@@ -0,0 +1,192 @@
+"""
+Риск не успеть к release_date: балл по всем задачам активных проектов.
+
+Задачи читаются одним запросом в колонки NumPy, признаки проектов считаются
+свёрткой по индексу проекта (np.bincount / np.maximum.at) — без цикла по
+проектам в Python. Результат целиком заменяет project_risk
+(db/38_project_risk.sql); читает его страница adminboard:project-risk.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+
+DAY = 86_400.0
+WEEK = 7 * DAY
+
+VELOCITY_WINDOW = 4 * WEEK  # скорость — по принятым задачам за это окно
+IDLE_FULL_DAYS = 30.0  # столько дней без отчётов — полный вклад idle
+
+# веса компонент, в сумме 1
+WEIGHTS = {"pace": 0.45, "overdue": 0.25, "backlog": 0.15, "idle": 0.15}
+FACTORS = tuple(WEIGHTS)
+
+
+@dataclass
+class TaskColumns:
+    """По элементу на задачу; времена — epoch-секунды, NaN — нет значения."""
+
+    project_id: np.ndarray  # int64
+    release_at: np.ndarray
+    deadline: np.ndarray
+    done: np.ndarray  # bool
+    pending_review: np.ndarray  # bool: последний отчёт ждёт проверки
+    last_report_at: np.ndarray
+    done_at: np.ndarray  # проверка принятого последнего отчёта у закрытой задачи
+
+
+@dataclass
+class ProjectRisk:
+    """По элементу на проект, порядок — project_id по возрастанию."""
+
+    project_id: np.ndarray
+    score: np.ndarray
+    main_factor: np.ndarray  # str
+    components: dict[str, np.ndarray]
+    total: np.ndarray
+    open: np.ndarray
+    overdue: np.ndarray
+    pending: np.ndarray
+    velocity_per_week: np.ndarray
+    weeks_needed: np.ndarray  # inf — скорость нулевая
+    weeks_left: np.ndarray
+    idle_days: np.ndarray  # NaN — отчётов не было
+
+
+def load() -> TaskColumns:
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT t.project_id,
+                   extract(epoch FROM p.release_date)::float8,
+                   extract(epoch FROM t.task_deadline)::float8,
+                   t.task_status = 'done',
+                   COALESCE(t.last_report_status = 'submitted', FALSE),
+                   extract(epoch FROM t.last_report_at)::float8,
+                   CASE WHEN t.task_status = 'done' AND r.status = 'approved'
+                        THEN extract(epoch FROM r.reviewed_at)::float8 END
+            FROM tasks t
+            JOIN projects p ON p.project_id = t.project_id
+            LEFT JOIN reports r ON r.report_id = t.last_report_id
+            WHERE t.archived_at IS NULL
+              AND p.archived_at IS NULL
+              AND p.project_status = 'active'
+              AND p.release_date IS NOT NULL
+            """
+        )
+        rows = cur.fetchall()
+    cols = list(zip(*rows)) or [()] * 7
+    return TaskColumns(
+        project_id=np.array(cols[0], dtype=np.int64),
+        release_at=np.array(cols[1], dtype=float),
+        deadline=np.array(cols[2], dtype=float),
+        done=np.array(cols[3], dtype=bool),
+        pending_review=np.array(cols[4], dtype=bool),
+        last_report_at=np.array(cols[5], dtype=float),
+        done_at=np.array(cols[6], dtype=float),
+    )
+
+
+def score(tasks: TaskColumns, now: float) -> ProjectRisk:
+    pids, idx = np.unique(tasks.project_id, return_inverse=True)
+    n = len(pids)
+
+    def count(mask):
+        return np.bincount(idx, weights=mask, minlength=n)
+
+    total = np.bincount(idx, minlength=n).astype(float)
+    done = count(tasks.done)
+    open_ = total - done
+    # NaN < now даёт False: задачи без дедлайна не просрочены
+    overdue = count(~tasks.done & (tasks.deadline < now))
+    pending = count(~tasks.done & tasks.pending_review)
+    recent = count(tasks.done_at >= now - VELOCITY_WINDOW)
+
+    release = np.empty(n)
+    release[idx] = tasks.release_at  # у всех задач проекта одна дата
+    last = np.full(n, -np.inf)
+    np.maximum.at(last, idx, np.nan_to_num(np.fmax(tasks.last_report_at, tasks.done_at), nan=-np.inf))
+
+    velocity = recent / VELOCITY_WINDOW  # задач в секунду
+    left = release - now
+    with np.errstate(divide="ignore", invalid="ignore"):
+        needed = np.where(open_ > 0, open_ / velocity, 0.0)  # inf при нулевой скорости
+        ratio = needed / left
+    pace = np.where(
+        open_ == 0, 0.0, np.where(left <= 0, 1.0, np.clip((ratio - 0.5) / 1.5, 0.0, 1.0))
+    )
+
+    safe_open = np.maximum(open_, 1)
+    idle_days = np.where(np.isfinite(last), (now - last) / DAY, np.nan)
+    # без отчётов вовсе — как IDLE_FULL_DAYS простоя
+    idle = np.clip(np.nan_to_num(idle_days, nan=IDLE_FULL_DAYS) / IDLE_FULL_DAYS, 0.0, 1.0)
+    components = {
+        "pace": pace,
+        "overdue": overdue / safe_open,
+        "backlog": pending / safe_open,
+        "idle": np.where(open_ > 0, idle, 0.0),
+    }
+    weighted = np.stack([WEIGHTS[f] * components[f] for f in FACTORS])
+
+    return ProjectRisk(
+        project_id=pids,
+        score=100.0 * weighted.sum(axis=0),
+        main_factor=np.array(FACTORS)[weighted.argmax(axis=0)],
+        components=components,
+        total=total,
+        open=open_,
+        overdue=overdue,
+        pending=pending,
+        velocity_per_week=velocity * WEEK,
+        weeks_needed=needed / WEEK,
+        weeks_left=left / WEEK,
+        idle_days=idle_days,
+    )
+
+
+def _nullable(a: np.ndarray) -> list:
+    return [float(x) if np.isfinite(x) else None for x in a]
+
+
+def store(risk: ProjectRisk):
+    """Заменить содержимое project_risk одним INSERT ... SELECT FROM unnest."""
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute("DELETE FROM project_risk")
+            if not len(risk.project_id):
+                return
+            cur.execute(
+                """
+                INSERT INTO project_risk (
+                  project_id, score, main_factor, pace, overdue, backlog, idle,
+                  total_tasks, open_tasks, overdue_tasks, pending_reviews,
+                  velocity_per_week, weeks_needed, weeks_left, idle_days)
+                SELECT * FROM unnest(
+                  %s::bigint[], %s::real[], %s::varchar[], %s::real[], %s::real[], %s::real[], %s::real[],
+                  %s::int[], %s::int[], %s::int[], %s::int[],
+                  %s::real[], %s::real[], %s::real[], %s::real[])
+                """,
+                [
+                    risk.project_id.tolist(),
+                    risk.score.tolist(),
+                    risk.main_factor.tolist(),
+                    *(risk.components[f].tolist() for f in FACTORS),
+                    risk.total.astype(int).tolist(),
+                    risk.open.astype(int).tolist(),
+                    risk.overdue.astype(int).tolist(),
+                    risk.pending.astype(int).tolist(),
+                    risk.velocity_per_week.tolist(),
+                    _nullable(risk.weeks_needed),
+                    risk.weeks_left.tolist(),
+                    _nullable(risk.idle_days),
+                ],
+            )
+
+
+def refresh() -> int:
+    """Пересчитать и сохранить; вернёт число проектов."""
+    risk = score(load(), timezone.now().timestamp())
+    store(risk)
+    return len(risk.project_id)
@@ -1,3 +1,59 @@
-from django.test import TestCase
+import numpy as np
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from apps.adminboard import risk
+
+
+class ProjectRiskScoreTests(SimpleTestCase):
+    NOW = 1_700_000_000.0
+
+    def _tasks(self, rows):
+        """rows: (project_id, release, deadline, done, pending, last_report_at, done_at)."""
+        cols = list(zip(*rows))
+        return risk.TaskColumns(
+            project_id=np.array(cols[0], dtype=np.int64),
+            release_at=np.array(cols[1], dtype=float),
+            deadline=np.array(cols[2], dtype=float),
+            done=np.array(cols[3], dtype=bool),
+            pending_review=np.array(cols[4], dtype=bool),
+            last_report_at=np.array(cols[5], dtype=float),
+            done_at=np.array(cols[6], dtype=float),
+        )
+
+    def test_late_project_ranks_above_on_track(self):
+        now, week, day = self.NOW, risk.WEEK, risk.DAY
+        on_track = now + 10 * week
+        late = now - week
+        result = risk.score(
+            self._tasks(
+                [
+                    (1, on_track, now + week, True, False, now - day, now - week),
+                    (1, on_track, now + week, True, False, now - day, now - 2 * week),
+                    (1, on_track, now + week, False, False, now - day, None),
+                    (2, late, now - 2 * week, False, True, now - 40 * day, None),
+                    (2, late, None, False, False, None, None),
+                ]
+            ),
+            now,
+        )
+        self.assertEqual(result.project_id.tolist(), [1, 2])
+        self.assertLess(result.score[0], 10)
+        self.assertGreater(result.score[1], 70)
+        self.assertEqual(result.main_factor[1], "pace")
+        self.assertEqual(result.overdue.tolist(), [0, 1])
+        self.assertEqual(result.pending.tolist(), [0, 1])
+        self.assertTrue(np.isinf(result.weeks_needed[1]))
+
+    def test_finished_project_has_no_risk(self):
+        now = self.NOW
+        result = risk.score(
+            self._tasks([(7, now - risk.WEEK, now - 2 * risk.WEEK, True, False, None, None)]),
+            now,
+        )
+        self.assertEqual(result.score.tolist(), [0.0])
+
+    def test_no_tasks(self):
+        empty = risk.TaskColumns(
+            *(np.array([], dtype=t) for t in (np.int64, float, float, bool, bool, float, float))
+        )
+        self.assertEqual(len(risk.score(empty, self.NOW).project_id), 0)
@@ -23,6 +23,9 @@ from .views import (
     user_unarchive,
     project_archive,
     project_unarchive,
+    export,
+    audit_log,
+    project_risk,
 )
 
 app_name = "adminboard"
@@ -48,6 +51,7 @@ urlpatterns = [
     path("projects/<int:project_id>/edit/", project_edit, name="project-edit"),
     path("projects/<int:project_id>/delete/", project_delete, name="project-delete"),
     path("projects/lookup/", project_lookup, name="projects-lookup"),
+    path("projects/risk/", project_risk, name="project-risk"),
     path(
         "projects/<int:project_id>/members/",
         project_members_admin,
@@ -63,4 +67,8 @@ urlpatterns = [
     path("tasks/new/", task_new_admin, name="task-new"),
     path("tasks/<int:task_id>/edit/", task_edit_admin, name="task-edit"),
     path("tasks/<int:task_id>/delete/", task_delete_admin, name="task-delete"),
+    # Audit (admin_logs)
+    path("audit/", audit_log, name="audit-log"),
+    # Export (CSV/XLSX, фильтры — как у списков)
+    path("export/<str:kind>/", export, name="export"),
 ]
@@ -7,6 +7,21 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import connection
 from django.contrib.auth.hashers import make_password
+from apps.accounts.identity import invalidate_identity
+from apps.common import audit, pagination, search, streaming
+from apps.common.pagination import Key
+from .exports import build_export
+from .filters import (
+    AUDIT_DETAIL_KEYS,
+    PROJECT_STATUSES,
+    ROLES,
+    TASK_STATUSES,
+    audit_filter,
+    projects_filter,
+    tasks_filter,
+    users_filter,
+)
+from apps.projects import membership
 import json
 
 
@@ -34,34 +49,13 @@ def _fetchone_dict(cur):
 
 
 # ===== helpers for project membership management =====
-def _prof_id_by_user(uid):
-    with connection.cursor() as cur:
-        cur.execute("SELECT professor_id FROM professors WHERE user_id=%s", [uid])
-        r = cur.fetchone()
-        return r[0] if r else None
-
-
-def _is_prof_member_of_project(pid, project_id) -> bool:
-    if not pid:
-        return False
-    with connection.cursor() as cur:
-        cur.execute(
-            "SELECT 1 FROM project_members WHERE project_id=%s AND member_prof=%s",
-            [project_id, pid],
-        )
-        return cur.fetchone() is not None
-
-
 def _can_manage_project(request, project_id) -> bool:
     if not request.user.is_authenticated:
         return False
     if getattr(request.user, "role", None) == "ADMIN":
         return True
     if getattr(request.user, "role", None) == "PROFESSOR":
-        pid = _prof_id_by_user(
-            getattr(request.user, "user_id", None) or request.user.pk
-        )
-        return _is_prof_member_of_project(pid, project_id)
+        return membership.is_member(request.identity, project_id)
     return False
 
 
@@ -85,9 +79,23 @@ class AdminDashboardView(LoginRequiredMixin, TemplateView):
         return super().dispatch(request, *args, **kwargs)
 
 
+# ---------- EXPORT ----------
+@login_required
+def export(request, kind: str):
+    """CSV/XLSX выгрузка с фильтрами соответствующего списка (?fmt=csv|xlsx)."""
+    if resp := _admin_or_403(request):
+        return resp
+    exp = build_export(kind, request.GET)
+    if exp is None:
+        raise Http404("Неизвестная выгрузка")
+    fmt = (request.GET.get("fmt") or "csv").strip().lower()
+    return streaming.export_response(
+        request, kind, fmt, exp.header, exp.sql, exp.params
+    )
+
+
 # ---------- USERS ----------
 PAGE_SIZE = 100
-ROLES = ("ADMIN", "PROFESSOR", "STUDENT")
 
 
 @login_required
@@ -95,46 +103,28 @@ def users_list(request):
     if resp := _admin_or_403(request):
         return resp
 
-    q = (request.GET.get("q") or "").strip()
-    role = (request.GET.get("role") or "").strip().upper()
-    show = (request.GET.get("show") or "active").strip().lower()  # active|archived|all
-    page = max(int(request.GET.get("page", 1) or 1), 1)
-    offset = (page - 1) * PAGE_SIZE
-
-    role_param = role if role in ROLES else None
-    arch_sql = {
-        "active": "archived_at IS NULL",
-        "archived": "archived_at IS NOT NULL",
-        "all": "TRUE",
-    }.get(show, "archived_at IS NULL")
-
+    f = users_filter(request.GET)
     with connection.cursor() as cur:
-        cur.execute(
+        page = pagination.paginate(
+            cur,
             f"""
-            SELECT user_id, login, role, first_name, last_name, created_at, archived_at,
-                   (archived_at IS NOT NULL) AS is_archived
-            FROM users
-            WHERE (%s = '' OR login ILIKE '%%'||%s||'%%'
-                           OR first_name ILIKE '%%'||%s||'%%'
-                           OR last_name  ILIKE '%%'||%s||'%%')
-              AND ({arch_sql})
-              AND (%s IS NULL OR role = %s)
-            ORDER BY user_id DESC
-            LIMIT %s OFFSET %s
+            SELECT u.user_id, u.login, u.role, u.first_name, u.last_name,
+                   u.created_at, u.archived_at,
+                   (u.archived_at IS NOT NULL) AS is_archived, {f.search.rank} AS rank
+            FROM users u
+            WHERE {f.where}
             """,
-            [q, q, q, q, role_param, role_param, PAGE_SIZE, offset],
+            [*f.search.rank_params, *f.params],
+            f.search.keys(Key("user_id", desc=True)),
+            request.GET.get("cursor"),
+            PAGE_SIZE,
         )
-        users = _fetchall_dict(cur)
 
     ctx = {
-        "users": users,
-        "q": q,
-        "role": role if role in ROLES else "",
+        **f.values,
+        "users": page.items,
         "roles": ROLES,
-        "show": show,
         "page": page,
-        "page_size": PAGE_SIZE,
-        "has_next": len(users) == PAGE_SIZE,
     }
     return render(request, "adminboard/users_list.html", ctx)
 
@@ -149,6 +139,7 @@ def user_archive(request, user_id: int):
             "UPDATE users SET archived_at = COALESCE(archived_at, now()) WHERE user_id=%s",
             [user_id],
         )
+    audit.log_request(request, "USER_ARCHIVE", user_id=user_id)
     messages.success(request, "Пользователь заархивирован")
     return redirect(request.META.get("HTTP_REFERER", "adminboard:users-list"))
 
@@ -160,6 +151,7 @@ def user_unarchive(request, user_id: int):
         return resp
     with connection.cursor() as cur:
         cur.execute("UPDATE users SET archived_at = NULL WHERE user_id=%s", [user_id])
+    audit.log_request(request, "USER_UNARCHIVE", user_id=user_id)
     messages.success(request, "Пользователь разархивирован")
     return redirect(request.META.get("HTTP_REFERER", "adminboard:users-list"))
 
@@ -238,6 +230,7 @@ def user_new(request):
                     else:  # ADMIN
                         cur.execute("INSERT INTO admins (user_id) VALUES (%s)", [uid])
 
+                audit.log_request(request, "USER_CREATE", user_id=uid, login=login, role=role)
                 messages.success(request, "Пользователь создан")
                 return redirect("adminboard:users-list")
             except Exception:
@@ -411,6 +404,15 @@ def user_edit(request, user_id: int):
                     # professor теперь можно удалить (мы проверили выше при смене роли)
                     cur.execute("DELETE FROM professors WHERE user_id=%s", [user_id])
 
+            # профильные id поменялись — закешированный в сессии контекст неактуален
+            if old_role != role:
+                invalidate_identity(request, user_id)
+            audit.log_request(
+                request, "USER_UPDATE",
+                user_id=user_id, login=login, role=role, old_role=old_role,
+                password_changed=bool(pwd),
+            )
+
             messages.success(request, "Пользователь обновлён")
             return redirect("adminboard:users-list")
 
@@ -444,12 +446,12 @@ def user_delete(request, user_id: int):
         return resp
     with connection.cursor() as cur:
         cur.execute("DELETE FROM users WHERE user_id=%s", [user_id])
+    audit.log_request(request, "USER_DELETE", user_id=user_id)
     messages.info(request, "Пользователь удалён")
     return redirect("adminboard:users-list")
 
 
 # ---------- PROJECTS ----------
-PROJECT_STATUSES = ("active", "paused", "archived")
 
 
 @login_required
@@ -466,38 +468,32 @@ def user_lookup(request):
 
     with connection.cursor() as cur:
         if role == "student":
+            s = search.build(q, ["u.search_text", "s.search_text"], "fio")
             cur.execute(
-                """
-                SELECT s.student_id AS id,
-                       u.last_name||' '||u.first_name||COALESCE(' '||u.middle_name,'') AS fio,
+                f"""
+                SELECT s.student_id AS id, u.full_name AS fio,
                        s.group_number, s.faculty
                 FROM students s JOIN users u ON u.user_id=s.user_id
-                WHERE (%s='' OR u.last_name ILIKE '%%'||%s||'%%'
-                              OR u.first_name ILIKE '%%'||%s||'%%'
-                              OR s.group_number ILIKE '%%'||%s||'%%'
-                              OR u.login ILIKE '%%'||%s||'%%')
-                ORDER BY fio LIMIT %s
+                WHERE {s.where}
+                ORDER BY {s.order} LIMIT %s
                 """,
-                [q, q, q, q, q, limit],
+                [*s.where_params, *s.order_params, limit],
             )
             items = [
                 {"id": r[0], "label": f"{r[1]} — гр. {r[2]} ({r[3]})"}
                 for r in cur.fetchall()
             ]
         else:
+            s = search.build(q, ["u.search_text", "p.search_text"], "fio")
             cur.execute(
-                """
-                SELECT p.professor_id AS id,
-                       u.last_name||' '||u.first_name||COALESCE(' '||u.middle_name,'') AS fio,
+                f"""
+                SELECT p.professor_id AS id, u.full_name AS fio,
                        p.department, p.faculty
                 FROM professors p JOIN users u ON u.user_id=p.user_id
-                WHERE (%s='' OR u.last_name ILIKE '%%'||%s||'%%'
-                              OR u.first_name ILIKE '%%'||%s||'%%'
-                              OR p.department ILIKE '%%'||%s||'%%'
-                              OR u.login ILIKE '%%'||%s||'%%')
-                ORDER BY fio LIMIT %s
+                WHERE {s.where}
+                ORDER BY {s.order} LIMIT %s
                 """,
-                [q, q, q, q, q, limit],
+                [*s.where_params, *s.order_params, limit],
             )
             items = [
                 {"id": r[0], "label": f"{r[1]} — {r[2]} ({r[3]})"}
@@ -510,44 +506,32 @@ def user_lookup(request):
 def projects_list(request):
     if resp := _admin_or_403(request):
         return resp
-    q = (request.GET.get("q") or "").strip()
-    status = (request.GET.get("status") or "").strip()
-    show = (
-        (request.GET.get("show") or "all").strip().lower()
-    )  # active|archived|all — по archived_at
-    status_param = status if status in PROJECT_STATUSES else None
-    arch_sql = {
-        "active": "p.archived_at IS NULL",
-        "archived": "p.archived_at IS NOT NULL",
-        "all": "TRUE",
-    }.get(show, "TRUE")
 
+    f = projects_filter(request.GET)
     with connection.cursor() as cur:
-        cur.execute(
+        page = pagination.paginate(
+            cur,
             f"""
             SELECT p.project_id, p.project_name, p.project_status, p.release_date, p.specialization,
-                   p.archived_at, (p.archived_at IS NOT NULL) AS is_archived
+                   p.archived_at, (p.archived_at IS NOT NULL) AS is_archived,
+                   {f.search.rank} AS rank
             FROM projects p
-            WHERE (%s = '' OR p.project_name ILIKE '%%'||%s||'%%'
-                           OR p.specialization ILIKE '%%'||%s||'%%')
-              AND (%s IS NULL OR p.project_status = %s::project_status)
-              AND ({arch_sql})
-            ORDER BY p.project_id DESC
-            LIMIT 300
+            WHERE {f.where}
             """,
-            [q, q, q, status_param, status_param],
+            [*f.search.rank_params, *f.params],
+            f.search.keys(Key("project_id", desc=True)),
+            request.GET.get("cursor"),
+            PAGE_SIZE,
         )
-        items = _fetchall_dict(cur)
 
     return render(
         request,
         "adminboard/projects_list.html",
         {
-            "items": items,
-            "q": q,
-            "status": status_param or "",
+            **f.values,
+            "items": page.items,
+            "page": page,
             "statuses": PROJECT_STATUSES,
-            "show": show,
         },
     )
 
@@ -573,6 +557,7 @@ def project_new(request):
                     [name, desc, status, rel, spec],
                 )
                 pid = cur.fetchone()[0]
+            audit.log_request(request, "PROJECT_CREATE", project_id=pid, project_name=name)
             messages.success(request, "Проект создан")
             return redirect("projects:project-detail", project_id=pid)
     return render(
@@ -597,6 +582,9 @@ def project_archive(request, project_id: int):
         """,
             [project_id],
         )
+    # триггер проставил left_at участникам — их наборы проектов изменились
+    membership.invalidate_project(project_id)
+    audit.log_request(request, "PROJECT_ARCHIVE", project_id=project_id)
     messages.success(request, "Проект заархивирован")
     return redirect(request.META.get("HTTP_REFERER", "adminboard:projects-list"))
 
@@ -620,6 +608,8 @@ def project_unarchive(request, project_id: int):
         """,
             [to_status, project_id],
         )
+    membership.invalidate_project(project_id)
+    audit.log_request(request, "PROJECT_UNARCHIVE", project_id=project_id, status=to_status)
     messages.success(request, "Проект разархивирован")
     return redirect(request.META.get("HTTP_REFERER", "adminboard:projects-list"))
 
@@ -651,6 +641,12 @@ def project_edit(request, project_id: int):
                        WHERE project_id=%s""",
                     [name, desc, status, rel, spec, project_id],
                 )
+            # статус мог смениться и триггером автоархива по release_date
+            membership.invalidate_project(project_id)
+            audit.log_request(
+                request, "PROJECT_UPDATE",
+                project_id=project_id, project_name=name, status=status,
+            )
             messages.success(request, "Проект обновлён")
             return redirect("adminboard:projects-list")
 
@@ -666,14 +662,15 @@ def project_edit(request, project_id: int):
 def project_delete(request, project_id: int):
     if resp := _admin_or_403(request):
         return resp
+    membership.invalidate_project(project_id)
     with connection.cursor() as cur:
         cur.execute("DELETE FROM projects WHERE project_id=%s", [project_id])
+    audit.log_request(request, "PROJECT_DELETE", project_id=project_id)
     messages.info(request, "Проект удалён")
     return redirect("adminboard:projects-list")
 
 
 # ---------- TASKS ----------
-TASK_STATUSES = ("open", "in_review", "done")
 
 
 @login_required
@@ -681,50 +678,23 @@ def tasks_list(request):
     if resp := _admin_or_403(request):
         return resp
 
-    q = (request.GET.get("q") or "").strip()
-    status = (request.GET.get("status") or "").strip()
-    show = (
-        (request.GET.get("show") or "active").strip().lower()
-    )  # active|archived|all по t.archived_at
-    status_param = status if status in TASK_STATUSES else None
-    proj = (request.GET.get("project_id") or "").strip()
-    proj_param = proj if proj.isdigit() else None
-
-    page = max(int(request.GET.get("page", 1) or 1), 1)
-    offset = (page - 1) * PAGE_SIZE
-    arch_sql = {
-        "active": "t.archived_at IS NULL",
-        "archived": "t.archived_at IS NOT NULL",
-        "all": "TRUE",
-    }.get(show, "t.archived_at IS NULL")
-
+    f = tasks_filter(request.GET)
     with connection.cursor() as cur:
-        cur.execute(
+        page = pagination.paginate(
+            cur,
             f"""
             SELECT t.task_id, t.task_name, t.task_status, t.task_deadline,
                    t.archived_at, (t.archived_at IS NOT NULL) AS is_archived,
-                   p.project_id, p.project_name
+                   p.project_id, p.project_name, {f.search.rank} AS rank
             FROM tasks t
             JOIN projects p ON p.project_id = t.project_id
-            WHERE (%s = '' OR t.task_name ILIKE '%%'||%s||'%%')
-              AND (%s IS NULL OR t.task_status = %s::task_status)
-              AND (%s IS NULL OR p.project_id = %s::bigint)
-              AND ({arch_sql})
-            ORDER BY t.task_id DESC
-            LIMIT %s OFFSET %s
+            WHERE {f.where}
             """,
-            [
-                q,
-                q,
-                status_param,
-                status_param,
-                proj_param,
-                proj_param,
-                PAGE_SIZE,
-                offset,
-            ],
+            [*f.search.rank_params, *f.params],
+            f.search.keys(Key("task_id", desc=True)),
+            request.GET.get("cursor"),
+            PAGE_SIZE,
         )
-        items = _fetchall_dict(cur)
 
         cur.execute(
             "SELECT project_id, project_name FROM projects ORDER BY project_id DESC LIMIT 1000"
@@ -732,16 +702,11 @@ def tasks_list(request):
         projs = _fetchall_dict(cur)
 
     ctx = {
-        "items": items,
-        "q": q,
-        "status": status_param or "",
-        "project_id": proj_param or "",
+        **f.values,
+        "items": page.items,
         "statuses": TASK_STATUSES,
         "projs": projs,
-        "show": show,
         "page": page,
-        "page_size": PAGE_SIZE,
-        "has_next": len(items) == PAGE_SIZE,
     }
     return render(request, "adminboard/tasks_list.html", ctx)
 
@@ -769,9 +734,15 @@ def task_new_admin(request):
                     """
                     INSERT INTO tasks (project_id, task_name, task_description, executor_student, task_status, task_deadline)
                     VALUES (%s,%s,%s,%s,%s::task_status,%s)
+                    RETURNING task_id
                     """,
                     [pid, name, desc, exec_sid, status, deadline],
                 )
+                task_id = cur.fetchone()[0]
+            audit.log_request(
+                request, "TASK_CREATE",
+                task_id=task_id, project_id=int(pid), task_name=name, status=status,
+            )
             messages.success(request, "Задача создана")
             return redirect("adminboard:tasks-list")
 
@@ -785,19 +756,18 @@ def task_new_admin(request):
     ).strip()
     sel_pid_param = sel_pid if sel_pid.isdigit() else None
 
+    s = search.build(q, ["search_text"], "project_id DESC")
     with connection.cursor() as cur:
         # список проектов по фильтру q (id/название/спец)
         cur.execute(
-            """
+            f"""
             SELECT project_id, project_name, specialization, project_status
             FROM projects
-            WHERE (%s = '' OR project_name ILIKE '%%'||%s||'%%'
-                           OR specialization ILIKE '%%'||%s||'%%'
-                           OR project_id::text ILIKE '%%'||%s||'%%')
-            ORDER BY project_id DESC
+            WHERE {s.where}
+            ORDER BY {s.order}
             LIMIT %s OFFSET %s
             """,
-            [q, q, q, q, PAGE_SIZE, offset],
+            [*s.where_params, *s.order_params, PAGE_SIZE, offset],
         )
         projs = _fetchall_dict(cur)
 
@@ -887,6 +857,11 @@ def task_edit_admin(request, task_id: int):
                     """,
                     [name, desc, status, deadline, exec_sid, task_id],
                 )
+            audit.log_request(
+                request, "TASK_UPDATE",
+                task_id=task_id, project_id=task["project_id"], status=status,
+                executor_student=exec_sid,
+            )
             messages.success(request, "Задача обновлена")
             return redirect("adminboard:tasks-list")
 
@@ -904,6 +879,7 @@ def task_delete_admin(request, task_id: int):
         return resp
     with connection.cursor() as cur:
         cur.execute("DELETE FROM tasks WHERE task_id=%s", [task_id])
+    audit.log_request(request, "TASK_DELETE", task_id=task_id)
     messages.info(request, "Задача удалена")
     return redirect("adminboard:tasks-list")
 
@@ -915,30 +891,18 @@ def project_lookup(request):
     q = (request.GET.get("q") or "").strip()
     limit = min(int(request.GET.get("limit", 20) or 20), 50)
 
+    s = search.build(q, ["search_text"], "project_id DESC")
     with connection.cursor() as cur:
-        if q:
-            cur.execute(
-                """
-                SELECT project_id, project_name, specialization, project_status
-                FROM projects
-                WHERE project_name ILIKE '%%'||%s||'%%'
-                   OR specialization ILIKE '%%'||%s||'%%'
-                   OR project_id::text ILIKE '%%'||%s||'%%'
-                ORDER BY project_id DESC
-                LIMIT %s
-                """,
-                [q, q, q, limit],
-            )
-        else:
-            cur.execute(
-                """
-                SELECT project_id, project_name, specialization, project_status
-                FROM projects
-                ORDER BY project_id DESC
-                LIMIT %s
-                """,
-                [limit],
-            )
+        cur.execute(
+            f"""
+            SELECT project_id, project_name, specialization, project_status
+            FROM projects
+            WHERE {s.where}
+            ORDER BY {s.order}
+            LIMIT %s
+            """,
+            [*s.where_params, *s.order_params, limit],
+        )
         items = _fetchall_dict(cur)
 
     return JsonResponse({"items": items})
@@ -956,8 +920,7 @@ def project_members_admin(request, project_id: int):
     p_q = (
         request.GET.get("p_q") or ""
     ).strip()  # поиск среди преподавателей (в составе)
-    page = max(int(request.GET.get("page", 1) or 1), 1)
-    offset = (page - 1) * PAGE_SIZE
+    cursor = request.GET.get("cursor")
 
     with connection.cursor() as cur:
         # Проект
@@ -971,102 +934,96 @@ def project_members_admin(request, project_id: int):
         project = {"project_id": r[0], "project_name": r[1]}
 
         # Текущие студенты (с фильтром)
+        s = search.build(s_q, ["u.search_text", "s.search_text"], "fio")
         cur.execute(
-            """
+            f"""
             SELECT m.id, m.role_in_team, m.joined_at, m.left_at,
-                   s.student_id, u.last_name||' '||u.first_name||COALESCE(' '||u.middle_name,'') AS fio,
+                   s.student_id, u.full_name AS fio,
                    s.group_number, s.faculty
             FROM project_members m
             JOIN students s ON s.student_id = m.member_student
             JOIN users u    ON u.user_id    = s.user_id
             WHERE m.project_id = %s
               AND m.member_student IS NOT NULL
-              AND (%s = '' OR u.last_name ILIKE '%%'||%s||'%%'
-                           OR u.first_name ILIKE '%%'||%s||'%%'
-                           OR s.group_number ILIKE '%%'||%s||'%%'
-                           OR u.login ILIKE '%%'||%s||'%%')
-            ORDER BY fio
+              AND {s.where}
+            ORDER BY {s.order}
             """,
-            [project_id, s_q, s_q, s_q, s_q, s_q],
+            [project_id, *s.where_params, *s.order_params],
         )
         students = _fetchall_dict(cur)
 
         # Текущие преподаватели (с фильтром)
+        s = search.build(p_q, ["u.search_text", "p.search_text"], "fio")
         cur.execute(
-            """
+            f"""
             SELECT m.id, m.role_in_team, m.joined_at, m.left_at,
-                   p.professor_id, u.last_name||' '||u.first_name||COALESCE(' '||u.middle_name,'') AS fio,
+                   p.professor_id, u.full_name AS fio,
                    p.department, p.faculty
             FROM project_members m
             JOIN professors p ON p.professor_id = m.member_prof
             JOIN users u      ON u.user_id      = p.user_id
             WHERE m.project_id = %s
               AND m.member_prof IS NOT NULL
-              AND (%s = '' OR u.last_name ILIKE '%%'||%s||'%%'
-                           OR u.first_name ILIKE '%%'||%s||'%%'
-                           OR p.department ILIKE '%%'||%s||'%%'
-                           OR u.login ILIKE '%%'||%s||'%%')
-            ORDER BY fio
+              AND {s.where}
+            ORDER BY {s.order}
             """,
-            [project_id, p_q, p_q, p_q, p_q, p_q],
+            [project_id, *s.where_params, *s.order_params],
         )
         profs = _fetchall_dict(cur)
 
         # Кандидаты: исключаем всех, кто уже АКТИВЕН в проекте (left_at IS NULL)
-        candidates = []
+        # ключ (fio, user_id) — под индекс idx_users_full_name_keyset
         if sr == "student":
-            cur.execute(
-                """
-                SELECT s.student_id AS id,
-                       u.last_name||' '||u.first_name||COALESCE(' '||u.middle_name,'') AS fio,
-                       s.group_number, s.faculty
+            s = search.build(c_q, ["u.search_text", "s.search_text"], "fio")
+            page = pagination.paginate(
+                cur,
+                f"""
+                SELECT s.student_id AS id, u.user_id, u.full_name AS fio,
+                       s.group_number, s.faculty, {s.rank} AS rank
                 FROM students s
                 JOIN users u ON u.user_id = s.user_id
-                WHERE (%s = '' OR u.last_name ILIKE '%%'||%s||'%%'
-                               OR u.first_name ILIKE '%%'||%s||'%%'
-                               OR s.group_number ILIKE '%%'||%s||'%%'
-                               OR u.login ILIKE '%%'||%s||'%%')
+                WHERE {s.where}
                   AND NOT EXISTS (
                       SELECT 1 FROM project_members m
                       WHERE m.project_id = %s
                         AND m.member_student = s.student_id
                         AND m.left_at IS NULL
                   )
-                ORDER BY fio
-                LIMIT %s OFFSET %s
                 """,
-                [c_q, c_q, c_q, c_q, c_q, project_id, PAGE_SIZE, offset],
+                [*s.rank_params, *s.where_params, project_id],
+                s.keys(Key("fio"), Key("user_id")),
+                cursor,
+                PAGE_SIZE,
             )
             candidates = [
-                {"id": rid, "label": f"{fio} — гр. {grp} ({fac})"}
-                for (rid, fio, grp, fac) in cur.fetchall()
+                {"id": r["id"], "label": f"{r['fio']} — гр. {r['group_number']} ({r['faculty']})"}
+                for r in page.items
             ]
         else:
-            cur.execute(
-                """
-                SELECT p.professor_id AS id,
-                       u.last_name||' '||u.first_name||COALESCE(' '||u.middle_name,'') AS fio,
-                       p.department, p.faculty
+            s = search.build(c_q, ["u.search_text", "p.search_text"], "fio")
+            page = pagination.paginate(
+                cur,
+                f"""
+                SELECT p.professor_id AS id, u.user_id, u.full_name AS fio,
+                       p.department, p.faculty, {s.rank} AS rank
                 FROM professors p
                 JOIN users u ON u.user_id = p.user_id
-                WHERE (%s = '' OR u.last_name ILIKE '%%'||%s||'%%'
-                               OR u.first_name ILIKE '%%'||%s||'%%'
-                               OR p.department ILIKE '%%'||%s||'%%'
-                               OR u.login ILIKE '%%'||%s||'%%')
+                WHERE {s.where}
                   AND NOT EXISTS (
                       SELECT 1 FROM project_members m
                       WHERE m.project_id = %s
                         AND m.member_prof = p.professor_id
                         AND m.left_at IS NULL
                   )
-                ORDER BY fio
-                LIMIT %s OFFSET %s
                 """,
-                [c_q, c_q, c_q, c_q, c_q, project_id, PAGE_SIZE, offset],
+                [*s.rank_params, *s.where_params, project_id],
+                s.keys(Key("fio"), Key("user_id")),
+                cursor,
+                PAGE_SIZE,
             )
             candidates = [
-                {"id": rid, "label": f"{fio} — {dept} ({fac})"}
-                for (rid, fio, dept, fac) in cur.fetchall()
+                {"id": r["id"], "label": f"{r['fio']} — {r['department']} ({r['faculty']})"}
+                for r in page.items
             ]
 
     ctx = {
@@ -1078,7 +1035,6 @@ def project_members_admin(request, project_id: int):
         "s_q": s_q,
         "p_q": p_q,
         "page": page,
-        "has_next": len(candidates) == PAGE_SIZE,
         "candidates": candidates,
     }
     return render(request, "adminboard/project_members_admin.html", ctx)
@@ -1108,6 +1064,14 @@ def member_add(request, project_id: int):
                 f"INSERT INTO project_members (project_id, {'member_student' if kind == 'student' else 'member_prof'}, role_in_team) VALUES (%s,%s,%s)",
                 [project_id, pid, role],
             )
+            membership.invalidate(
+                membership.STUDENT if kind == "student" else membership.PROFESSOR,
+                int(pid),
+            )
+            audit.log_request(
+                request, "MEMBER_ADD",
+                project_id=project_id, kind=kind, person_id=int(pid), role_in_team=role,
+            )
             messages.success(request, "Участник добавлен")
     return redirect("adminboard:project-members-admin", project_id=project_id)
 
@@ -1125,6 +1089,9 @@ def member_update(request, member_id: int):
         )
         cur.execute("SELECT project_id FROM project_members WHERE id=%s", [member_id])
         project_id = cur.fetchone()[0]
+    audit.log_request(
+        request, "MEMBER_UPDATE", member_id=member_id, project_id=project_id, role_in_team=role
+    )
     messages.success(request, "Роль обновлена")
     return redirect("adminboard:project-members-admin", project_id=project_id)
 
@@ -1136,9 +1103,99 @@ def member_leave(request, member_id: int):
     if not _is_admin(request):
         return HttpResponseForbidden("Только админ")
     with connection.cursor() as cur:
-        cur.execute("SELECT project_id FROM project_members WHERE id=%s", [member_id])
+        cur.execute(
+            "SELECT project_id, member_student, member_prof FROM project_members WHERE id=%s",
+            [member_id],
+        )
         r = cur.fetchone()
         project_id = r[0] if r else None
         cur.execute("SELECT fn_member_leave(%s)", [member_id])
+    if r:
+        membership.invalidate_many(students=[r[1]], professors=[r[2]])
+    audit.log_request(request, "MEMBER_LEAVE", member_id=member_id, project_id=project_id)
     messages.info(request, "Участник исключён (закрыта дата участия)")
     return redirect("adminboard:project-members-admin", project_id=project_id or 0)
+
+
+# ---------- AUDIT ----------
+AUDIT_KEYS = [Key("log_created_at", desc=True), Key("admin_log_id", desc=True)]
+
+
+@login_required
+def audit_log(request):
+    """Журнал admin_logs: новые сверху, keyset по (log_created_at, admin_log_id)."""
+    if resp := _admin_or_403(request):
+        return resp
+
+    f = audit_filter(request.GET)
+    with connection.cursor() as cur:
+        page = pagination.paginate(
+            cur,
+            f"""
+            SELECT l.admin_log_id, l.log_created_at, l.admin_action, l.admin_id,
+                   l.actor_user_id, l.details, u.login AS actor_login, u.role AS actor_role
+            FROM admin_logs l
+            LEFT JOIN users u ON u.user_id = l.actor_user_id
+            WHERE {f.where}
+            """,
+            f.params,
+            AUDIT_KEYS,
+            request.GET.get("cursor"),
+            PAGE_SIZE,
+        )
+    for row in page.items:
+        if isinstance(row["details"], str):
+            row["details"] = json.loads(row["details"])
+        row["details_text"] = json.dumps(row["details"], ensure_ascii=False, sort_keys=True)
+
+    return render(
+        request,
+        "adminboard/audit_log.html",
+        {**f.values, "items": page.items, "page": page, "detail_keys": AUDIT_DETAIL_KEYS},
+    )
+
+
+RISK_KEYS = [Key("score", desc=True), Key("project_id", desc=True)]
+RISK_FACTORS = {
+    "pace": "не успевают по скорости",
+    "overdue": "просроченные задачи",
+    "backlog": "отчёты ждут проверки",
+    "idle": "нет активности",
+}
+
+
+@login_required
+def project_risk(request):
+    """Проекты, которые вероятнее всего не успеют к release_date (project_risk)."""
+    if resp := _admin_or_403(request):
+        return resp
+
+    with connection.cursor() as cur:
+        page = pagination.paginate(
+            cur,
+            """
+            SELECT r.project_id, r.score, r.main_factor,
+                   r.pace, r.overdue, r.backlog, r.idle,
+                   r.total_tasks, r.open_tasks, r.overdue_tasks, r.pending_reviews,
+                   r.velocity_per_week, r.weeks_needed, r.weeks_left, r.idle_days,
+                   r.computed_at, p.project_name, p.release_date
+            FROM project_risk r
+            JOIN projects p ON p.project_id = r.project_id
+            """,
+            [],
+            RISK_KEYS,
+            request.GET.get("cursor"),
+            PAGE_SIZE,
+        )
+    for row in page.items:
+        row["factor_label"] = RISK_FACTORS.get(row["main_factor"], row["main_factor"])
+
+    return render(
+        request,
+        "adminboard/project_risk.html",
+        {
+            "items": page.items,
+            "page": page,
+            "computed_at": page.items[0]["computed_at"] if page.items else None,
+        },
+    )
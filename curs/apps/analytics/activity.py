@@ -0,0 +1,53 @@
+"""
+Ряды активности проектов для спарклайнов (project_activity_daily,
+db/37_project_activity.sql). Чтение — по PK (project_id, day) диапазоном
+дней; пропущенные дни дополняются нулями в самом запросе.
+"""
+
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+
+COLUMNS = ("submissions", "approvals", "needs_fix", "tasks_created")
+DEFAULT_DAYS = 30
+MAX_DAYS = 180
+MAX_PROJECTS = 100
+
+
+def series(project_ids: list[int], days: int, today: date) -> dict:
+    """
+    {"dates": [...], "projects": {id: {"submissions": [...], ...}}} —
+    по одному числу на день, даты общие для всех проектов. Архивные проекты
+    отдаются наравне с активными: витрина показывает их всем (?show=archived).
+    """
+    start = today - timedelta(days=days - 1)
+    cols = ",\n                   ".join(
+        f"array_agg(COALESCE(a.{c}, 0) ORDER BY g.day) AS {c}" for c in COLUMNS
+    )
+    with connection.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT p.project_id,
+                   {cols}
+            FROM projects p
+            CROSS JOIN generate_series(%s::date, %s::date, interval '1 day') g(day)
+            LEFT JOIN project_activity_daily a
+                   ON a.project_id = p.project_id AND a.day = g.day::date
+            WHERE p.project_id = ANY(%s)
+            GROUP BY p.project_id
+            """,
+            [start, today, project_ids],
+        )
+        projects = {row[0]: dict(zip(COLUMNS, row[1:])) for row in cur.fetchall()}
+    return {
+        "dates": [(start + timedelta(days=i)).isoformat() for i in range(days)],
+        "projects": projects,
+    }
+
+
+def backfill() -> int:
+    """Восстановить отчётные счётчики из reports; вернёт число ячеек."""
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute("SELECT fn_project_activity_backfill()")
+            return cur.fetchone()[0]
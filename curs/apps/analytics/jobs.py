@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+
+from apps.jobs.registry import job
+
+from . import latency, repo
+
+
+@job("analytics.rebuild_project_stats", every=timedelta(hours=1), priority=150)
+def rebuild_project_stats(payload: dict):
+    """Счётчики просроченных задач меняются со временем, а не от триггеров."""
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute("SELECT fn_project_stats_rebuild()")
+
+
+@job("analytics.refresh_views", every=timedelta(minutes=15), priority=150)
+def refresh_views(payload: dict):
+    """Материализованные представления страниц статистики (db/35_analytics_mv.sql)."""
+    repo.refresh()
+
+
+@job("analytics.rebuild_review_latency", every=timedelta(days=1), priority=200)
+def rebuild_review_latency(payload: dict):
+    """Сверка review_latency_daily с reports: то, что дельты триггеров не ловят."""
+    latency.rebuild()
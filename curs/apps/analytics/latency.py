@@ -0,0 +1,184 @@
+"""
+Время проверки отчётов по сводке review_latency_daily (db/36_review_latency.sql).
+
+Квантили считаются по сложенной гистограмме: внутри корзины ранг
+интерполируется геометрически (корзины логарифмические), в корзине 0 — линейно.
+Границы корзин должны совпадать с fn_review_latency_bucket.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import connection, transaction
+
+BUCKETS = 80
+BASE_SECONDS = 60  # верхняя граница корзины 0
+STEPS = 4  # корзин на удвоение
+QUANTILES = (0.5, 0.9, 0.99)
+
+# при более длинном периоде ряд для графика собирается по неделям
+MAX_DAILY_POINTS = 120
+
+
+def bucket(seconds: float) -> int:
+    if seconds <= BASE_SECONDS:
+        return 0
+    return min(BUCKETS - 1, math.ceil(STEPS * math.log2(seconds / BASE_SECONDS)))
+
+
+def upper(i: int) -> float:
+    return BASE_SECONDS * 2 ** (i / STEPS)
+
+
+def quantile(hist: list[int], q: float) -> float | None:
+    total = sum(hist)
+    if total <= 0:
+        return None
+    rank = q * total
+    seen = 0
+    for i, n in enumerate(hist):
+        if n <= 0:
+            continue
+        if seen + n >= rank:
+            f = (rank - seen) / n
+            if i == 0:
+                return upper(0) * f
+            lo = upper(i - 1)
+            return lo * (upper(i) / lo) ** f
+        seen += n
+    return upper(BUCKETS - 1)
+
+
+@dataclass(frozen=True)
+class Stats:
+    reviews: int
+    avg: float | None
+    p50: float | None
+    p90: float | None
+    p99: float | None
+
+
+def _stats(reviews, total_seconds, hist) -> Stats:
+    hist = hist or []
+    p50, p90, p99 = (quantile(hist, q) for q in QUANTILES)
+    return Stats(
+        reviews=reviews or 0,
+        avg=total_seconds / reviews if reviews else None,
+        p50=p50,
+        p90=p90,
+        p99=p99,
+    )
+
+
+@dataclass(frozen=True)
+class Scope:
+    date_from: date
+    date_to: date  # включительно
+    project_id: int | None = None
+    professor_id: int | None = None
+
+    def where(self) -> tuple[str, list]:
+        sql = "d.day BETWEEN %s AND %s"
+        params: list = [self.date_from, self.date_to]
+        if self.project_id:
+            sql += " AND d.project_id = %s"
+            params.append(self.project_id)
+        if self.professor_id:
+            sql += " AND d.professor_id = %s"
+            params.append(self.professor_id)
+        return sql, params
+
+
+def summary(scope: Scope) -> Stats:
+    where, params = scope.where()
+    with connection.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT SUM(d.reviews), SUM(d.total_seconds)::float8, review_hist_sum(d.buckets)
+            FROM review_latency_daily d
+            WHERE {where}
+            """,
+            params,
+        )
+        return _stats(*cur.fetchone())
+
+
+def series(scope: Scope) -> tuple[str, list[dict]]:
+    """Ряд для графика: ('day' | 'week', [{period, reviews, p50, p90}])."""
+    step = "day" if (scope.date_to - scope.date_from).days < MAX_DAILY_POINTS else "week"
+    where, params = scope.where()
+    with connection.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT date_trunc('{step}', d.day)::date AS period,
+                   SUM(d.reviews), SUM(d.total_seconds)::float8, review_hist_sum(d.buckets)
+            FROM review_latency_daily d
+            WHERE {where}
+            GROUP BY 1
+            ORDER BY 1
+            """,
+            params,
+        )
+        rows = cur.fetchall()
+    points = []
+    for period, reviews, total, hist in rows:
+        s = _stats(reviews, total, hist)
+        points.append({"period": period, "reviews": s.reviews, "p50": s.p50, "p90": s.p90})
+    return step, points
+
+
+def by_professor(scope: Scope) -> list[dict]:
+    where, params = scope.where()
+    with connection.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT d.professor_id, u.full_name,
+                   SUM(d.reviews), SUM(d.total_seconds)::float8, review_hist_sum(d.buckets)
+            FROM review_latency_daily d
+            LEFT JOIN professors pr ON pr.professor_id = d.professor_id
+            LEFT JOIN users u ON u.user_id = pr.user_id
+            WHERE {where}
+            GROUP BY d.professor_id, u.full_name
+            """,
+            params,
+        )
+        rows = cur.fetchall()
+    return _ranked(
+        {"professor_id": pid, "name": name or "—", "stats": _stats(n, total, hist)}
+        for pid, name, n, total, hist in rows
+    )
+
+
+def by_project(scope: Scope, limit: int = 20) -> list[dict]:
+    where, params = scope.where()
+    with connection.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT d.project_id, p.project_name,
+                   SUM(d.reviews), SUM(d.total_seconds)::float8, review_hist_sum(d.buckets)
+            FROM review_latency_daily d
+            JOIN projects p ON p.project_id = d.project_id
+            WHERE {where}
+            GROUP BY d.project_id, p.project_name
+            """,
+            params,
+        )
+        rows = cur.fetchall()
+    return _ranked(
+        {"project_id": pid, "name": name, "stats": _stats(n, total, hist)}
+        for pid, name, n, total, hist in rows
+    )[:limit]
+
+
+def _ranked(items) -> list[dict]:
+    # дольше всех проверяют — выше
+    return sorted(items, key=lambda x: (-(x["stats"].p90 or 0), -x["stats"].reviews))
+
+
+def rebuild() -> int:
+    """Полный пересчёт сводки из reports; вернёт число ячеек."""
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute("SELECT fn_review_latency_rebuild()")
+            return cur.fetchone()[0]
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics.activity import backfill
+
+
+class Command(BaseCommand):
+    help = "Rebuild report counters in project_activity_daily from reports (tasks_created is kept)."
+
+    def handle(self, *args, **kwargs):
+        cells = backfill()
+        self.stdout.write(self.style.SUCCESS(f"project_activity_daily backfilled: {cells} cells"))
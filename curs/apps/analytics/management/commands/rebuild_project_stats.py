@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = "Recompute project_stats for all projects (backfill / refresh overdue counters)."
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            with connection.cursor() as cur:
+                cur.execute("SELECT fn_project_stats_rebuild()")
+                count = cur.fetchone()[0]
+        self.stdout.write(self.style.SUCCESS(f"project_stats rebuilt: {count} projects"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics.latency import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute review_latency_daily from reports (backfill / reconcile)."
+
+    def handle(self, *args, **kwargs):
+        cells = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"review_latency_daily rebuilt: {cells} cells"))
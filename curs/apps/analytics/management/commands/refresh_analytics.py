@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics.repo import refresh
+
+
+class Command(BaseCommand):
+    help = "Refresh analytics materialized views (REFRESH MATERIALIZED VIEW CONCURRENTLY)."
+
+    def handle(self, *args, **kwargs):
+        refreshed_at = refresh()
+        self.stdout.write(self.style.SUCCESS(f"analytics views refreshed at {refreshed_at:%Y-%m-%d %H:%M:%S}"))
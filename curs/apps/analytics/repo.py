@@ -0,0 +1,66 @@
+"""
+Чтение материализованных представлений статистики (db/35_analytics_mv.sql,
+db/42_analytics_refresh_log.sql) и их обновление. Страницы ходят только
+сюда — не в tasks/reports.
+"""
+
+from django.db import connection, transaction
+
+from apps.projects.repo import fetchall_dict
+
+
+def refresh():
+    """REFRESH ... CONCURRENTLY всех представлений; вернёт время обновления."""
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute("SELECT fn_analytics_refresh()")
+            return cur.fetchone()[0]
+
+
+def refreshed_at():
+    """Время последнего обновления представлений (None — ещё не обновлялись)."""
+    with connection.cursor() as cur:
+        cur.execute("SELECT refreshed_at FROM analytics_refresh")
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def top_projects(limit: int = 10):
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT position, project_id, project_name, specialization,
+                   total, done, ratio_pct
+            FROM mv_project_ranking
+            WHERE position <= %s
+            ORDER BY position
+            """,
+            [limit],
+        )
+        return fetchall_dict(cur)
+
+
+def specialization_totals():
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT specialization, projects, active_projects,
+                   total_tasks, done_tasks, overdue_tasks, ratio_pct
+            FROM mv_specialization_totals
+            ORDER BY projects DESC, specialization
+            """
+        )
+        return fetchall_dict(cur)
+
+
+def faculty_completion():
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT faculty, students, tasks, done_tasks, overdue_tasks, ratio_pct,
+                   reports, approved_reports, returned_reports
+            FROM mv_faculty_completion
+            ORDER BY ratio_pct DESC, faculty
+            """
+        )
+        return fetchall_dict(cur)
@@ -0,0 +1,18 @@
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def duration(seconds):
+    """Секунды → «2 д 4 ч», «3 ч 20 мин», «45 мин»; None → «—»."""
+    if seconds is None:
+        return "—"
+    minutes = round(seconds / 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days} д {hours} ч"
+    if hours:
+        return f"{hours} ч {minutes} мин"
+    return f"{minutes} мин"
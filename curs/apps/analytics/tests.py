@@ -1,3 +1,40 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from apps.analytics import latency
+from apps.analytics.templatetags.analytics_extras import duration
+
+
+class LatencyHistogramTests(SimpleTestCase):
+    def _hist(self, samples):
+        hist = [0] * latency.BUCKETS
+        for s in samples:
+            hist[latency.bucket(s)] += 1
+        return hist
+
+    def test_bucket_bounds(self):
+        self.assertEqual(latency.bucket(0), 0)
+        self.assertEqual(latency.bucket(60), 0)
+        self.assertEqual(latency.bucket(61), 1)
+        self.assertEqual(latency.bucket(120), 4)
+        self.assertEqual(latency.bucket(10**12), latency.BUCKETS - 1)
+        for i in range(1, 60):
+            self.assertEqual(latency.bucket(latency.upper(i) * 0.999), i)
+
+    def test_quantiles_within_bucket_error(self):
+        # от 10 минут до ~7 суток равномерно
+        samples = [600 + k * 600 for k in range(1000)]
+        hist = self._hist(samples)
+        for q in latency.QUANTILES:
+            exact = samples[int(q * len(samples)) - 1]
+            est = latency.quantile(hist, q)
+            self.assertLess(abs(est - exact) / exact, 0.19, q)
+
+    def test_empty(self):
+        self.assertIsNone(latency.quantile([0] * latency.BUCKETS, 0.5))
+        self.assertIsNone(latency._stats(None, None, None).p90)
+
+    def test_duration(self):
+        self.assertEqual(duration(None), "—")
+        self.assertEqual(duration(45 * 60), "45 мин")
+        self.assertEqual(duration(3 * 3600 + 20 * 60), "3 ч 20 мин")
+        self.assertEqual(duration(2 * 86400 + 4 * 3600), "2 д 4 ч")
@@ -1,9 +1,18 @@
 from django.urls import path
-from .views import AnalyticsHome, ProjectsRankingView
+from .views import (
+    AnalyticsHome,
+    ProjectsRankingView,
+    activity_series,
+    refresh_now,
+    review_latency,
+)
 
 app_name = "analytics"
 
 urlpatterns = [
     path("", AnalyticsHome.as_view(), name="analytics_home"),
     path("projects/", ProjectsRankingView.as_view(), name="projects_ranking"),
+    path("refresh/", refresh_now, name="refresh"),
+    path("reviews/", review_latency, name="review_latency"),
+    path("activity/", activity_series, name="activity"),
 ]
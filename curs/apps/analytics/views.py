@@ -1,10 +1,46 @@
+from datetime import timedelta
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponseForbidden, JsonResponse
+from django.shortcuts import redirect, render
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_GET, require_POST
 from django.views.generic import TemplateView
 from django.db import connection
 
+from apps.common import pagination
+from apps.common.pagination import Key
+from apps.jobs import queue as jobs
+from . import activity, latency, repo
+
 
 class AnalyticsHome(TemplateView):
     template_name = "analytics/home.html"
 
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["top_projects"] = repo.top_projects()
+        ctx["specializations"] = repo.specialization_totals()
+        ctx["faculties"] = repo.faculty_completion()
+        ctx["refreshed_at"] = repo.refreshed_at()
+        return ctx
+
+
+@login_required
+@require_POST
+def refresh_now(request):
+    """Внеочередное обновление представлений — через очередь, не в запросе."""
+    if getattr(request.user, "role", None) != "ADMIN":
+        return HttpResponseForbidden("Только для администраторов")
+    if jobs.enqueue("analytics.refresh_views", priority=50, dedup_key="manual"):
+        messages.success(request, "Обновление статистики поставлено в очередь")
+    else:
+        messages.info(request, "Обновление уже выполняется")
+    return redirect("analytics:analytics_home")
+
 
 PAGE_SIZE = 100
 
@@ -12,54 +48,122 @@ PAGE_SIZE = 100
 class ProjectsRankingView(TemplateView):
     template_name = "analytics/projects_ranking.html"
 
+    # место в рейтинге посчитано в mv_project_ranking, листаем по его индексу
+    KEYS = [Key("position")]
+
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        page = max(int(self.request.GET.get("page", 1)), 1)
-        offset = (page - 1) * PAGE_SIZE
 
         with connection.cursor() as cur:
-            cur.execute(
+            page = pagination.paginate(
+                cur,
                 """
-                WITH t AS (
-                  SELECT t.project_id,
-                         COUNT(*) AS total,
-                         COUNT(*) FILTER (WHERE t.task_status='done') AS done
-                  FROM tasks t
-                  GROUP BY t.project_id
-                ),
-                ra AS (
-                  SELECT t.project_id,
-                         MAX(COALESCE(r.reviewed_at, r.submitted_at)) AS last_activity
-                  FROM tasks t
-                  LEFT JOIN reports r ON r.task_id = t.task_id
-                  GROUP BY t.project_id
-                )
-                SELECT p.project_id,
-                       p.project_name,
-                       p.project_status,
-                       p.release_date,
-                       p.specialization,
-                       COALESCE(t.total, 0) AS total,
-                       COALESCE(t.done, 0)  AS done,
-                       CASE
-                         WHEN COALESCE(t.total,0) = 0 THEN 0
-                         ELSE ROUND(100.0 * COALESCE(t.done,0) / t.total, 2)
-                       END AS ratio_pct,                -- 0..100
-                       ra.last_activity
-                FROM projects p
-                LEFT JOIN t  ON t.project_id  = p.project_id
-                LEFT JOIN ra ON ra.project_id = p.project_id
-                ORDER BY ratio_pct DESC,
-                         COALESCE(t.total,0) DESC,
-                         ra.last_activity DESC NULLS LAST,
-                         p.project_id DESC
-                LIMIT %s OFFSET %s
+                SELECT position, project_id, project_name, project_status,
+                       release_date, specialization,
+                       total, done, ratio_pct,          -- ratio_pct 0..100
+                       last_activity
+                FROM mv_project_ranking
                 """,
-                [PAGE_SIZE, offset],
+                [],
+                self.KEYS,
+                self.request.GET.get("cursor"),
+                PAGE_SIZE,
             )
-            cols = [c[0] for c in cur.description]
-            ctx["items"] = [dict(zip(cols, r)) for r in cur.fetchall()]
 
+        ctx["items"] = page.items
         ctx["page"] = page
-        ctx["page_size"] = PAGE_SIZE
+        ctx["refreshed_at"] = repo.refreshed_at()
         return ctx
+
+
+REVIEW_DEFAULT_DAYS = 90
+CHART_W, CHART_H = 720, 180
+
+
+def _date_arg(value: str | None):
+    try:
+        return parse_date(value) if value else None
+    except ValueError:
+        return None
+
+
+def _int_arg(value: str | None):
+    return int(value) if value and value.isdigit() else None
+
+
+def _chart(points: list[dict]) -> dict | None:
+    """Координаты ломаных p50/p90 для inline-SVG; ось Y — часы от нуля."""
+    if not points:
+        return None
+    top = max((p["p90"] or 0) for p in points) or 1
+    n = len(points)
+
+    def line(key):
+        return " ".join(
+            f"{CHART_W * i / max(n - 1, 1):.1f},{CHART_H - CHART_H * (p[key] or 0) / top:.1f}"
+            for i, p in enumerate(points)
+        )
+
+    return {
+        "w": CHART_W,
+        "h": CHART_H,
+        "p50": line("p50"),
+        "p90": line("p90"),
+        "top": top,
+        "first": points[0]["period"],
+        "last": points[-1]["period"],
+    }
+
+
+@login_required
+def review_latency(request):
+    """Время от сдачи отчёта до проверки: квантили по сводке review_latency_daily."""
+    ident = request.identity
+    if ident.role not in ("PROFESSOR", "ADMIN"):
+        return HttpResponseForbidden("Нет доступа")
+    # без профиля фильтр по преподавателю пропал бы и открыл чужие проверки
+    if ident.role == "PROFESSOR" and not ident.professor_id:
+        raise Http404("Преподаватель не найден")
+
+    today = timezone.localdate()
+    date_to = _date_arg(request.GET.get("to")) or today
+    date_from = _date_arg(request.GET.get("from")) or date_to - timedelta(days=REVIEW_DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        date_from, date_to = date_to, date_from
+
+    # преподаватель видит только свои проверки
+    professor_id = _int_arg(request.GET.get("professor")) if ident.role == "ADMIN" else ident.professor_id
+    scope = latency.Scope(date_from, date_to, _int_arg(request.GET.get("project")), professor_id)
+
+    step, points = latency.series(scope)
+    return render(
+        request,
+        "analytics/review_latency.html",
+        {
+            "scope": scope,
+            "summary": latency.summary(scope),
+            "step": step,
+            "chart": _chart(points),
+            "professors": latency.by_professor(scope) if ident.role == "ADMIN" and not professor_id else [],
+            "projects": latency.by_project(scope) if not scope.project_id else [],
+        },
+    )
+
+
+@require_GET
+@cache_control(private=True, max_age=300)
+def activity_series(request):
+    """
+    ?ids=1,2,3&days=30 → компактные ряды для спарклайнов (static/sparklines.js).
+    Доступность — как у витрины: активные и архивные проекты видны всем.
+    """
+    ids = []
+    for part in (request.GET.get("ids") or "").split(","):
+        if part.strip().isdigit():
+            ids.append(int(part))
+    ids = list(dict.fromkeys(ids))[: activity.MAX_PROJECTS]
+    days = _int_arg(request.GET.get("days")) or activity.DEFAULT_DAYS
+    days = max(1, min(days, activity.MAX_DAYS))
+    if not ids:
+        return JsonResponse({"dates": [], "projects": {}})
+    return JsonResponse(activity.series(ids, days, timezone.localdate()))
@@ -0,0 +1,208 @@
+"""
+Журнал действий (admin_logs) без синхронного INSERT на каждое действие.
+
+События копятся в ограниченной очереди процесса и пишутся пачками одним
+INSERT ... SELECT FROM unnest(...) из фонового потока — по заполнении пачки
+(AUDIT_BATCH_SIZE) или по времени (AUDIT_FLUSH_SECONDS). Пишет только
+выделенное соединение писателя (connections.create_connection): ни поток,
+ни drain() в потоке запроса не трогают соединение запроса — его транзакцию,
+SET ROLE и CONN_MAX_AGE.
+
+AUDIT_LOG_DURABILITY:
+  "buffered" — событие попадает в очередь после коммита транзакции
+               вызывающего кода (on_commit): откаченное действие не
+               журналируется. При падении процесса теряется не больше
+               одной невыписанной пачки;
+  "sync"     — INSERT сразу, в транзакции вызывающего кода (под savepoint):
+               запись в журнале есть тогда и только тогда, когда
+               закоммичено само действие; ошибка записи — ошибка действия.
+
+Противодавление: при полной очереди (AUDIT_QUEUE_MAX) вызывающий ждёт
+до AUDIT_BLOCK_SECONDS, а затем сам выписывает накопленное (через то же
+соединение писателя) — из-за переполнения события не теряются, просто
+запрос платит за запись. Пачка, не записанная за _RETRIES попыток
+(БД недоступна), выбрасывается с ошибкой в логе.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.db import DatabaseError, connection, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_RETRIES = 3
+
+
+@dataclass(frozen=True)
+class Event:
+    action: str
+    created_at: datetime
+    actor_user_id: int | None
+    admin_id: int | None
+    details: str  # уже сериализованный JSON
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _insert(cur, events: list[Event]):
+    cur.execute(
+        """
+        INSERT INTO admin_logs (admin_id, admin_action, log_created_at, actor_user_id, details)
+        SELECT * FROM unnest(%s::bigint[], %s::varchar[], %s::timestamptz[], %s::bigint[], %s::jsonb[])
+        """,
+        [
+            [e.admin_id for e in events],
+            [e.action for e in events],
+            [e.created_at for e in events],
+            [e.actor_user_id for e in events],
+            [e.details for e in events],
+        ],
+    )
+
+
+# --- фоновая запись -------------------------------------------------------------
+
+
+class _Writer:
+    def __init__(self):
+        self.pid = os.getpid()
+        self.queue = queue.Queue(maxsize=_setting("AUDIT_QUEUE_MAX", 10_000))
+        self.pending: list[Event] = []  # набираемая пачка; под lock
+        self.lock = threading.Lock()  # пишет кто-то один: поток или drain()
+        self.conn = None  # своё соединение; создаётся и используется под lock
+        self.thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, event: Event):
+        try:
+            self.queue.put(event, timeout=_setting("AUDIT_BLOCK_SECONDS", 0.5))
+        except queue.Full:
+            logger.warning("audit queue full, flushing in the caller")
+            self.drain()
+            self.queue.put(event)
+
+    def _run(self):
+        size = _setting("AUDIT_BATCH_SIZE", 200)
+        interval = _setting("AUDIT_FLUSH_SECONDS", 2.0)
+        while True:
+            event = self.queue.get()
+            # добираем пачку, но не дольше interval с первого события
+            deadline = time.monotonic() + interval
+            while True:
+                with self.lock:
+                    self.pending.append(event)
+                    full = len(self.pending) >= size
+                left = deadline - time.monotonic()
+                if full or left <= 0:
+                    break
+                try:
+                    event = self.queue.get(timeout=left)
+                except queue.Empty:
+                    break
+            with self.lock:
+                batch, self.pending = self.pending, []
+                if batch:
+                    self._write(batch)
+
+    def drain(self):
+        """Выписать набираемую пачку и всё, что в очереди (из любого потока)."""
+        size = _setting("AUDIT_BATCH_SIZE", 200)
+        with self.lock:
+            batch, self.pending = self.pending, []
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for i in range(0, len(batch), size):
+                self._write(batch[i : i + size])
+
+    def _connection(self):
+        if self.conn is None:
+            self.conn = connections.create_connection("default")
+            # пишут поток и drain() из потоков запросов — всегда под self.lock
+            self.conn.inc_thread_sharing()
+        return self.conn
+
+    def _write(self, batch: list[Event]):
+        for attempt in range(1, _RETRIES + 1):
+            conn = self._connection()
+            try:
+                # соединение долгоживущее: протухшее переоткроется
+                conn.close_if_unusable_or_obsolete()
+                with conn.cursor() as cur:
+                    _insert(cur, batch)
+                return
+            except DatabaseError:
+                logger.exception("audit: batch of %s not written (attempt %s)", len(batch), attempt)
+                conn.close()
+                time.sleep(0.2 * attempt)
+        logger.error("audit: dropped %s events: %s", len(batch), [e.action for e in batch])
+
+
+_writer: _Writer | None = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer() -> _Writer:
+    global _writer
+    # после fork (run_workers, gunicorn --preload) поток родителя не существует
+    if _writer is None or _writer.pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer.pid != os.getpid():
+                _writer = _Writer()
+    return _writer
+
+
+def flush():
+    """Дописать очередь синхронно: перед выходом процесса, в командах и тестах."""
+    if _writer is not None and _writer.pid == os.getpid():
+        _writer.drain()
+
+
+atexit.register(flush)
+
+
+# --- API ------------------------------------------------------------------------
+
+
+def log(action: str, actor_user_id: int | None = None, admin_id: int | None = None, **details):
+    """
+    Записать событие в admin_logs согласно AUDIT_LOG_DURABILITY.
+    details сериализуются сразу: ошибка сериализации — ошибка вызывающего.
+    """
+    event = Event(
+        action=action,
+        created_at=timezone.now(),
+        actor_user_id=actor_user_id,
+        admin_id=admin_id,
+        details=json.dumps(details, ensure_ascii=False, default=str),
+    )
+    if _setting("AUDIT_LOG_DURABILITY", "buffered") == "sync":
+        with transaction.atomic(), connection.cursor() as cur:
+            _insert(cur, [event])
+        return
+    transaction.on_commit(lambda: _get_writer().put(event))
+
+
+def log_request(request, action: str, **details):
+    """log() от имени пользователя запроса: actor — users.user_id, admin_id — для ADMIN."""
+    ident = getattr(request, "identity", None)
+    log(
+        action,
+        actor_user_id=ident.user_id if ident else None,
+        admin_id=ident.admin_id if ident else None,
+        **details,
+    )
@@ -0,0 +1,177 @@
+"""
+Keyset-пагинация с непрозрачным курсором.
+
+Вместо OFFSET страница продолжается «после» (или «до») ключа граничной
+строки, поэтому глубина страницы не влияет на стоимость запроса — при
+условии, что под порядок ключей есть составной индекс (db/27_keyset_indexes.sql).
+
+    page = pagination.paginate(
+        cur,
+        "SELECT p.project_id, p.project_name, ... FROM projects p WHERE ...",
+        params,
+        [Key("release_date", desc=True, nullable=True), Key("project_id", desc=True)],
+        request.GET.get("cursor"),
+        PAGE_SIZE,
+    )
+
+Внутренний запрос — без ORDER BY и LIMIT, ключи — имена его колонок;
+последний ключ должен быть уникальным (обычно id). Запрос оборачивается
+в подзапрос, PostgreSQL разворачивает его, и условие по ключам доходит до
+индекса. NULL у nullable-ключей всегда в конце (NULLS LAST).
+Курсор подписан (django.core.signing), подделать значения ключа нельзя.
+"""
+
+import datetime
+import zlib
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.core import signing
+
+_SALT = "common.pagination"
+NEXT = "n"
+PREV = "p"
+
+
+@dataclass(frozen=True)
+class Key:
+    column: str
+    desc: bool = False
+    nullable: bool = False
+
+
+@dataclass
+class Page:
+    items: list
+    has_next: bool = False
+    has_prev: bool = False
+    next_cursor: str = ""
+    prev_cursor: str = ""
+    size: int = 0
+
+
+def _fingerprint(keys) -> int:
+    spec = ",".join(f"{k.column}:{int(k.desc)}:{int(k.nullable)}" for k in keys)
+    return zlib.crc32(spec.encode())
+
+
+def _encode_value(v):
+    if isinstance(v, (datetime.datetime, datetime.date)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    return v
+
+
+def encode_cursor(keys, direction: str, row: dict) -> str:
+    values = [_encode_value(row[k.column]) for k in keys]
+    return signing.dumps(
+        {"d": direction, "k": _fingerprint(keys), "v": values}, salt=_SALT
+    )
+
+
+def decode_cursor(keys, cursor: str | None):
+    """(direction, values) или (None, None) для первой страницы."""
+    if not cursor:
+        return None, None
+    try:
+        data = signing.loads(cursor, salt=_SALT)
+    except signing.BadSignature:
+        return None, None
+    if (
+        data.get("k") != _fingerprint(keys)
+        or data.get("d") not in (NEXT, PREV)
+        or len(data.get("v") or ()) != len(keys)
+    ):
+        return None, None
+    # строки дат/чисел уходят в запрос нетипизированными литералами —
+    # PostgreSQL приводит их к типу колонки
+    return data["d"], data["v"]
+
+
+def _effective(keys, reverse: bool):
+    """(column, desc, nulls_first, nullable) в порядке текущего запроса."""
+    return [
+        (k.column, k.desc != reverse, reverse and k.nullable, k.nullable)
+        for k in keys
+    ]
+
+
+def _order_sql(eff) -> str:
+    parts = []
+    for col, desc, nulls_first, nullable in eff:
+        part = f"{col} {'DESC' if desc else 'ASC'}"
+        if nullable:
+            part += " NULLS FIRST" if nulls_first else " NULLS LAST"
+        parts.append(part)
+    return ", ".join(parts)
+
+
+def _after_sql(eff, values):
+    """Условие «строго после values» в порядке eff."""
+    if not any(n for *_, n in eff) and len({d for _, d, _, _ in eff}) == 1:
+        # одно направление и без NULL — сравнение строк, идеально ложится на индекс
+        op = "<" if eff[0][1] else ">"
+        cols = ", ".join(c for c, *_ in eff)
+        marks = ", ".join(["%s"] * len(eff))
+        return f"({cols}) {op} ({marks})", list(values)
+
+    ors, params = [], []
+    eq_sql, eq_params = [], []
+    for (col, desc, nulls_first, nullable), v in zip(eff, values):
+        if v is None:
+            gt, gt_params = (f"{col} IS NOT NULL", []) if nulls_first else (None, [])
+        else:
+            gt = f"{col} {'<' if desc else '>'} %s"
+            gt_params = [v]
+            if nullable and not nulls_first:
+                gt = f"({gt} OR {col} IS NULL)"
+        if gt:
+            ors.append("(" + " AND ".join(eq_sql + [gt]) + ")")
+            params += eq_params + gt_params
+        if v is None:
+            eq_sql.append(f"{col} IS NULL")
+        else:
+            eq_sql.append(f"{col} = %s")
+            eq_params.append(v)
+    return ("(" + " OR ".join(ors) + ")") if ors else "FALSE", params
+
+
+def paginate(cur, sql: str, params, keys, cursor: str | None, size: int) -> Page:
+    direction, values = decode_cursor(keys, cursor)
+    reverse = direction == PREV
+    eff = _effective(keys, reverse)
+
+    where, where_params = ("TRUE", []) if values is None else _after_sql(eff, values)
+    cur.execute(
+        f"""
+        SELECT * FROM (
+        {sql}
+        ) AS page_q
+        WHERE {where}
+        ORDER BY {_order_sql(eff)}
+        LIMIT %s
+        """,
+        [*params, *where_params, size + 1],
+    )
+    cols = [c[0] for c in cur.description]
+    rows = [dict(zip(cols, r)) for r in cur.fetchall()]
+
+    more = len(rows) > size
+    rows = rows[:size]
+    if reverse:
+        rows.reverse()
+        has_prev, has_next = more, True
+    else:
+        has_prev, has_next = direction == NEXT, more
+
+    page = Page(
+        items=rows,
+        has_next=has_next and bool(rows),
+        has_prev=has_prev and bool(rows),
+        size=size,
+    )
+    if rows:
+        page.next_cursor = encode_cursor(keys, NEXT, rows[-1])
+        page.prev_cursor = encode_cursor(keys, PREV, rows[0])
+    return page
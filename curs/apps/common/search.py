@@ -0,0 +1,86 @@
+"""
+Общий построитель поиска по search_text (pg_trgm, db/26_search_trgm.sql).
+
+    s = search.build(q, ["u.search_text", "s.search_text"], "fio")
+    cur.execute(f"... WHERE {s.where} ... ORDER BY {s.order} LIMIT %s",
+                [*s.where_params, *s.order_params, limit])
+
+Совпадение — подстрока (ILIKE '%q%', идёт по GIN-индексу триграмм),
+порядок — по word_similarity(), при равенстве — по переданному order.
+Для keyset-пагинации ранг выбирается колонкой rank и идёт первым ключом:
+
+    pagination.paginate(
+        cur,
+        f"SELECT ..., {s.rank} AS rank FROM ... WHERE {s.where}",
+        [*s.rank_params, *s.where_params],
+        s.keys(Key("user_id", desc=True)),
+        cursor,
+        PAGE_SIZE,
+    )
+
+Имена колонок подставляются в SQL как есть: только литералы из кода.
+"""
+
+from typing import NamedTuple, Sequence
+
+from .pagination import Key
+
+MAX_QUERY_LEN = 100
+
+
+class Search(NamedTuple):
+    where: str
+    where_params: list
+    order: str
+    order_params: list
+    rank: str
+    rank_params: list
+
+    @property
+    def active(self) -> bool:
+        return bool(self.where_params)
+
+    def keys(self, *keys: Key) -> list[Key]:
+        """Ключи пагинации: при активном поиске сначала ранг."""
+        return [Key("rank", desc=True), *keys] if self.active else list(keys)
+
+
+def normalize(q: str | None) -> str:
+    """Обрезка, схлопывание пробелов, нижний регистр (как в search_text)."""
+    return " ".join((q or "").split())[:MAX_QUERY_LEN].lower()
+
+
+def like_pattern(q: str) -> str:
+    """'%q%' с экранированием спецсимволов LIKE."""
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def build(q: str | None, columns: Sequence[str], order: str) -> Search:
+    """
+    Пустой q — без фильтра и с исходным порядком, чтобы шаблоны запросов
+    не ветвились.
+    """
+    q = normalize(q)
+    if not q:
+        return Search("TRUE", [], order, [], "0::float8", [])
+
+    pattern = like_pattern(q)
+    where = "(" + " OR ".join(f"{c} ILIKE %s" for c in columns) + ")"
+    # float8: ранг попадает в курсор пагинации и должен сравниваться точно
+    if len(columns) == 1:
+        rank = f"word_similarity(%s, {columns[0]})::float8"
+    else:
+        rank = (
+            "GREATEST("
+            + ", ".join(f"word_similarity(%s, COALESCE({c}, ''))" for c in columns)
+            + ")::float8"
+        )
+    return Search(
+        where,
+        [pattern] * len(columns),
+        f"{rank} DESC, {order}",
+        [q] * len(columns),
+        rank,
+        [q] * len(columns),
+    )
@@ -0,0 +1,153 @@
+"""
+Отдача файлов из MEDIA_ROOT после проверки прав во view.
+
+Сам файл Python не читает, если настроен фронт-сервер (SENDFILE_BACKEND):
+  nginx  — X-Accel-Redirect на internal-location, например
+
+      location /protected-media/ {
+          internal;
+          alias /srv/curs/media/;
+      }
+
+  apache — X-Sendfile с абсолютным путём (mod_xsendfile).
+
+Range, ETag и If-Modified-Since в этом случае обрабатывает сервер.
+Без бэкенда — FileResponse: gunicorn и другие WSGI-серверы с file_wrapper
+отдают его через os.sendfile, а Range/ETag/Last-Modified считаются здесь.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _RangeFile:
+    """
+    Окно [start, start+length) открытого файла. fileno() оставлен, чтобы
+    wsgi.file_wrapper мог отдать его через sendfile: позиция уже выставлена,
+    а длину ограничивает Content-Length.
+    """
+
+    def __init__(self, f, start: int, length: int):
+        f.seek(start)
+        self._f = f
+        self._left = length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._left <= 0:
+            return b""
+        if size < 0 or size > self._left:
+            size = self._left
+        data = self._f.read(size)
+        self._left -= len(data)
+        return data
+
+    def fileno(self):
+        return self._f.fileno()
+
+    def close(self):
+        self._f.close()
+
+
+def _etag(path: str, st: os.stat_result) -> str:
+    # имя блоба — SHA-256 содержимого (apps/reports/storage.py), для остальных — mtime+размер
+    name = os.path.basename(path).split(".", 1)[0]
+    if len(name) == 64 and all(c in "0123456789abcdef" for c in name):
+        return f'"{name}"'
+    return f'"{int(st.st_mtime):x}-{st.st_size:x}"'
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """(start, end) включительно; None — заголовка нет или он многодиапазонный."""
+    m = _RANGE.match(header.strip())
+    if not m or not any(m.groups()):
+        return None
+    first, last = m.groups()
+    if not first:  # bytes=-N — последние N байт
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError
+    return start, end
+
+
+def _if_range_ok(request, etag: str, mtime: int) -> bool:
+    value = request.META.get("HTTP_IF_RANGE")
+    if not value:
+        return True
+    if value.startswith('"'):
+        return value == etag
+    date = parse_http_date_safe(value)
+    return date is not None and date >= mtime
+
+
+def serve(
+    request, path: str, filename: str, content_type: str | None = None, inline: bool = False
+):
+    """path — относительный путь в MEDIA_ROOT (как в reports.file_path); inline — показать, а не скачать."""
+    full = default_storage.path(path)
+    try:
+        st = os.stat(full)
+    except FileNotFoundError:
+        raise Http404("Файл не найден")
+
+    content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    backend = getattr(settings, "SENDFILE_BACKEND", "")
+    if backend in ("nginx", "apache"):
+        response = HttpResponse(content_type=content_type)
+        response["Content-Disposition"] = content_disposition_header(not inline, filename)
+        if backend == "nginx":
+            prefix = settings.SENDFILE_NGINX_PREFIX.rstrip("/")
+            response["X-Accel-Redirect"] = quote(f"{prefix}/{path}")
+        else:
+            response["X-Sendfile"] = full
+        return response
+
+    etag = _etag(path, st)
+    mtime = int(st.st_mtime)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if not_modified is not None:
+        return not_modified
+
+    size = st.st_size
+    byte_range = None
+    if request.method == "GET" and _if_range_ok(request, etag, mtime):
+        try:
+            byte_range = _parse_range(request.META.get("HTTP_RANGE", ""), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    f = open(full, "rb")
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(
+            _RangeFile(f, start, end - start + 1),
+            as_attachment=not inline,
+            filename=filename,
+            content_type=content_type,
+            status=206,
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    else:
+        response = FileResponse(
+            f, as_attachment=not inline, filename=filename, content_type=content_type
+        )
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(mtime)
+    response["Cache-Control"] = "private, max-age=0, must-revalidate"
+    return response
@@ -0,0 +1,229 @@
+"""
+Потоковая выгрузка больших выборок: серверный курсор + StreamingHttpResponse.
+
+Строки читаются именованным курсором PostgreSQL пачками по itersize, сразу
+форматируются и отдаются клиенту — память не зависит от размера выборки.
+
+Генератор ответа выполняется уже после выхода из middleware, поэтому роль
+БД ставится заново (db_role_context), а именованный курсор живёт внутри
+transaction.atomic(): вне транзакции SET LOCAL роли не дожил бы до FETCH.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+from apps.accounts.middleware import db_role_context
+
+ITERSIZE = 2000
+FLUSH_EVERY = 500  # строк на один chunk ответа
+
+
+def iter_rows(request, sql: str, params, itersize: int = ITERSIZE):
+    """Строки запроса через серверный курсор, под ролью пользователя запроса."""
+    with db_role_context(request), transaction.atomic():
+        with connection.chunked_cursor() as cur:
+            cur.cursor.itersize = itersize
+            cur.execute(sql, params)
+            yield from cur
+
+
+# --- CSV ---------------------------------------------------------------------
+
+
+def _csv_value(v):
+    if v is None:
+        return ""
+    if isinstance(v, datetime):
+        return v.isoformat(sep=" ", timespec="seconds")
+    return v
+
+
+def iter_csv(header, rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")  # BOM: Excel иначе не узнаёт UTF-8 с кириллицей
+    writer.writerow(header)
+    for i, row in enumerate(rows, 1):
+        writer.writerow([_csv_value(v) for v in row])
+        if i % FLUSH_EVERY == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+# --- XLSX --------------------------------------------------------------------
+# Минимальный SpreadsheetML: один лист, inline-строки, без стилей.
+# zipfile умеет писать в поток без seek (data descriptors), поэтому архив
+# собирается на лету, а не в памяти.
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+</Relationships>"""
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+# символы, запрещённые в XML 1.0
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# символы, запрещённые Excel в имени листа
+_SHEET_ILLEGAL = re.compile(r"[\[\]:*?/\\]")
+
+
+class _Sink(io.RawIOBase):
+    """Приёмник без seek для zipfile: копит байты до следующего yield."""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _xlsx_cell(v) -> str:
+    if v is None:
+        return "<c/>"
+    if isinstance(v, bool):
+        return f'<c t="b"><v>{int(v)}</v></c>'
+    if isinstance(v, (int, float, Decimal)):
+        return f"<c><v>{v}</v></c>"
+    if isinstance(v, datetime):
+        v = v.isoformat(sep=" ", timespec="seconds")
+    elif isinstance(v, date):
+        v = v.isoformat()
+    text = escape(_XML_ILLEGAL.sub("", str(v)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values) -> str:
+    return "<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+
+def iter_xlsx(header, rows, sheet_name: str = "data"):
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        name = _SHEET_ILLEGAL.sub("_", _XML_ILLEGAL.sub("", sheet_name))[:31] or "data"
+        zf.writestr("xl/workbook.xml", _WORKBOOK.format(name=escape(name, {'"': "&quot;"})))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((_SHEET_HEAD + _xlsx_row(header)).encode())
+            for i, row in enumerate(rows, 1):
+                sheet.write(_xlsx_row(row).encode())
+                if i % FLUSH_EVERY == 0:
+                    yield sink.drain()
+            sheet.write(_SHEET_TAIL.encode())
+    yield sink.drain()
+
+
+# --- ZIP из файлов ---------------------------------------------------------------
+# Тот же _Sink: архив уходит клиенту по мере чтения файлов, в памяти —
+# только текущий кусок. Уже сжатые форматы кладутся без сжатия.
+
+IO_CHUNK = 64 * 1024
+_STORED_EXT = {"pdf", "docx", "xlsx", "pptx", "zip", "png", "jpg", "jpeg", "gz", "7z", "rar"}
+
+
+def _zip_compression(name: str) -> int:
+    ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    return zipfile.ZIP_STORED if ext in _STORED_EXT else zipfile.ZIP_DEFLATED
+
+
+def iter_zip(members):
+    """
+    members — пары (имя в архиве, источник): источник — путь к файлу
+    или bytes. Генератор можно дописывать на ходу, например манифестом,
+    собранным по уже отданным файлам.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", allowZip64=True) as zf:
+        for name, source in members:
+            if isinstance(source, bytes):
+                zf.writestr(name, source, compress_type=_zip_compression(name))
+                yield sink.drain()
+                continue
+            info = zipfile.ZipInfo.from_file(source, name)
+            info.compress_type = _zip_compression(name)
+            # размер пишется в data descriptor; zip64 — заранее, если файл большой
+            big = info.file_size > zipfile.ZIP64_LIMIT // 2
+            with open(source, "rb") as src, zf.open(info, "w", force_zip64=big) as dst:
+                while chunk := src.read(IO_CHUNK):
+                    dst.write(chunk)
+                    data = sink.drain()
+                    if data:  # deflate может ничего не отдать до следующего куска
+                        yield data
+    yield sink.drain()
+
+
+# --- ответ -------------------------------------------------------------------
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def export_response(request, filename: str, fmt: str, header, sql: str, params):
+    """StreamingHttpResponse с CSV/XLSX по запросу; fmt — csv|xlsx."""
+    return rows_response(filename, fmt, header, iter_rows(request, sql, params))
+
+
+def rows_response(filename: str, fmt: str, header, rows):
+    """То же для уже готового итератора строк (например, развёрнутых из массивов)."""
+    if fmt == "xlsx":
+        content = iter_xlsx(header, rows, sheet_name=filename)
+    else:
+        fmt = "csv"
+        content = iter_csv(header, rows)
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[fmt])
+    # имя может прийти из запроса (группа в ведомости): кавычки и не-ASCII
+    # кодирует content_disposition_header (filename*=utf-8''...)
+    response["Content-Disposition"] = content_disposition_header(True, f"{filename}.{fmt}")
+    return response
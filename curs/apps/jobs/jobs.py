@@ -0,0 +1,12 @@
+from datetime import timedelta
+
+from django.conf import settings
+
+from . import queue
+from .registry import job
+
+
+@job("jobs.purge", every=timedelta(days=1), priority=200)
+def purge_finished(payload: dict):
+    """Старые done/failed — статистике job_stats хватает JOBS_KEEP_DAYS."""
+    queue.purge(timedelta(days=settings.JOBS_KEEP_DAYS))
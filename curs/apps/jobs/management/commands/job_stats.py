@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+STATS_SQL = """
+WITH finished AS (
+  SELECT job_type, status, attempts,
+         EXTRACT(EPOCH FROM finished_at - started_at) AS run_s,
+         EXTRACT(EPOCH FROM started_at - run_at)      AS wait_s
+  FROM jobs
+  WHERE finished_at >= now() - %s
+),
+per_type AS (
+  SELECT job_type,
+         COUNT(*) FILTER (WHERE status = 'done')   AS done,
+         COUNT(*) FILTER (WHERE status = 'failed') AS failed,
+         COUNT(*) FILTER (WHERE attempts > 1)      AS retried,
+         AVG(run_s)                                AS avg_run,
+         percentile_cont(0.95) WITHIN GROUP (ORDER BY run_s) AS p95_run,
+         AVG(wait_s)                               AS avg_wait
+  FROM finished
+  GROUP BY job_type
+),
+backlog AS (
+  SELECT job_type,
+         COUNT(*) FILTER (WHERE status = 'queued')  AS queued,
+         COUNT(*) FILTER (WHERE status = 'running') AS running,
+         EXTRACT(EPOCH FROM now() - MIN(run_at) FILTER (
+           WHERE status = 'queued' AND run_at <= now())) AS oldest_due
+  FROM jobs
+  WHERE status IN ('queued', 'running')
+  GROUP BY job_type
+)
+SELECT COALESCE(p.job_type, b.job_type) AS job_type,
+       COALESCE(p.done, 0), COALESCE(p.failed, 0), COALESCE(p.retried, 0),
+       p.avg_run, p.p95_run, p.avg_wait,
+       COALESCE(b.queued, 0), COALESCE(b.running, 0), b.oldest_due
+FROM per_type p
+FULL JOIN backlog b ON b.job_type = p.job_type
+ORDER BY 1
+"""
+
+COLUMNS = (
+    "job_type", "done", "failed", "retried", "per_min",
+    "avg_run_s", "p95_run_s", "avg_wait_s", "queued", "running", "oldest_due_s",
+)
+
+
+def _fmt(v) -> str:
+    if v is None:
+        return "-"
+    if isinstance(v, float):
+        return f"{v:.2f}"
+    return str(v)
+
+
+class Command(BaseCommand):
+    help = "Show per-type job throughput, latency and backlog."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours", type=float, default=24,
+            help="Window for finished jobs (default: 24).",
+        )
+
+    def handle(self, *args, **opts):
+        window = timedelta(hours=opts["hours"])
+        with connection.cursor() as cur:
+            cur.execute(STATS_SQL, [window])
+            rows = cur.fetchall()
+
+        minutes = window.total_seconds() / 60
+        table = [COLUMNS]
+        for job_type, done, failed, retried, avg_run, p95_run, avg_wait, queued, running, oldest in rows:
+            table.append(
+                tuple(
+                    _fmt(v)
+                    for v in (
+                        job_type, done, failed, retried, done / minutes,
+                        avg_run and float(avg_run), p95_run, avg_wait and float(avg_wait),
+                        queued, running, oldest and float(oldest),
+                    )
+                )
+            )
+        widths = [max(len(r[i]) for r in table) for i in range(len(COLUMNS))]
+        for r in table:
+            self.stdout.write("  ".join(v.ljust(w) for v, w in zip(r, widths)))
@@ -0,0 +1,83 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.jobs import queue
+from apps.jobs.worker import Worker
+
+
+def _child(types, burst, poll):
+    # соединение родителя закрыто до fork, каждый процесс открывает своё
+    Worker(types=types, burst=burst, poll=poll).run()
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (PostgreSQL queue, FOR UPDATE SKIP LOCKED)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-n", "--workers", type=int, default=settings.JOBS_WORKERS,
+            help="Number of worker processes (default: JOBS_WORKERS).",
+        )
+        parser.add_argument(
+            "--types", default="",
+            help="Comma-separated job types to process (default: all).",
+        )
+        parser.add_argument(
+            "--burst", action="store_true",
+            help="Exit when the queue is empty instead of waiting for new jobs.",
+        )
+        parser.add_argument(
+            "--poll", type=float, default=None,
+            help="Seconds between queue polls (default: JOBS_POLL_SECONDS).",
+        )
+
+    def handle(self, *args, **opts):
+        types = [t.strip() for t in opts["types"].split(",") if t.strip()] or None
+        n = max(opts["workers"], 1)
+        queue.sync_schedules()
+
+        if n == 1:
+            processed = Worker(types=types, burst=opts["burst"], poll=opts["poll"]).run()
+            self.stdout.write(self.style.SUCCESS(f"worker stopped, jobs processed: {processed}"))
+            return
+
+        connections.close_all()
+        ctx = multiprocessing.get_context("fork")
+        args = (types, opts["burst"], opts["poll"])
+        procs = [ctx.Process(target=_child, args=args, daemon=False) for _ in range(n)]
+        for p in procs:
+            p.start()
+
+        stopping = False
+
+        def stop(signum, _frame):
+            nonlocal stopping
+            stopping = True
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()  # SIGTERM: воркер доделает текущую задачу
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.stdout.write(f"started {n} workers: {', '.join(str(p.pid) for p in procs)}")
+
+        while procs:
+            for p in list(procs):
+                p.join(timeout=1)
+                if p.is_alive():
+                    continue
+                if stopping or opts["burst"] or p.exitcode == 0:
+                    procs.remove(p)
+                    continue
+                # упавший процесс заменяем, его задачу вернёт requeue_stale
+                self.stderr.write(f"worker {p.pid} exited with {p.exitcode}, restarting")
+                time.sleep(1)
+                replacement = ctx.Process(target=_child, args=args, daemon=False)
+                replacement.start()
+                procs[procs.index(p)] = replacement
+        self.stdout.write(self.style.SUCCESS("workers stopped"))
@@ -0,0 +1,216 @@
+"""
+Очередь фоновых задач в таблице jobs (db/30_jobs.sql).
+
+Постановка — enqueue() в текущей транзакции: задача появится у воркеров
+после коммита и пропадёт при откате, поэтому «сделать после сохранения»
+не требует on_commit. Остальное здесь — для воркера (apps/jobs/worker.py).
+"""
+
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import registry
+
+
+@dataclass(frozen=True)
+class Job:
+    job_id: int
+    job_type: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+def enqueue(
+    job_type: str,
+    payload: dict | None = None,
+    *,
+    priority: int | None = None,
+    run_at: datetime | None = None,
+    delay: timedelta | None = None,
+    dedup_key: str | None = None,
+) -> int | None:
+    """
+    Поставить задачу. None — задача с той же dedup_key уже ждёт или выполняется.
+    priority/max_attempts по умолчанию берутся из @job.
+    """
+    jt = registry.get(job_type)
+    if priority is None:
+        priority = jt.priority if jt else registry.DEFAULT_PRIORITY
+    max_attempts = jt.max_attempts if jt else registry.DEFAULT_MAX_ATTEMPTS
+    if delay is not None:
+        run_at = (run_at or timezone.now()) + delay
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT fn_job_enqueue(%s, %s::jsonb, %s::smallint, %s::timestamptz, %s, %s)",
+            [
+                job_type,
+                json.dumps(payload or {}, ensure_ascii=False, default=str),
+                priority,
+                run_at,
+                max_attempts,
+                dedup_key,
+            ],
+        )
+        return cur.fetchone()[0]
+
+
+# --- воркер --------------------------------------------------------------------
+
+
+def claim(worker: str, types: list[str] | None = None) -> Job | None:
+    """Забрать следующую готовую задачу (SKIP LOCKED — воркеры не ждут друг друга)."""
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE jobs j
+               SET status = 'running',
+                   attempts = j.attempts + 1,
+                   locked_by = %s,
+                   locked_at = now(),
+                   started_at = now(),
+                   finished_at = NULL
+             WHERE j.job_id = (
+                   SELECT job_id FROM jobs
+                   WHERE status = 'queued' AND run_at <= now()
+                     AND (%s::text[] IS NULL OR job_type = ANY(%s::text[]))
+                   ORDER BY priority, run_at, job_id
+                   LIMIT 1
+                   FOR UPDATE SKIP LOCKED
+             )
+            RETURNING j.job_id, j.job_type, j.payload, j.attempts, j.max_attempts
+            """,
+            [worker, types, types],
+        )
+        row = cur.fetchone()
+    return Job(*row) if row else None
+
+
+def complete(job: Job):
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE jobs
+               SET status = 'done', finished_at = now(), locked_by = NULL, last_error = NULL
+             WHERE job_id = %s
+            """,
+            [job.job_id],
+        )
+
+
+def backoff(attempts: int) -> timedelta:
+    """base·2^(n-1) с потолком и разбросом ±25%, чтобы повторы не шли пачкой."""
+    seconds = min(
+        settings.JOBS_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.JOBS_BACKOFF_MAX_SECONDS,
+    )
+    return timedelta(seconds=seconds * random.uniform(0.75, 1.25))
+
+
+def fail(job: Job, error: str, permanent: bool = False):
+    """Повтор с задержкой или failed, если попытки кончились."""
+    final = permanent or job.attempts >= job.max_attempts
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE jobs
+               SET status = %s::job_status,
+                   run_at = CASE WHEN %s THEN run_at ELSE now() + %s END,
+                   finished_at = CASE WHEN %s THEN now() END,
+                   locked_by = NULL,
+                   last_error = %s
+             WHERE job_id = %s
+            """,
+            [
+                "failed" if final else "queued",
+                final,
+                backoff(job.attempts),
+                final,
+                error[-4000:],
+                job.job_id,
+            ],
+        )
+
+
+def requeue_stale(stale_after: timedelta) -> int:
+    """running дольше stale_after — воркер умер: вернуть в очередь (или failed)."""
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE jobs
+               SET status = CASE WHEN attempts >= max_attempts
+                                 THEN 'failed'::job_status ELSE 'queued'::job_status END,
+                   run_at = now(),
+                   finished_at = CASE WHEN attempts >= max_attempts THEN now() END,
+                   last_error = 'worker lost: ' || COALESCE(locked_by, '?'),
+                   locked_by = NULL
+             WHERE status = 'running' AND locked_at < now() - %s
+            """,
+            [stale_after],
+        )
+        return cur.rowcount
+
+
+def purge(older_than: timedelta) -> int:
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            DELETE FROM jobs
+            WHERE status IN ('done', 'failed') AND finished_at < now() - %s
+            """,
+            [older_than],
+        )
+        return cur.rowcount
+
+
+# --- расписание ----------------------------------------------------------------
+
+
+def sync_schedules():
+    """job_schedules = периодические типы из реестра (интервал — из кода)."""
+    periodic = [jt for jt in registry.all_types() if jt.every]
+    with transaction.atomic(), connection.cursor() as cur:
+        for jt in periodic:
+            cur.execute(
+                """
+                INSERT INTO job_schedules (job_type, every_seconds)
+                VALUES (%s, %s)
+                ON CONFLICT (job_type) DO UPDATE SET every_seconds = EXCLUDED.every_seconds
+                """,
+                [jt.name, int(jt.every.total_seconds())],
+            )
+        cur.execute(
+            "DELETE FROM job_schedules WHERE NOT (job_type = ANY(%s::text[]))",
+            [[jt.name for jt in periodic]],
+        )
+
+
+def enqueue_due() -> list[str]:
+    """Поставить периодические задачи, чей срок подошёл; срок берёт один воркер."""
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute(
+                """
+                WITH due AS (
+                  SELECT job_type FROM job_schedules
+                  WHERE next_run_at <= now()
+                  FOR UPDATE SKIP LOCKED
+                )
+                UPDATE job_schedules s
+                   SET last_run_at = now(),
+                       next_run_at = now() + make_interval(secs => s.every_seconds)
+                  FROM due
+                 WHERE s.job_type = due.job_type
+                RETURNING s.job_type
+                """
+            )
+            types = [r[0] for r in cur.fetchall()]
+        for job_type in types:
+            enqueue(job_type, dedup_key="schedule")
+    return types
@@ -0,0 +1,57 @@
+"""
+Реестр типов фоновых задач.
+
+    from apps.jobs.registry import job
+
+    @job("reports.gc_blobs", every=timedelta(hours=1))
+    def gc_blobs(payload: dict):
+        ...
+
+Обработчик получает payload (dict из jobs.payload) и должен быть
+идемпотентным: после падения воркера задача выполняется повторно.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.core.exceptions import ImproperlyConfigured
+
+DEFAULT_PRIORITY = 100
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+@dataclass(frozen=True)
+class JobType:
+    name: str
+    func: Callable[[dict], None]
+    priority: int = DEFAULT_PRIORITY
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    every: timedelta | None = None  # периодическая — через job_schedules
+
+
+_REGISTRY: dict[str, JobType] = {}
+
+
+def job(
+    name: str,
+    *,
+    priority: int = DEFAULT_PRIORITY,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    every: timedelta | None = None,
+):
+    def decorator(func):
+        if name in _REGISTRY:
+            raise ImproperlyConfigured(f"job type {name!r} registered twice")
+        _REGISTRY[name] = JobType(name, func, priority, max_attempts, every)
+        return func
+
+    return decorator
+
+
+def get(name: str) -> JobType | None:
+    return _REGISTRY.get(name)
+
+
+def all_types() -> list[JobType]:
+    return list(_REGISTRY.values())
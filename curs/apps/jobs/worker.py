@@ -0,0 +1,132 @@
+"""
+Воркер очереди: забирает задачи по одной, пока не попросят остановиться.
+
+Между задачами ждёт NOTIFY jobs (fn_job_enqueue) не дольше
+JOBS_POLL_SECONDS — отложенные повторы и задачи с run_at в будущем
+подхватываются опросом. Раз в MAINTENANCE_SECONDS воркер возвращает
+в очередь зависшие running и ставит подошедшие периодические задачи.
+Задача, выполняющаяся дольше JOBS_STALE_SECONDS, считается зависшей
+и будет запущена повторно — долгую работу стоит дробить.
+"""
+
+import logging
+import os
+import select
+import signal
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, InterfaceError, OperationalError, connection
+
+from . import queue, registry
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_SECONDS = 30
+
+
+class Worker:
+    def __init__(self, types: list[str] | None = None, burst: bool = False, poll: float | None = None):
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.types = types or None
+        self.burst = burst  # выйти, когда очередь пуста
+        self.poll = settings.JOBS_POLL_SECONDS if poll is None else poll
+        self.stopping = False
+        self._listening = False
+        self._next_maintenance = 0.0
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def run(self) -> int:
+        """Вернёт число выполненных задач (для --burst)."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        processed = 0
+        logger.info("worker %s started", self.name)
+        while not self.stopping:
+            try:
+                self._maintenance()
+                job = queue.claim(self.name, self.types)
+                if job is None:
+                    if self.burst:
+                        break
+                    self._wait()
+                    continue
+                self._execute(job)
+                processed += 1
+            except (InterfaceError, OperationalError):
+                # БД перезапустилась / соединение порвалось — переподключимся
+                logger.exception("worker %s lost database connection", self.name)
+                self._reset_connection()
+                time.sleep(self.poll)
+        logger.info("worker %s stopped after %s jobs", self.name, processed)
+        return processed
+
+    # --- выполнение --------------------------------------------------------
+
+    def _execute(self, job: queue.Job):
+        jt = registry.get(job.job_type)
+        started = time.monotonic()
+        if jt is None:
+            queue.fail(job, f"unknown job type {job.job_type!r}", permanent=True)
+            logger.error("job %s: unknown type %s", job.job_id, job.job_type)
+            return
+        try:
+            jt.func(job.payload)
+        except Exception:
+            error = traceback.format_exc()
+            logger.warning("job %s %s failed (attempt %s/%s)", job.job_id, job.job_type, job.attempts, job.max_attempts)
+            # обработчик мог оставить соединение в упавшей транзакции или порвать его
+            if not connection.is_usable():
+                self._reset_connection()
+            try:
+                queue.fail(job, error)
+            except DatabaseError:
+                # статус поправит requeue_stale по locked_at
+                logger.exception("job %s: could not record failure", job.job_id)
+                self._reset_connection()
+            return
+        queue.complete(job)
+        logger.info("job %s %s done in %.3fs", job.job_id, job.job_type, time.monotonic() - started)
+
+    def _maintenance(self):
+        now = time.monotonic()
+        if now < self._next_maintenance:
+            return
+        self._next_maintenance = now + MAINTENANCE_SECONDS
+        stale = queue.requeue_stale(timedelta(seconds=settings.JOBS_STALE_SECONDS))
+        if stale:
+            logger.warning("requeued %s stale jobs", stale)
+        for job_type in queue.enqueue_due():
+            logger.info("scheduled %s", job_type)
+
+    # --- ожидание ----------------------------------------------------------
+
+    def _reset_connection(self):
+        self._listening = False
+        try:
+            connection.close()
+        except DatabaseError:
+            pass
+
+    def _wait(self):
+        """LISTEN jobs через psycopg2; иначе — просто опрос с интервалом poll."""
+        if not self._listening:
+            with connection.cursor() as cur:
+                cur.execute("LISTEN jobs")
+            self._listening = True
+        pg = connection.connection
+        if not (hasattr(pg, "poll") and isinstance(getattr(pg, "notifies", None), list)):
+            time.sleep(self.poll)
+            return
+        try:
+            ready, _, _ = select.select([pg], [], [], self.poll)
+        except InterruptedError:
+            return
+        if ready:
+            pg.poll()
+            pg.notifies.clear()
@@ -0,0 +1,119 @@
+"""
+Ведомость «студенты × задачи»: статус последнего отчёта в каждой клетке.
+
+Два запроса при любом размере: список задач-колонок и сама матрица.
+Матрица — одна строка на студента: последний отчёт по каждой паре
+берётся DISTINCT ON по idx_reports_task_student_submitted
+(db/39_gradebook_index.sql), клетки собираются array_agg в порядке
+колонок, итоги — агрегатами с FILTER. Для выгрузки тот же запрос идёт
+через серверный курсор (streaming.iter_rows), так что память не зависит
+от числа студентов.
+"""
+
+from typing import NamedTuple
+
+from django.db import connection
+
+from apps.common import streaming
+
+MAX_TASKS = 200  # колонок; больше — ведомость нечитаема, сузьте проект/группу
+
+# фиксированные колонки перед задачами
+HEAD = ["group", "student", "approved", "needs_fix", "submitted"]
+
+
+class Gradebook(NamedTuple):
+    project_ids: list[int]
+    tasks: list[dict]  # task_id, task_name, project_id, project_name
+    sql: str
+    params: list
+
+
+def _tasks(project_id: int | None, group: str, scope: list[int] | None) -> list[dict]:
+    """
+    Колонки: задачи проекта, либо всех проектов, где есть студенты группы.
+    scope — доступные проекты (None — все, для ADMIN).
+    """
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT t.task_id, t.task_name, p.project_id, p.project_name
+            FROM tasks t
+            JOIN projects p ON p.project_id = t.project_id
+            WHERE t.archived_at IS NULL
+              AND (%s::bigint IS NULL OR t.project_id = %s::bigint)
+              AND (%s::bigint[] IS NULL OR t.project_id = ANY(%s::bigint[]))
+              AND (%s = '' OR t.project_id IN (
+                     SELECT m.project_id
+                     FROM project_members m
+                     JOIN students s ON s.student_id = m.member_student
+                     WHERE s.group_number = %s AND m.left_at IS NULL))
+            ORDER BY p.project_id, t.task_deadline NULLS LAST, t.task_id
+            LIMIT %s
+            """,
+            [project_id, project_id, scope, scope, group, group, MAX_TASKS + 1],
+        )
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+def build(project_id: int | None, group: str, scope: frozenset[int] | None) -> Gradebook | None:
+    """None — задач больше MAX_TASKS."""
+    scope_list = None if scope is None else sorted(scope)
+    tasks = _tasks(project_id, group, scope_list)
+    if len(tasks) > MAX_TASKS:
+        return None
+    task_ids = [t["task_id"] for t in tasks]
+    project_ids = [project_id] if project_id else sorted({t["project_id"] for t in tasks})
+    sql = """
+        WITH tk AS (
+          SELECT task_id, ord FROM unnest(%s::bigint[]) WITH ORDINALITY AS tk(task_id, ord)
+        ), st AS (
+          SELECT DISTINCT s.student_id, s.group_number, u.full_name
+          FROM project_members m
+          JOIN students s ON s.student_id = m.member_student
+          JOIN users u    ON u.user_id = s.user_id
+          WHERE m.project_id = ANY(%s::bigint[])
+            AND m.left_at IS NULL
+            AND (%s = '' OR s.group_number = %s)
+        ), latest AS (
+          SELECT DISTINCT ON (r.task_id, r.student_id) r.task_id, r.student_id, r.status
+          FROM reports r
+          WHERE r.task_id = ANY(%s::bigint[]) AND r.archived_at IS NULL
+          ORDER BY r.task_id, r.student_id, r.submitted_at DESC, r.report_id DESC
+        )
+        SELECT st.group_number, st.full_name,
+               COUNT(*) FILTER (WHERE l.status = 'approved')  AS approved,
+               COUNT(*) FILTER (WHERE l.status = 'needs_fix') AS needs_fix,
+               COUNT(*) FILTER (WHERE l.status = 'submitted') AS submitted,
+               array_agg(COALESCE(l.status::text, '') ORDER BY tk.ord) AS cells
+        FROM st
+        CROSS JOIN tk
+        LEFT JOIN latest l ON l.task_id = tk.task_id AND l.student_id = st.student_id
+        GROUP BY st.student_id, st.group_number, st.full_name
+        ORDER BY st.group_number, st.full_name, st.student_id
+    """
+    return Gradebook(project_ids, tasks, sql, [task_ids, project_ids, group, group, task_ids])
+
+
+def header(gb: Gradebook) -> list[str]:
+    several = len(gb.project_ids) > 1
+    return HEAD + [
+        f"{t['project_name']} / {t['task_name']}" if several else t["task_name"] for t in gb.tasks
+    ]
+
+
+def rows(gb: Gradebook) -> list[tuple]:
+    """Матрица для страницы (обычный курсор)."""
+    if not gb.tasks:
+        return []
+    with connection.cursor() as cur:
+        cur.execute(gb.sql, gb.params)
+        return cur.fetchall()
+
+
+def export_response(request, gb: Gradebook, filename: str, fmt: str):
+    """CSV/XLSX: клетки массива разворачиваются в колонки по ходу потока."""
+    source = streaming.iter_rows(request, gb.sql, gb.params) if gb.tasks else iter(())
+    flat = ((*row[:-1], *row[-1]) for row in source)
+    return streaming.rows_response(filename, fmt, header(gb), flat)
@@ -0,0 +1,55 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.projects.repo import (
+    get_project,
+    get_project_detail,
+    get_project_members,
+    get_project_progress,
+    get_project_schedule,
+    get_project_tasks_with_status,
+)
+
+
+def _legacy_detail(project_id: int):
+    """Прежний путь ProjectDetailView: пять запросов подряд."""
+    return {
+        "project": get_project(project_id),
+        "members": get_project_members(project_id),
+        "progress": get_project_progress(project_id),
+        "tasks": get_project_tasks_with_status(project_id),
+        "schedule": get_project_schedule(project_id),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare legacy ProjectDetailView loading with get_project_detail()."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_id", type=int)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def _run(self, label, fn, project_id, repeat):
+        fn(project_id)  # прогрев (план, кеш страниц)
+        with CaptureQueriesContext(connection) as ctx:
+            fn(project_id)
+        queries = len(ctx.captured_queries)
+
+        started = perf_counter()
+        for _ in range(repeat):
+            fn(project_id)
+        per_call_ms = (perf_counter() - started) * 1000 / repeat
+        self.stdout.write(
+            f"{label:<10} queries/call={queries:<3} avg={per_call_ms:.2f} ms"
+        )
+        return per_call_ms
+
+    def handle(self, project_id, repeat, **opts):
+        if not get_project(project_id):
+            raise CommandError(f"project {project_id} not found")
+        legacy = self._run("legacy", _legacy_detail, project_id, repeat)
+        single = self._run("single", get_project_detail, project_id, repeat)
+        self.stdout.write(self.style.SUCCESS(f"speedup x{legacy / single:.2f}"))
@@ -0,0 +1,102 @@
+"""
+Единая проверка участия в проектах.
+
+Набор активных проектов (left_at IS NULL) участника грузится одним запросом
+и кешируется в django cache по ключу профиля. Все места, где меняется состав
+(member_add, member_leave / fn_member_leave, архивация и удаление проекта),
+обязаны звать invalidate*/invalidate_project.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+STUDENT = "student"
+PROFESSOR = "professor"
+
+_COLUMN = {STUDENT: "member_student", PROFESSOR: "member_prof"}
+_ROLE_KIND = {"STUDENT": STUDENT, "PROFESSOR": PROFESSOR}
+
+
+def _key(kind: str, profile_id: int) -> str:
+    return f"membership:{kind}:{profile_id}"
+
+
+def _ttl() -> int:
+    return getattr(settings, "MEMBERSHIP_CACHE_TTL", 60)
+
+
+def project_ids(kind: str, profile_id: int | None) -> frozenset[int]:
+    """Активные проекты студента/преподавателя."""
+    if not profile_id or kind not in _COLUMN:
+        return frozenset()
+    key = _key(kind, profile_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return frozenset(cached)
+    with connection.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT project_id FROM project_members
+            WHERE {_COLUMN[kind]} = %s AND left_at IS NULL
+            """,
+            [profile_id],
+        )
+        ids = [r[0] for r in cur.fetchall()]
+    cache.set(key, ids, _ttl())
+    return frozenset(ids)
+
+
+def identity_project_ids(identity) -> frozenset[int]:
+    if identity is None:
+        return frozenset()
+    kind = _ROLE_KIND.get(identity.role)
+    return project_ids(kind, identity.profile_id) if kind else frozenset()
+
+
+def is_profile_member(kind: str, profile_id, project_id: int) -> bool:
+    try:
+        profile_id = int(profile_id)
+    except (TypeError, ValueError):
+        return False
+    return int(project_id) in project_ids(kind, profile_id)
+
+
+def is_member(identity, project_id: int) -> bool:
+    """Активный участник проекта (ADMIN сюда не входит)."""
+    return int(project_id) in identity_project_ids(identity)
+
+
+def can_access(identity, project_id: int) -> bool:
+    """ADMIN — всегда, остальные — только активные участники."""
+    if identity is None:
+        return False
+    return identity.role == "ADMIN" or is_member(identity, project_id)
+
+
+# --- инвалидация -----------------------------------------------------------
+
+
+def invalidate(kind: str, profile_id: int | None):
+    if profile_id:
+        cache.delete(_key(kind, profile_id))
+
+
+def invalidate_many(students=(), professors=()):
+    keys = [_key(STUDENT, s) for s in students if s]
+    keys += [_key(PROFESSOR, p) for p in professors if p]
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate_project(project_id: int):
+    """Сбросить кеш всем участникам проекта (архивация, удаление, разархив)."""
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT member_student, member_prof FROM project_members WHERE project_id=%s",
+            [project_id],
+        )
+        rows = cur.fetchall()
+    invalidate_many(
+        students=[s for s, _ in rows if s], professors=[p for _, p in rows if p]
+    )
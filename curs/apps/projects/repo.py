@@ -1,4 +1,7 @@
+import json
+
 from django.db import connection
+from django.utils.dateparse import parse_datetime
 
 
 def fetchall_dict(cur):
@@ -27,20 +30,6 @@ def fetchone_dict(cur):
     return dict(zip(cols, row)) if row else None
 
 
-def get_student_id_by_user(user_id: int) -> int | None:
-    with connection.cursor() as cur:
-        cur.execute("SELECT student_id FROM students WHERE user_id=%s", [user_id])
-        r = cur.fetchone()
-        return r[0] if r else None
-
-
-def get_professor_id_by_user(user_id: int) -> int | None:
-    with connection.cursor() as cur:
-        cur.execute("SELECT professor_id FROM professors WHERE user_id=%s", [user_id])
-        r = cur.fetchone()
-        return r[0] if r else None
-
-
 def get_projects_for_professor(professor_id: int):
     with connection.cursor() as cur:
         cur.execute(
@@ -117,14 +106,13 @@ def get_project_progress(project_id: int):
     with connection.cursor() as cur:
         cur.execute(
             """
-            SELECT COALESCE(COUNT(*),0) AS total,
-                   COALESCE(COUNT(*) FILTER (WHERE task_status='done'),0) AS done
-            FROM tasks
+            SELECT total_tasks, done_tasks
+            FROM project_stats
             WHERE project_id=%s
             """,
             [project_id],
         )
-        total, done = cur.fetchone()
+        total, done = cur.fetchone() or (0, 0)
         ratio = (done / total) if total else 0.0
         return {"total": total, "done": done, "ratio": ratio}
 
@@ -136,21 +124,14 @@ def get_project_tasks_with_status(project_id: int):
              t.task_description,
              t.task_deadline,
              t.task_status,
-             lr.status AS last_report_status,
+             t.last_report_status,
              CASE
-               WHEN lr.status = 'approved'  THEN 'done'
-               WHEN lr.status = 'needs_fix' THEN 'needs_fix'
-               WHEN lr.status = 'submitted' THEN 'in_review'
+               WHEN t.last_report_status = 'approved'  THEN 'done'
+               WHEN t.last_report_status = 'needs_fix' THEN 'needs_fix'
+               WHEN t.last_report_status = 'submitted' THEN 'in_review'
                ELSE t.task_status::text
              END AS ui_status
       FROM tasks t
-      LEFT JOIN LATERAL (
-        SELECT r.status
-        FROM reports r
-        WHERE r.task_id = t.task_id
-        ORDER BY r.submitted_at DESC
-        LIMIT 1
-      ) lr ON TRUE
       WHERE t.project_id = %s
       ORDER BY t.task_deadline NULLS LAST, t.task_id
     """
@@ -178,6 +159,29 @@ def get_task_reports(task_id: int, limit: int = 20):
         return fetchall_dict(cur)
 
 
+def report_archive_query(project_id: int, task_id: int | None, latest: bool):
+    """
+    (sql, params) отчётов проекта или одной задачи для ZIP-выгрузки.
+    latest — только последний отчёт каждого студента по каждой задаче.
+    """
+    distinct = "DISTINCT ON (r.task_id, r.student_id)" if latest else ""
+    sql = f"""
+        SELECT {distinct}
+               r.report_id, r.task_id, t.task_name, r.status, r.submitted_at,
+               r.file_path, r.external_url,
+               u.full_name AS student, u.login AS student_login
+        FROM reports r
+        JOIN tasks t    ON t.task_id = r.task_id
+        JOIN students s ON s.student_id = r.student_id
+        JOIN users u    ON u.user_id    = s.user_id
+        WHERE t.project_id = %s
+          AND (%s::bigint IS NULL OR r.task_id = %s::bigint)
+          AND r.archived_at IS NULL
+        ORDER BY r.task_id, r.student_id, r.submitted_at DESC, r.report_id DESC
+    """
+    return sql, [project_id, task_id, task_id]
+
+
 def get_project_schedule(project_id: int):
     """
     Плейсхолдер: если таблицы project_schedule нет — вернёт [].
@@ -197,3 +201,109 @@ def get_project_schedule(project_id: int):
             return fetchall_dict(cur)
     except Exception:
         return []
+
+
+PROJECT_DETAIL_SQL = """
+WITH p AS (
+  SELECT p.project_id, p.project_name, p.project_description, p.project_status,
+         p.created_at, p.release_date, p.specialization
+  FROM projects p
+  WHERE p.project_id = %(pid)s
+),
+members AS (
+  SELECT 'STUDENT' AS kind, s.student_id AS id,
+         u.last_name||' '||u.first_name||COALESCE(' '||u.middle_name,'') AS fio,
+         m.role_in_team, m.joined_at, m.left_at
+  FROM project_members m
+  JOIN students s ON s.student_id = m.member_student
+  JOIN users u    ON u.user_id    = s.user_id
+  WHERE m.project_id = %(pid)s AND m.member_student IS NOT NULL
+  UNION ALL
+  SELECT 'PROFESSOR' AS kind, pr.professor_id AS id,
+         u.last_name||' '||u.first_name||COALESCE(' '||u.middle_name,'') AS fio,
+         m.role_in_team, m.joined_at, m.left_at
+  FROM project_members m
+  JOIN professors pr ON pr.professor_id = m.member_prof
+  JOIN users u       ON u.user_id       = pr.user_id
+  WHERE m.project_id = %(pid)s AND m.member_prof IS NOT NULL
+),
+tasks AS (
+  SELECT t.task_id, t.task_name, t.task_description, t.task_deadline, t.task_status,
+         t.last_report_status,
+         CASE
+           WHEN t.last_report_status = 'approved'  THEN 'done'
+           WHEN t.last_report_status = 'needs_fix' THEN 'needs_fix'
+           WHEN t.last_report_status = 'submitted' THEN 'in_review'
+           ELSE t.task_status::text
+         END AS ui_status,
+         -- последний отчёт и результат его фоновой обработки (report_artifacts)
+         t.last_report_id,
+         (r.file_path IS NOT NULL)             AS last_report_has_file,
+         a.mime_type                           AS last_report_mime,
+         a.page_count                          AS last_report_pages,
+         (a.preview_path IS NOT NULL)          AS last_report_preview,
+         left(a.text_content, 280)             AS last_report_excerpt,
+         (a.meta->>'entries_total')::int       AS last_report_entries
+  FROM tasks t
+  LEFT JOIN reports r          ON r.report_id = t.last_report_id
+  LEFT JOIN report_artifacts a ON a.file_path = r.file_path
+  WHERE t.project_id = %(pid)s
+),
+sched AS (
+  SELECT schedule_id, title, starts_at, ends_at, location, description
+  FROM project_schedule
+  WHERE project_id = %(pid)s
+)
+SELECT json_build_object(
+  'project',  (SELECT row_to_json(p) FROM p),
+  'members',  COALESCE((SELECT json_agg(m ORDER BY m.joined_at, m.fio) FROM members m), '[]'),
+  'tasks',    COALESCE((SELECT json_agg(t ORDER BY t.task_deadline NULLS LAST, t.task_id)
+                        FROM tasks t), '[]'),
+  'schedule', COALESCE((SELECT json_agg(s ORDER BY s.starts_at) FROM sched s), '[]')
+)
+"""
+
+# json_agg отдаёт даты строками ISO 8601 — шаблоны ждут datetime
+_DETAIL_TS_KEYS = {
+    "project": ("created_at", "release_date"),
+    "members": ("joined_at", "left_at"),
+    "tasks": ("task_deadline",),
+    "schedule": ("starts_at", "ends_at"),
+}
+
+
+def _parse_ts(row: dict, keys):
+    for k in keys:
+        if row.get(k):
+            row[k] = parse_datetime(row[k])
+    return row
+
+
+def get_project_detail(project_id: int):
+    """
+    Вся детальная страница проекта одним запросом: проект, команда, задачи
+    с ui_status, расписание. Прогресс считается по списку задач.
+    Вернёт None, если проекта нет.
+    """
+    with connection.cursor() as cur:
+        cur.execute(PROJECT_DETAIL_SQL, {"pid": project_id})
+        payload = cur.fetchone()[0]
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+    if not payload["project"]:
+        return None
+
+    _parse_ts(payload["project"], _DETAIL_TS_KEYS["project"])
+    for section in ("members", "tasks", "schedule"):
+        for row in payload[section]:
+            _parse_ts(row, _DETAIL_TS_KEYS[section])
+
+    tasks = payload["tasks"]
+    total = len(tasks)
+    done = sum(1 for t in tasks if t["task_status"] == "done")
+    payload["progress"] = {
+        "total": total,
+        "done": done,
+        "ratio": (done / total) if total else 0.0,
+    }
+    return payload
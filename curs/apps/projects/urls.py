@@ -5,6 +5,7 @@ from .views import (
     ProjectTeamView,
     task_new,
     schedule_new,
+    gradebook_view,
 )
 
 app_name = "projects"
@@ -14,4 +15,6 @@ urlpatterns = [
     path("<int:project_id>/tasks/new/", task_new, name="task-new"),
     path("<int:project_id>/schedule/new/", schedule_new, name="schedule-new"),
     path("<int:project_id>/team/", ProjectTeamView.as_view(), name="project-team"),
+    path("<int:project_id>/gradebook/", gradebook_view, name="gradebook-project"),
+    path("gradebook/", gradebook_view, name="gradebook"),
 ]
@@ -6,81 +6,19 @@ from django.views.generic import TemplateView
 from django.http import Http404, HttpResponseForbidden
 from django.db import connection
 from django.contrib import messages
+from apps.common import audit
+from apps.reports import similarity
+from . import gradebook, membership
 from .mixins import ProjectAccessMixin
 from .repo import (
-    get_student_id_by_user,
-    get_professor_id_by_user,
     get_projects_for_student,
     get_projects_for_professor,
     get_projects_for_admin,
     get_project,
-    get_project_members,
-    get_project_progress,
-    get_project_tasks_with_status,
-    get_project_schedule,
+    get_project_detail,
 )
 
 
-def _prof_id_by_user(uid):
-    with connection.cursor() as cur:
-        cur.execute("SELECT professor_id FROM professors WHERE user_id=%s", [uid])
-        r = cur.fetchone()
-        return r[0] if r else None
-
-
-def _is_prof_member_of_project(pid, project_id) -> bool:
-    with connection.cursor() as cur:
-        cur.execute(
-            "SELECT 1 FROM project_members WHERE project_id=%s AND member_prof=%s",
-            [project_id, pid],
-        )
-        return cur.fetchone() is not None
-
-
-def _student_in_project_active(user_id: int, project_id: int) -> bool:
-    with connection.cursor() as cur:
-        cur.execute(
-            """
-            SELECT 1
-            FROM project_members m
-            JOIN students s ON s.student_id = m.member_student
-            WHERE m.project_id = %s
-              AND s.user_id    = %s
-              AND m.left_at IS NULL
-        """,
-            [project_id, user_id],
-        )
-        return cur.fetchone() is not None
-
-
-def _is_member(user, project_id):
-    uid = getattr(user, "user_id", None) or getattr(user, "pk", None)
-    if not uid:
-        return False
-    if getattr(user, "role", "") == "ADMIN":
-        return True
-    with connection.cursor() as cur:
-        if getattr(user, "role", "") == "STUDENT":
-            cur.execute(
-                """
-              SELECT 1 FROM project_members m
-              JOIN students s ON s.student_id = m.member_student
-              WHERE m.project_id=%s AND s.user_id=%s AND m.left_at IS NULL
-            """,
-                [project_id, uid],
-            )
-        else:
-            cur.execute(
-                """
-              SELECT 1 FROM project_members m
-              JOIN professors p ON p.professor_id = m.member_prof
-              WHERE m.project_id=%s AND p.user_id=%s AND m.left_at IS NULL
-            """,
-                [project_id, uid],
-            )
-        return cur.fetchone() is not None
-
-
 def _student_choices_for_project(project_id: int):
     """
     Вернёт список пар [(student_id, 'Фам Имя Отч')], только активные участники проекта.
@@ -121,12 +59,12 @@ class MyProjectsView(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        user = self.request.user
-        if user.role == "STUDENT":
-            sid = get_student_id_by_user(user.user_id)
+        ident = self.request.identity
+        if ident.role == "STUDENT":
+            sid = ident.student_id
             ctx["projects"] = get_projects_for_student(sid) if sid else []
-        elif user.role == "PROFESSOR":
-            pid = get_professor_id_by_user(user.user_id)
+        elif ident.role == "PROFESSOR":
+            pid = ident.professor_id
             ctx["projects"] = get_projects_for_professor(pid) if pid else []
         else:  # ADMIN
             ctx["projects"] = get_projects_for_admin()
@@ -138,16 +76,25 @@ class ProjectDetailView(ProjectAccessMixin, LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, project_id: int, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        proj = get_project(project_id)
-        if not proj:
+        detail = get_project_detail(project_id)
+        if not detail:
             raise Http404("Проект не найден")
-        ctx["project"] = proj
-        ctx["members"] = get_project_members(project_id)
-        ctx["progress"] = get_project_progress(project_id)
-        ctx["tasks"] = get_project_tasks_with_status(project_id)
-        ctx["schedule"] = get_project_schedule(project_id)
+        if self.request.identity.role == "PROFESSOR":
+            self._attach_similar(detail["tasks"])
+        ctx.update(detail)
         return ctx
 
+    def _attach_similar(self, tasks):
+        """Похожие отчёты для панели проверки; ссылка — только на доступные проекты."""
+        similar = similarity.similar_for_reports(
+            [t["last_report_id"] for t in tasks if t.get("last_report_has_file")]
+        )
+        allowed = membership.identity_project_ids(self.request.identity)
+        for t in tasks:
+            t["similar"] = similar.get(t.get("last_report_id"), [])
+            for s in t["similar"]:
+                s["accessible"] = s["project_id"] in allowed
+
 
 @login_required
 @require_http_methods(["GET", "POST"])
@@ -157,10 +104,7 @@ def task_new(request, project_id: int):
         return HttpResponseForbidden("Недостаточно прав")
 
     if request.user.role == "PROFESSOR":
-        pid = _prof_id_by_user(
-            getattr(request.user, "user_id", None) or request.user.pk
-        )
-        if not pid or not _is_prof_member_of_project(pid, project_id):
+        if not membership.is_member(request.identity, project_id):
             return HttpResponseForbidden("Вы не прикреплены к проекту")
 
     # Нельзя создавать задачи в архивном проекте
@@ -178,21 +122,11 @@ def task_new(request, project_id: int):
             messages.error(request, "Название обязательно")
         else:
             # Если указан исполнитель — проверим, что он в составе проекта (и не вышел)
-            if exec_sid:
-                with connection.cursor() as cur:
-                    cur.execute(
-                        """
-                        SELECT 1
-                        FROM project_members
-                        WHERE project_id=%s AND member_student=%s AND left_at IS NULL
-                        """,
-                        [project_id, exec_sid],
-                    )
-                    if cur.fetchone() is None:
-                        messages.error(
-                            request, "Указанный студент не состоит в проекте."
-                        )
-                        return redirect("projects:task-new", project_id=project_id)
+            if exec_sid and not membership.is_profile_member(
+                membership.STUDENT, exec_sid, project_id
+            ):
+                messages.error(request, "Указанный студент не состоит в проекте.")
+                return redirect("projects:task-new", project_id=project_id)
 
             try:
                 with connection.cursor() as cur:
@@ -202,9 +136,15 @@ def task_new(request, project_id: int):
                           (project_id, task_name, task_description, executor_student, task_status, task_deadline)
                         VALUES
                           (%s, %s, %s, %s, 'open', %s)
+                        RETURNING task_id
                         """,
                         [project_id, name, description, exec_sid or None, deadline],
                     )
+                    task_id = cur.fetchone()[0]
+                audit.log_request(
+                    request, "TASK_CREATE",
+                    task_id=task_id, project_id=project_id, task_name=name,
+                )
                 messages.success(request, "Задача создана")
                 return redirect("projects:project-detail", project_id=project_id)
             except Exception as e:
@@ -225,10 +165,7 @@ def schedule_new(request, project_id: int):
         return HttpResponseForbidden("Недостаточно прав")
 
     if request.user.role == "PROFESSOR":
-        pid = _prof_id_by_user(
-            getattr(request.user, "user_id", None) or request.user.pk
-        )
-        if not pid or not _is_prof_member_of_project(pid, project_id):
+        if not membership.is_member(request.identity, project_id):
             return HttpResponseForbidden("Вы не прикреплены к проекту")
 
     if request.method == "POST":
@@ -249,6 +186,7 @@ def schedule_new(request, project_id: int):
                         """,
                         [project_id, title, desc, starts_at, ends_at, location],
                     )
+                audit.log_request(request, "SCHEDULE_CREATE", project_id=project_id, title=title)
                 messages.success(request, "Событие добавлено")
                 return redirect("projects:project-detail", project_id=project_id)
             except Exception:
@@ -261,16 +199,13 @@ class ProjectTeamView(LoginRequiredMixin, TemplateView):
 
     def dispatch(self, request, project_id: int, *args, **kwargs):
         role = getattr(request.user, "role", "")
-        uid = getattr(request.user, "user_id", None) or getattr(
-            request.user, "pk", None
-        )
 
         # ADMIN и любой PROFESSOR — всегда можно
         if role in ("ADMIN", "PROFESSOR"):
             return super().dispatch(request, project_id=project_id, *args, **kwargs)
 
         # STUDENT — только если он активный участник проекта
-        if role == "STUDENT" and uid and _student_in_project_active(uid, project_id):
+        if role == "STUDENT" and membership.is_member(request.identity, project_id):
             return super().dispatch(request, project_id=project_id, *args, **kwargs)
 
         return render(
@@ -315,3 +250,51 @@ class ProjectTeamView(LoginRequiredMixin, TemplateView):
             cols = [c[0] for c in cur.description]
             ctx["members"] = [dict(zip(cols, r)) for r in cur.fetchall()]
         return ctx
+
+
+GRADEBOOK_FORMATS = ("csv", "xlsx")
+
+
+@login_required
+def gradebook_view(request, project_id: int | None = None):
+    """
+    Ведомость по проекту (/projects/<id>/gradebook/) или по группе
+    (/projects/gradebook/?group=...); ?fmt=csv|xlsx — выгрузка.
+    Преподаватель видит только свои проекты, ADMIN — все.
+    """
+    ident = request.identity
+    if ident.role not in ("PROFESSOR", "ADMIN"):
+        return HttpResponseForbidden("Нет доступа")
+    if project_id is not None and not membership.can_access(ident, project_id):
+        return HttpResponseForbidden("Нет доступа к проекту")
+
+    group = (request.GET.get("group") or "").strip()[:16]
+    project = get_project(project_id) if project_id is not None else None
+    if project_id is not None and not project:
+        raise Http404("Проект не найден")
+    scope = None if ident.role == "ADMIN" else membership.identity_project_ids(ident)
+
+    gb = None
+    if project_id is not None or group:
+        gb = gradebook.build(project_id, group, scope)
+        if gb is None:
+            messages.error(
+                request, f"Больше {gradebook.MAX_TASKS} задач — выберите проект или группу уже"
+            )
+
+    fmt = (request.GET.get("fmt") or "").strip().lower()
+    if gb is not None and fmt in GRADEBOOK_FORMATS:
+        name = f"gradebook_project_{project_id}" if project_id else f"gradebook_group_{group}"
+        return gradebook.export_response(request, gb, name, fmt)
+
+    return render(
+        request,
+        "projects/gradebook.html",
+        {
+            "project": project,
+            "group": group,
+            "gb": gb,
+            "header": gradebook.header(gb)[len(gradebook.HEAD):] if gb else [],
+            "rows": gradebook.rows(gb) if gb else [],
+        },
+    )
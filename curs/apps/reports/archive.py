@@ -0,0 +1,57 @@
+"""
+ZIP всех отчётов проекта или задачи: собирается на лету
+(apps.common.streaming.iter_zip) из серверного курсора, файлы читаются
+кусками — ни временного файла, ни архива в памяти. Последним в архив
+ложится manifest.csv со строкой на каждый отчёт, включая сданные ссылкой
+и те, чей файл не нашёлся.
+"""
+
+import csv
+import io
+import os
+
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+
+from apps.common import streaming
+
+MANIFEST_HEADER = [
+    "report_id", "task_id", "task", "student", "login",
+    "status", "submitted_at", "file", "external_url",
+]
+
+
+def _name(value: str, limit: int = 60) -> str:
+    return get_valid_filename(value)[:limit] or "_"
+
+
+def iter_members(rows):
+    """
+    rows — строки repo.report_archive_query в его порядке столбцов.
+    Файлы раскладываются по папкам задач: <task_id>_<задача>/<login>_<report_id>.<ext>
+    """
+    manifest = io.StringIO()
+    manifest.write("\ufeff")  # BOM для Excel, как в streaming.iter_csv
+    writer = csv.writer(manifest)
+    writer.writerow(MANIFEST_HEADER)
+
+    for report_id, task_id, task_name, status, submitted_at, file_path, external_url, student, login in rows:
+        arcname = ""
+        if file_path:
+            full = default_storage.path(file_path)
+            if os.path.exists(full):
+                ext = file_path.rsplit(".", 1)[-1] if "." in file_path else "bin"
+                arcname = f"{task_id}_{_name(task_name)}/{_name(login)}_{report_id}.{ext}"
+                yield arcname, full
+        writer.writerow([
+            report_id, task_id, task_name, student, login, status,
+            submitted_at.isoformat(sep=" ", timespec="seconds"),
+            arcname or ("(файл не найден)" if file_path else ""),
+            external_url or "",
+        ])
+
+    yield "manifest.csv", manifest.getvalue().encode()
+
+
+def stream(request, sql: str, params):
+    return streaming.iter_zip(iter_members(streaming.iter_rows(request, sql, params)))
@@ -0,0 +1,262 @@
+"""
+Обработка файлов отчётов вне запроса: превью, текст, число страниц,
+оглавление zip. Запускается задачей reports.process_file (apps/reports/jobs.py),
+результат — строка report_artifacts (db/31_report_artifacts.sql).
+
+Необязательные зависимости: Pillow (превью картинок), pypdf (текст и страницы
+PDF), pdftoppm из poppler-utils (превью первой страницы PDF). Без них
+соответствующие поля просто остаются пустыми.
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import zipfile
+from dataclasses import dataclass, field
+from xml.etree import ElementTree
+
+from django.core.files.storage import default_storage
+from django.db import connection
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_PREFIX = "uploads/previews/"
+PREVIEW_SIZE = 320  # px по большей стороне
+TEXT_MAX_CHARS = 200_000
+PDF_TEXT_PAGES = 50
+ZIP_MAX_ENTRIES = 500
+PDFTOPPM_TIMEOUT = 60
+
+MIME_TYPES = {
+    "pdf": "application/pdf",
+    "doc": "application/msword",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain",
+    "md": "text/markdown",
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "zip": "application/zip",
+}
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_EP = "{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}"
+
+
+@dataclass
+class Artifact:
+    mime_type: str | None = None
+    size_bytes: int | None = None
+    page_count: int | None = None
+    text_content: str | None = None
+    preview_path: str | None = None
+    meta: dict = field(default_factory=dict)
+
+
+def _ext(path: str) -> str:
+    return path.rsplit(".", 1)[-1].lower() if "." in path else ""
+
+
+def preview_path_for(file_path: str) -> str:
+    stem = os.path.basename(file_path).split(".", 1)[0]
+    return f"{PREVIEW_PREFIX}{stem[:2]}/{stem}.png"
+
+
+def _clip(text: str) -> str | None:
+    # NUL в text PostgreSQL не принимает
+    text = text.replace("\x00", "").strip()
+    return text[:TEXT_MAX_CHARS] or None
+
+
+# --- разбор по типам -----------------------------------------------------------
+
+
+def _pdf(full: str, file_path: str, art: Artifact):
+    if pypdf is not None:
+        reader = pypdf.PdfReader(full)
+        art.page_count = len(reader.pages)
+        parts = []
+        for i in range(min(art.page_count, PDF_TEXT_PAGES)):
+            parts.append(reader.pages[i].extract_text() or "")
+            if sum(map(len, parts)) > TEXT_MAX_CHARS:
+                break
+        art.text_content = _clip("\n".join(parts))
+
+    pdftoppm = shutil.which("pdftoppm")
+    if pdftoppm:
+        preview = preview_path_for(file_path)
+        out = default_storage.path(preview)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        # превью необязательно: сбой pdftoppm не должен терять уже извлечённый текст
+        try:
+            subprocess.run(
+                [
+                    pdftoppm, "-png", "-singlefile", "-f", "1", "-l", "1",
+                    "-scale-to", str(PREVIEW_SIZE), full, out[: -len(".png")],
+                ],
+                check=True,
+                capture_output=True,
+                timeout=PDFTOPPM_TIMEOUT,
+            )
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.warning("pdf preview failed for %s: %s", file_path, e)
+        else:
+            art.preview_path = preview
+
+
+def _image(full: str, file_path: str, art: Artifact):
+    if Image is None:
+        return
+    with Image.open(full) as im:
+        art.meta = {"width": im.width, "height": im.height}
+        im.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE))
+        if im.mode not in ("RGB", "RGBA", "L"):
+            im = im.convert("RGBA")
+        preview = preview_path_for(file_path)
+        out = default_storage.path(preview)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        im.save(out, "PNG", optimize=True)
+    art.preview_path = preview
+
+
+def _docx(full: str, file_path: str, art: Artifact):
+    with zipfile.ZipFile(full) as zf:
+        names = set(zf.namelist())
+        if "docProps/app.xml" in names:
+            pages = ElementTree.fromstring(zf.read("docProps/app.xml")).findtext(f"{_EP}Pages")
+            if pages and pages.isdigit():
+                art.page_count = int(pages)
+        if "word/document.xml" not in names:
+            return
+        # потоковый разбор: document.xml бывает большим, а текст режется по лимиту
+        parts, size = [], 0
+        with zf.open("word/document.xml") as doc:
+            for _, el in ElementTree.iterparse(doc):
+                if el.tag == f"{_W}t" and el.text:
+                    parts.append(el.text)
+                    size += len(el.text)
+                elif el.tag == f"{_W}p":
+                    parts.append("\n")
+                    el.clear()
+                if size > TEXT_MAX_CHARS:
+                    break
+        art.text_content = _clip("".join(parts))
+
+
+def _text(full: str, file_path: str, art: Artifact):
+    with open(full, "rb") as f:
+        raw = f.read(TEXT_MAX_CHARS * 4)
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        # старые файлы из Windows
+        text = raw.decode("cp1251", errors="replace")
+    art.text_content = _clip(text)
+    art.meta = {"lines": text.count("\n") + 1}
+
+
+def _zip(full: str, file_path: str, art: Artifact):
+    # только оглавление, ничего не распаковываем
+    with zipfile.ZipFile(full) as zf:
+        infos = [i for i in zf.infolist() if not i.is_dir()]
+    art.meta = {
+        "entries": [{"name": i.filename, "size": i.file_size} for i in infos[:ZIP_MAX_ENTRIES]],
+        "entries_total": len(infos),
+        "uncompressed_size": sum(i.file_size for i in infos),
+    }
+    art.text_content = _clip("\n".join(i.filename for i in infos[:ZIP_MAX_ENTRIES]))
+
+
+_HANDLERS = {
+    "pdf": _pdf,
+    "docx": _docx,
+    "txt": _text,
+    "md": _text,
+    "png": _image,
+    "jpg": _image,
+    "jpeg": _image,
+    "zip": _zip,
+}
+
+
+def analyze(file_path: str) -> Artifact:
+    """FileNotFoundError — файла (ещё) нет; прочие ошибки — файл битый."""
+    full = default_storage.path(file_path)
+    ext = _ext(file_path)
+    art = Artifact(
+        mime_type=MIME_TYPES.get(ext, "application/octet-stream"),
+        size_bytes=os.path.getsize(full),
+    )
+    handler = _HANDLERS.get(ext)
+    if handler:
+        handler(full, file_path, art)
+    return art
+
+
+# --- сохранение ----------------------------------------------------------------
+
+
+def _save(file_path: str, art: Artifact, error: str | None = None):
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO report_artifacts
+              (file_path, mime_type, size_bytes, page_count, text_content,
+               preview_path, meta, error, processed_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s::jsonb, %s, now())
+            ON CONFLICT (file_path) DO UPDATE
+              SET mime_type = EXCLUDED.mime_type,
+                  size_bytes = EXCLUDED.size_bytes,
+                  page_count = EXCLUDED.page_count,
+                  text_content = EXCLUDED.text_content,
+                  preview_path = EXCLUDED.preview_path,
+                  meta = EXCLUDED.meta,
+                  error = EXCLUDED.error,
+                  processed_at = EXCLUDED.processed_at
+            """,
+            [
+                file_path, art.mime_type, art.size_bytes, art.page_count,
+                art.text_content, art.preview_path,
+                json.dumps(art.meta, ensure_ascii=False), error,
+            ],
+        )
+
+
+def process(file_path: str, force: bool = False):
+    """Обработать файл отчёта, если он ещё не обработан."""
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT EXISTS (SELECT 1 FROM reports WHERE file_path = %s),
+                   EXISTS (SELECT 1 FROM report_artifacts
+                           WHERE file_path = %s AND processed_at IS NOT NULL)
+            """,
+            [file_path, file_path],
+        )
+        referenced, processed = cur.fetchone()
+    if not referenced or (processed and not force):
+        # отчёт откатился/удалён или этот же файл уже сдавали
+        return
+
+    try:
+        art = analyze(file_path)
+    except FileNotFoundError:
+        # блоб переезжает на место после коммита — пусть очередь повторит позже
+        raise
+    except Exception as e:
+        # битый/неподдерживаемый файл: повтор не поможет
+        _save(file_path, Artifact(mime_type=MIME_TYPES.get(_ext(file_path))), f"{type(e).__name__}: {e}")
+        return
+    _save(file_path, art)
@@ -0,0 +1,92 @@
+"""
+Полнотекстовый поиск по содержимому файлов отчётов
+(report_artifacts.search_tsv, db/32_report_search.sql).
+
+Запрос — websearch_to_tsquery (кавычки, OR, -исключение) в обеих конфигурациях,
+порядок — ts_rank_cd. Фрагменты ts_headline считаются отдельным запросом
+только для строк текущей страницы: на всей выборке это самая дорогая часть.
+"""
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from apps.common import pagination
+from apps.common.pagination import Key, Page
+
+PAGE_SIZE = 20
+MAX_QUERY_LEN = 200
+
+# маркеры подсветки: текст фрагмента экранируется целиком, потом они становятся <mark>
+_START, _STOP = "⟦", "⟧"
+_HEADLINE_OPTS = f"StartSel={_START}, StopSel={_STOP}, MaxFragments=2, MinWords=8, MaxWords=24, FragmentDelimiter=\" … \""
+
+_TSQUERY = "(websearch_to_tsquery('russian', %s) || websearch_to_tsquery('english', %s))"
+
+KEYS = [Key("rank", desc=True), Key("report_id", desc=True)]
+
+
+def normalize(q: str | None) -> str:
+    return " ".join((q or "").split())[:MAX_QUERY_LEN]
+
+
+def search(
+    q: str,
+    project_ids: frozenset[int] | None,
+    project_id: int | None,
+    faculty: str,
+    cursor: str | None,
+) -> Page:
+    """
+    project_ids — доступные проекты (None — все, для ADMIN);
+    project_id / faculty — необязательные сужения (факультет автора отчёта).
+    """
+    scope = None if project_ids is None else list(project_ids)
+    with connection.cursor() as cur:
+        return pagination.paginate(
+            cur,
+            f"""
+            SELECT r.report_id, r.task_id, r.status, r.submitted_at,
+                   t.task_name, t.project_id, p.project_name,
+                   u.full_name AS student, s.faculty,
+                   a.mime_type, a.page_count,
+                   ts_rank_cd(a.search_tsv, tq.q)::float8 AS rank
+            FROM (SELECT {_TSQUERY} AS q) tq
+            JOIN report_artifacts a ON a.search_tsv @@ tq.q
+            JOIN reports r  ON r.file_path = a.file_path AND r.archived_at IS NULL
+            JOIN tasks t    ON t.task_id = r.task_id
+            JOIN projects p ON p.project_id = t.project_id
+            JOIN students s ON s.student_id = r.student_id
+            JOIN users u    ON u.user_id = s.user_id
+            WHERE (%s::bigint[] IS NULL OR t.project_id = ANY(%s::bigint[]))
+              AND (%s::bigint IS NULL OR t.project_id = %s::bigint)
+              AND (%s = '' OR lower(s.faculty) = lower(%s))
+            """,
+            [q, q, scope, scope, project_id, project_id, faculty, faculty],
+            KEYS,
+            cursor,
+            PAGE_SIZE,
+        )
+
+
+def headlines(q: str, report_ids: list[int]) -> dict[int, str]:
+    """Подсвеченные фрагменты (безопасный HTML) для отчётов страницы."""
+    if not report_ids:
+        return {}
+    with connection.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT r.report_id, ts_headline('russian', a.text_content, tq.q, %s)
+            FROM (SELECT {_TSQUERY} AS q) tq
+            CROSS JOIN reports r
+            JOIN report_artifacts a ON a.file_path = r.file_path
+            WHERE r.report_id = ANY(%s)
+            """,
+            [q, q, _HEADLINE_OPTS, report_ids],
+        )
+        return {
+            report_id: mark_safe(
+                escape(text).replace(_START, "<mark>").replace(_STOP, "</mark>")
+            )
+            for report_id, text in cur.fetchall()
+        }
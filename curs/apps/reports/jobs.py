@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from apps.jobs.registry import job
+
+from . import artifacts, similarity, storage
+
+
+@job("reports.gc_blobs", every=timedelta(hours=1), priority=200)
+def gc_blobs(payload: dict):
+    """То же, что manage.py gc_report_blobs, по расписанию воркеров."""
+    storage.expire_upload_sessions()
+    storage.collect_garbage()
+
+
+@job("reports.process_file", priority=50, max_attempts=4)
+def process_file(payload: dict):
+    """Превью, текст и метаданные файла отчёта (ставится из _create_report)."""
+    force = payload.get("force", False)
+    artifacts.process(payload["file_path"], force=force)
+    # сигнатура нужна и при повторной сдаче того же файла — вдруг её ещё нет
+    similarity.index_file(payload["file_path"], force=force)
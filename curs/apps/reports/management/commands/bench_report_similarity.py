@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.reports import similarity
+
+
+def _corpus(n: int, words: int, dup_rate: float, noise: float, rng: random.Random):
+    """
+    Синтетические отчёты: случайные тексты из общего словаря плюс dup_rate·n
+    копий с заменой доли noise слов. Вернёт (тексты, подложенные пары).
+    """
+    vocab = [f"w{i}" for i in range(20_000)]
+    texts, planted = [], []
+    originals = int(n * (1 - dup_rate))
+    for _ in range(originals):
+        texts.append(rng.choices(vocab, k=words))
+    while len(texts) < n:
+        src = rng.randrange(originals)
+        copy = list(texts[src])
+        for i in rng.sample(range(words), int(words * noise)):
+            copy[i] = rng.choice(vocab)
+        planted.append((src, len(texts)))
+        texts.append(copy)
+    return [" ".join(t) for t in texts], planted
+
+
+class Command(BaseCommand):
+    help = "Benchmark MinHash/LSH near-duplicate detection on a synthetic corpus (no database access)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reports", type=int, default=50_000, help="Corpus size (default: 50000).")
+        parser.add_argument("--words", type=int, default=400, help="Words per report (default: 400).")
+        parser.add_argument(
+            "--dup-rate", type=float, default=0.02,
+            help="Share of reports that are edited copies of another one (default: 0.02).",
+        )
+        parser.add_argument(
+            "--noise", type=float, default=0.05,
+            help="Share of words replaced in each copy (default: 0.05).",
+        )
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+        n = opts["reports"]
+        texts, planted = _corpus(n, opts["words"], opts["dup_rate"], opts["noise"], rng)
+        self.stdout.write(
+            f"{n} reports × {opts['words']} words, {len(planted)} planted near-duplicates"
+        )
+
+        started = time.perf_counter()
+        sigs = [similarity.signature(similarity.shingles(t)) for t in texts]
+        t_sig = time.perf_counter() - started
+
+        started = time.perf_counter()
+        candidates = similarity.candidate_pairs({i: similarity.bands(s) for i, s in enumerate(sigs)})
+        t_lsh = time.perf_counter() - started
+
+        started = time.perf_counter()
+        found = {
+            (a, b) for a, b in candidates
+            if similarity.estimate(sigs[a], sigs[b]) >= similarity.THRESHOLD
+        }
+        t_verify = time.perf_counter() - started
+
+        hits = sum(1 for pair in planted if pair in found)
+        all_pairs = n * (n - 1) // 2
+        self.stdout.write(f"signatures: {t_sig:.1f}s ({t_sig / n * 1000:.2f} ms/report)")
+        self.stdout.write(f"lsh:        {t_lsh:.1f}s, candidates {len(candidates)} of {all_pairs} pairs")
+        self.stdout.write(f"verify:     {t_verify:.1f}s, similar pairs {len(found)}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"recall on planted pairs: {hits}/{len(planted)}, "
+                f"total {t_sig + t_lsh + t_verify:.1f}s"
+            )
+        )
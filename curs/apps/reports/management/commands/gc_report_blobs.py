@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.reports import storage
+
+
+class Command(BaseCommand):
+    help = "Delete report files that lost their last reference more than --grace-hours ago and expired upload sessions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=settings.REPORT_BLOB_GC_GRACE_HOURS,
+            help="Keep unreferenced blobs at least this long (default: REPORT_BLOB_GC_GRACE_HOURS).",
+        )
+
+    def handle(self, *args, **opts):
+        expired = storage.expire_upload_sessions()
+        removed = storage.collect_garbage(timedelta(hours=opts["grace_hours"]))
+        self.stdout.write(
+            self.style.SUCCESS(f"report blobs removed: {removed}, upload sessions expired: {expired}")
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Queue preview/text extraction for report files that have no report_artifacts row yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Re-process every report file, including already processed ones.",
+        )
+
+    def handle(self, *args, **opts):
+        force = opts["force"]
+        with transaction.atomic():
+            with connection.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT DISTINCT r.file_path
+                    FROM reports r
+                    LEFT JOIN report_artifacts a ON a.file_path = r.file_path
+                    WHERE r.file_path IS NOT NULL
+                      AND (%s OR a.processed_at IS NULL)
+                    """,
+                    [force],
+                )
+                paths = [r[0] for r in cur.fetchall()]
+            queued = sum(
+                1
+                for path in paths
+                if queue.enqueue(
+                    "reports.process_file",
+                    {"file_path": path, "force": force},
+                    dedup_key=path,
+                )
+            )
+        self.stdout.write(self.style.SUCCESS(f"queued: {queued} of {len(paths)} files"))
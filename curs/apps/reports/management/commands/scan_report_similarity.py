@@ -0,0 +1,72 @@
+import re
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from apps.reports import similarity
+
+_SEMESTER = re.compile(r"^(\d{4})-(spring|autumn)$")
+
+
+def _semester_bounds(value: str | None) -> tuple[date, date]:
+    """
+    Осенний семестр — сентябрь…январь, весенний — февраль…август (с летней
+    сессией). Без значения — текущий семестр.
+    """
+    if value is None:
+        today = timezone.localdate()
+        if 2 <= today.month <= 8:
+            value = f"{today.year}-spring"
+        else:
+            value = f"{today.year if today.month >= 9 else today.year - 1}-autumn"
+    m = _SEMESTER.match(value)
+    if not m:
+        raise CommandError("--semester must look like 2025-autumn or 2026-spring")
+    year = int(m.group(1))
+    if m.group(2) == "spring":
+        return date(year, 2, 1), date(year, 9, 1)
+    return date(year, 9, 1), date(year + 1, 2, 1)
+
+
+class Command(BaseCommand):
+    help = "Find near-duplicate report files (MinHash/LSH) among reports submitted in a semester."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--semester", default=None,
+            help="Semester to scan, e.g. 2025-autumn or 2026-spring (default: current).",
+        )
+        parser.add_argument(
+            "--reindex", action="store_true",
+            help="Recompute signatures even for files that already have one.",
+        )
+
+    def handle(self, *args, **opts):
+        since, until = _semester_bounds(opts["semester"])
+        with connection.cursor() as cur:
+            cur.execute(
+                """
+                SELECT DISTINCT file_path
+                FROM reports
+                WHERE file_path IS NOT NULL
+                  AND archived_at IS NULL
+                  AND submitted_at >= %s AND submitted_at < %s
+                """,
+                [since, until],
+            )
+            paths = [r[0] for r in cur.fetchall()]
+        self.stdout.write(f"{since:%d.%m.%Y} – {until:%d.%m.%Y}: {len(paths)} files")
+
+        stats = similarity.scan(
+            paths,
+            reindex=opts["reindex"],
+            progress=lambda done, total: self.stdout.write(f"  signatures: {done}/{total}"),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "signatures: {signatures} (computed {computed}, too short {skipped}), "
+                "candidates: {candidates}, similar pairs: {pairs}".format(**stats)
+            )
+        )
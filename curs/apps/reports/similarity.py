@@ -0,0 +1,364 @@
+"""
+Поиск похожих отчётов: MinHash-сигнатуры по словесным шинглам извлечённого
+текста (report_artifacts.text_content) и LSH по полосам сигнатуры
+(db/33_report_similarity.sql).
+
+Сигнатура — NUM_PERM минимумов, доля совпавших позиций оценивает
+коэффициент Жаккара двух текстов. Считается одним хешем на шингл (one
+permutation hashing): младшие биты хеша выбирают ячейку, старшие — значение,
+в ячейке остаётся минимум. Вместо NUM_PERM хеш-функций на шингл — одна,
+поэтому чистого Python хватает и на пакетный проход по семестру.
+
+LSH режет сигнатуру на BANDS полос по ROWS значений: пара становится
+кандидатом, если хотя бы одна полоса совпала целиком, — сравнивать каждую
+пару не нужно. При 32×4 кандидатами становятся ~50% пар с Жаккаром 0.42
+и >99% пар с 0.7 и выше; оценка по сигнатуре отсекает совпадения ниже THRESHOLD.
+
+Одинаковые файлы сюда не попадают: блобы контентно-адресуемые, и такой
+отчёт просто ссылается на тот же file_path (см. similar_for_reports).
+"""
+
+import hashlib
+import re
+import struct
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+
+SIG_VERSION = 1  # менять вместе с любыми параметрами ниже
+NUM_PERM = 128  # степень двойки: номер ячейки — младшие биты хеша
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+MIN_SHINGLES = 20  # короче — слишком много ложных совпадений
+THRESHOLD = 0.5
+MAX_CANDIDATES = 1000  # на один файл; общие шаблоны дают огромные корзины
+PANEL_LIMIT = 5
+
+# как в search_tsv (db/32_report_search.sql): оглавление zip — не текст
+TEXT_MIME_TYPES = [
+    "text/plain",
+    "text/markdown",
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+]
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_VALUE_SHIFT = 40  # значение — старшие 24 бита 64-битного хеша
+_VALUE_BITS = 64 - _VALUE_SHIFT
+_EMPTY = 1 << 32
+_PACK = struct.Struct(f"<{NUM_PERM}I")
+_PACK_ROWS = struct.Struct(f"<{ROWS}I")
+
+
+# --- сигнатуры -----------------------------------------------------------------
+
+
+def shingles(text: str) -> set[int]:
+    """64-битные хеши каждых SHINGLE_WORDS подряд идущих слов (регистр и пунктуация не важны)."""
+    words = _WORD.findall(text.lower())
+    return {
+        int.from_bytes(
+            hashlib.blake2b(" ".join(words[i : i + SHINGLE_WORDS]).encode(), digest_size=8).digest(),
+            "little",
+        )
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def signature(hashes: set[int]) -> tuple[int, ...]:
+    """
+    Пустые ячейки (у коротких текстов) берут значение ближайшей непустой
+    справа со сдвигом на расстояние до неё — densification (Shrivastava, Li,
+    2014); иначе пустоты двух разных текстов совпадали бы и завышали оценку.
+    """
+    if not hashes:
+        raise ValueError("signature() of an empty shingle set")
+    mins = [_EMPTY] * NUM_PERM
+    for h in hashes:
+        i = h & (NUM_PERM - 1)
+        v = h >> _VALUE_SHIFT
+        if v < mins[i]:
+            mins[i] = v
+    if _EMPTY not in mins:
+        return tuple(mins)
+    sig = list(mins)
+    for i, v in enumerate(mins):
+        if v != _EMPTY:
+            continue
+        d = 1
+        while mins[(i + d) % NUM_PERM] == _EMPTY:
+            d += 1
+        sig[i] = (d << _VALUE_BITS) | mins[(i + d) % NUM_PERM]
+    return tuple(sig)
+
+
+def bands(sig: tuple[int, ...]) -> list[int]:
+    """Ключ корзины для каждой полосы — 64-битный signed, как BIGINT."""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(_PACK_ROWS.pack(*sig[i * ROWS : (i + 1) * ROWS]), digest_size=8).digest(),
+            "big",
+            signed=True,
+        )
+        for i in range(BANDS)
+    ]
+
+
+def estimate(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def pack(sig: tuple[int, ...]) -> bytes:
+    return _PACK.pack(*sig)
+
+
+def unpack(raw) -> tuple[int, ...]:
+    return _PACK.unpack(bytes(raw))
+
+
+def candidate_pairs(buckets: dict[str, list[int]]):
+    """
+    Пары ключей, у которых совпала хотя бы одна полоса: {ключ: bands(sig)} →
+    множество (a, b), a < b. Работа пропорциональна числу документов и
+    размеру корзин, а не квадрату числа документов.
+    """
+    index = defaultdict(list)
+    for key, keys in buckets.items():
+        for band, bucket in enumerate(keys):
+            index[(band, bucket)].append(key)
+    pairs = set()
+    for members in index.values():
+        if len(members) < 2:
+            continue
+        members.sort()
+        for i, a in enumerate(members):
+            for b in members[i + 1 :]:
+                pairs.add((a, b))
+    return pairs
+
+
+# --- хранение --------------------------------------------------------------------
+
+
+@dataclass
+class Indexed:
+    file_path: str
+    sig: tuple[int, ...]
+
+
+def _text(file_path: str) -> str | None:
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT text_content FROM report_artifacts
+            WHERE file_path = %s AND processed_at IS NOT NULL AND mime_type = ANY(%s)
+            """,
+            [file_path, TEXT_MIME_TYPES],
+        )
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def _store(cur, file_path: str, sig: tuple[int, ...], shingle_count: int):
+    cur.execute(
+        """
+        INSERT INTO report_signatures (file_path, sig_version, shingles, signature)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (file_path) DO UPDATE
+          SET sig_version = EXCLUDED.sig_version,
+              shingles = EXCLUDED.shingles,
+              signature = EXCLUDED.signature,
+              created_at = now()
+        """,
+        [file_path, SIG_VERSION, shingle_count, pack(sig)],
+    )
+    cur.execute("DELETE FROM report_lsh_buckets WHERE file_path = %s", [file_path])
+    cur.execute(
+        """
+        INSERT INTO report_lsh_buckets (band, bucket, file_path)
+        SELECT band - 1, bucket, %s
+        FROM unnest(%s::bigint[]) WITH ORDINALITY AS b(bucket, band)
+        ON CONFLICT DO NOTHING
+        """,
+        [file_path, bands(sig)],
+    )
+    cur.execute(
+        "DELETE FROM report_similar_pairs WHERE file_a = %s OR file_b = %s",
+        [file_path, file_path],
+    )
+
+
+def _save_pairs(cur, pairs: list[tuple[str, str, float]]):
+    if not pairs:
+        return
+    a, b, sim = zip(*pairs)
+    cur.execute(
+        """
+        INSERT INTO report_similar_pairs (file_a, file_b, similarity)
+        SELECT * FROM unnest(%s::varchar[], %s::varchar[], %s::real[])
+        ON CONFLICT (file_a, file_b) DO UPDATE
+          SET similarity = EXCLUDED.similarity, found_at = now()
+        """,
+        [list(a), list(b), list(sim)],
+    )
+
+
+def _ordered(a: str, b: str, sim: float) -> tuple[str, str, float]:
+    # порядок как у CHECK (file_a < file_b COLLATE "C"): пути ASCII/UTF-8
+    return (a, b, sim) if a < b else (b, a, sim)
+
+
+def _indexed(file_path: str) -> bool:
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT EXISTS (SELECT 1 FROM report_signatures WHERE file_path = %s AND sig_version = %s)",
+            [file_path, SIG_VERSION],
+        )
+        return cur.fetchone()[0]
+
+
+def index_file(file_path: str, find_pairs: bool = True, force: bool = True) -> Indexed | None:
+    """
+    Сигнатура и корзины файла, затем (find_pairs) сравнение с кандидатами
+    из тех же корзин. Вернёт None, если текста для сравнения мало —
+    прежняя сигнатура тогда удаляется вместе с парами, — или если
+    файл уже проиндексирован, а force не задан.
+    """
+    if not force and _indexed(file_path):
+        return None
+    hashes = shingles(_text(file_path) or "")
+    if len(hashes) < MIN_SHINGLES:
+        with connection.cursor() as cur:
+            cur.execute("DELETE FROM report_signatures WHERE file_path = %s", [file_path])
+        return None
+
+    sig = signature(hashes)
+    with transaction.atomic(), connection.cursor() as cur:
+        _store(cur, file_path, sig, len(hashes))
+        if find_pairs:
+            cur.execute(
+                """
+                SELECT s.file_path, s.signature
+                FROM report_signatures s
+                WHERE s.sig_version = %s
+                  AND s.file_path IN (
+                    SELECT DISTINCT o.file_path
+                    FROM report_lsh_buckets b
+                    JOIN report_lsh_buckets o
+                      ON o.band = b.band AND o.bucket = b.bucket AND o.file_path <> b.file_path
+                    WHERE b.file_path = %s
+                    LIMIT %s)
+                """,
+                [SIG_VERSION, file_path, MAX_CANDIDATES],
+            )
+            found = []
+            for other, raw in cur.fetchall():
+                sim = estimate(sig, unpack(raw))
+                if sim >= THRESHOLD:
+                    found.append(_ordered(file_path, other, sim))
+            _save_pairs(cur, found)
+    return Indexed(file_path, sig)
+
+
+def scan(file_paths: list[str], reindex: bool = False, progress=None) -> dict:
+    """
+    Пакетный проход по набору файлов (например, за семестр): недостающие
+    сигнатуры считаются и сохраняются, кандидаты ищутся в памяти
+    по корзинам всего набора, пары с оценкой ≥ THRESHOLD записываются.
+    """
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT file_path, signature FROM report_signatures WHERE sig_version = %s AND file_path = ANY(%s)",
+            [SIG_VERSION, file_paths],
+        )
+        # array('I') — 512 байт на сигнатуру против ~5 КБ у кортежа int
+        sigs = {} if reindex else {path: array("I", unpack(raw)) for path, raw in cur.fetchall()}
+
+    computed = skipped = 0
+    for i, path in enumerate(file_paths, 1):
+        if path not in sigs:
+            done = index_file(path, find_pairs=False)
+            if done is None:
+                skipped += 1
+            else:
+                sigs[path] = array("I", done.sig)
+                computed += 1
+        if progress and i % 1000 == 0:
+            progress(i, len(file_paths))
+
+    candidates = candidate_pairs({path: bands(sig) for path, sig in sigs.items()})
+    found = []
+    for a, b in candidates:
+        sim = estimate(sigs[a], sigs[b])
+        if sim >= THRESHOLD:
+            found.append(_ordered(a, b, sim))
+    with transaction.atomic(), connection.cursor() as cur:
+        for i in range(0, len(found), 5000):
+            _save_pairs(cur, found[i : i + 5000])
+    return {
+        "files": len(file_paths),
+        "signatures": len(sigs),
+        "computed": computed,
+        "skipped": skipped,
+        "candidates": len(candidates),
+        "pairs": len(found),
+    }
+
+
+# --- панель у проверки --------------------------------------------------------------
+
+
+def similar_for_reports(report_ids: list[int]) -> dict[int, list[dict]]:
+    """
+    Похожие отчёты других студентов для панели «Проверить»: найденные пары
+    плюс тот же самый файл, сданный кем-то ещё (similarity = 1).
+    Не больше PANEL_LIMIT на отчёт, самые похожие первыми.
+    """
+    if not report_ids:
+        return {}
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            WITH mine AS (
+              SELECT report_id, file_path, student_id
+              FROM reports
+              WHERE report_id = ANY(%s) AND file_path IS NOT NULL
+            ), hits AS (
+              SELECT m.report_id, o.report_id AS other_id, sp.similarity,
+                     o.submitted_at, t.task_name, t.project_id, p.project_name,
+                     u.full_name AS student,
+                     row_number() OVER (PARTITION BY m.report_id
+                                        ORDER BY sp.similarity DESC, o.submitted_at) AS rn
+              FROM mine m
+              CROSS JOIN LATERAL (
+                SELECT file_b AS other, similarity FROM report_similar_pairs WHERE file_a = m.file_path
+                UNION ALL
+                SELECT file_a, similarity FROM report_similar_pairs WHERE file_b = m.file_path
+                UNION ALL
+                SELECT m.file_path, 1.0::real
+              ) sp
+              JOIN reports o  ON o.file_path = sp.other
+                             AND o.archived_at IS NULL
+                             AND o.student_id <> m.student_id
+              JOIN tasks t    ON t.task_id = o.task_id
+              JOIN projects p ON p.project_id = t.project_id
+              JOIN students s ON s.student_id = o.student_id
+              JOIN users u    ON u.user_id = s.user_id
+            )
+            SELECT report_id, other_id, similarity, submitted_at,
+                   task_name, project_id, project_name, student
+            FROM hits
+            WHERE rn <= %s
+            ORDER BY report_id, rn
+            """,
+            [report_ids, PANEL_LIMIT],
+        )
+        cols = [c[0] for c in cur.description]
+        out = defaultdict(list)
+        for row in cur.fetchall():
+            item = dict(zip(cols, row))
+            out[item.pop("report_id")].append(item)
+    return dict(out)
@@ -0,0 +1,228 @@
+"""
+Контентно-адресуемое хранилище файлов отчётов.
+
+Файл хранится один раз под своим SHA-256: uploads/blobs/ab/<digest>.<ext>.
+Ссылки считает БД (report_blobs.ref_count, триггер на reports в
+db/28_report_blobs.sql): неархивный отчёт с таким file_path — одна ссылка.
+Когда последняя ссылка уходит (архивация, удаление), блоб помечается
+orphaned_at; физически его удаляет collect_garbage() после grace-периода.
+
+Порядок важен для гонок с GC:
+  1) stage_upload — поток chunks() в temp-файл с одновременным хешированием;
+  2) INSERT отчёта (триггер поднимает ref_count и снимает orphaned_at);
+  3) publish после коммита — temp переезжает на место блоба, если его нет.
+GC удаляет файл, держа блокировку строки report_blobs, поэтому загрузка,
+закоммитившая ссылку после GC, на шаге 3 увидит, что файла нет, и положит свой.
+"""
+
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = "uploads/blobs/"
+TMP_PREFIX = "uploads/tmp/"
+IO_CHUNK = 64 * 1024
+
+
+@dataclass(frozen=True)
+class StagedBlob:
+    path: str  # итоговый file_path для reports
+    tmp_path: str
+    digest: str
+    size: int
+
+
+def blob_path(digest: str, ext: str) -> str:
+    return f"{BLOB_PREFIX}{digest[:2]}/{digest}.{ext}"
+
+
+def _grace() -> timedelta:
+    return timedelta(hours=settings.REPORT_BLOB_GC_GRACE_HOURS)
+
+
+def session_ttl() -> timedelta:
+    return timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+
+
+def stage_upload(file, ext: str) -> StagedBlob:
+    """Записать загрузку во временный файл, посчитав SHA-256 на лету."""
+    tmp_path = f"{TMP_PREFIX}{uuid4().hex}"
+    digest = hashlib.sha256()
+    size = 0
+    os.makedirs(os.path.dirname(default_storage.path(tmp_path)), exist_ok=True)
+    with default_storage.open(tmp_path, "wb") as dst:
+        for chunk in file.chunks():
+            digest.update(chunk)
+            size += len(chunk)
+            dst.write(chunk)
+    hexdigest = digest.hexdigest()
+    return StagedBlob(blob_path(hexdigest, ext), tmp_path, hexdigest, size)
+
+
+def stage_file(tmp_path: str, ext: str) -> StagedBlob:
+    """Уже собранный temp-файл (возобновляемая загрузка): хеш читается с диска."""
+    digest = hashlib.sha256()
+    size = 0
+    with default_storage.open(tmp_path, "rb") as src:
+        for chunk in iter(lambda: src.read(IO_CHUNK), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    hexdigest = digest.hexdigest()
+    return StagedBlob(blob_path(hexdigest, ext), tmp_path, hexdigest, size)
+
+
+# --- возобновляемая загрузка ---------------------------------------------------
+
+
+def session_path(upload_id) -> str:
+    return f"{TMP_PREFIX}{upload_id}"
+
+
+def append_chunk(upload_id, offset: int, stream, limit: int) -> int:
+    """
+    Дописать тело запроса в temp-файл сессии с позиции offset (всё, что
+    дальше, — хвост оборванного PATCH, он отрезается). Читает не больше limit
+    байт кусками по IO_CHUNK; обрыв соединения не ошибка — вернётся столько,
+    сколько успело лечь на диск.
+    """
+    full = default_storage.path(session_path(upload_id))
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    written = 0
+    with open(full, "r+b" if os.path.exists(full) else "wb") as dst:
+        dst.seek(offset)
+        dst.truncate()
+        try:
+            while written < limit:
+                chunk = stream.read(min(IO_CHUNK, limit - written))
+                if not chunk:
+                    break
+                dst.write(chunk)
+                written += len(chunk)
+        except OSError:
+            logger.info("upload %s interrupted at %s", upload_id, offset + written)
+    return written
+
+
+def drop_session_file(upload_id):
+    try:
+        os.remove(default_storage.path(session_path(upload_id)))
+    except FileNotFoundError:
+        pass
+
+
+def publish(staged: StagedBlob):
+    """
+    Положить блоб на место (после коммита ссылки). Если такой уже есть —
+    дубликат просто выбрасывается.
+    """
+    tmp = default_storage.path(staged.tmp_path)
+    final = default_storage.path(staged.path)
+    try:
+        if os.path.exists(final):
+            os.remove(tmp)
+            return
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        os.replace(tmp, final)  # атомарно: читатели не увидят половину файла
+    except OSError:
+        logger.exception("report blob publish failed: %s", staged.path)
+
+
+def discard(staged: StagedBlob):
+    """Отчёт не сохранился — temp больше не нужен."""
+    try:
+        os.remove(default_storage.path(staged.tmp_path))
+    except FileNotFoundError:
+        pass
+
+
+def publish_on_commit(staged: StagedBlob):
+    transaction.on_commit(lambda: publish(staged))
+
+
+# --- сборка мусора -------------------------------------------------------------
+
+
+def collect_garbage(grace: timedelta | None = None, limit: int = 500) -> int:
+    """
+    Удалить блобы без ссылок старше grace и забытые temp-файлы.
+    Возвращает число удалённых блобов.
+    """
+    grace = _grace() if grace is None else grace
+    removed = 0
+    while True:
+        with transaction.atomic():
+            with connection.cursor() as cur:
+                # строки остаются заблокированными до конца транзакции:
+                # параллельная загрузка того же файла ждёт, пока файл не удалён
+                cur.execute(
+                    """
+                    DELETE FROM report_blobs
+                    WHERE file_path IN (
+                        SELECT file_path FROM report_blobs
+                        WHERE ref_count = 0 AND orphaned_at < now() - %s
+                        ORDER BY orphaned_at
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING file_path
+                    """,
+                    [grace, limit],
+                )
+                paths = [r[0] for r in cur.fetchall()]
+                # результаты обработки (apps/reports/artifacts.py) уходят вместе с блобом
+                cur.execute(
+                    "DELETE FROM report_artifacts WHERE file_path = ANY(%s) RETURNING preview_path",
+                    [paths],
+                )
+                previews = [r[0] for r in cur.fetchall() if r[0]]
+            for path in paths + previews:
+                try:
+                    default_storage.delete(path)
+                except OSError:
+                    logger.exception("report blob delete failed: %s", path)
+        removed += len(paths)
+        if len(paths) < limit:
+            break
+
+    _sweep_tmp(grace)
+    return removed
+
+
+def expire_upload_sessions() -> int:
+    """Просроченные сессии возобновляемой загрузки вместе с temp-файлами."""
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute(
+                "DELETE FROM upload_sessions WHERE expires_at < now() RETURNING upload_id"
+            )
+            ids = [r[0] for r in cur.fetchall()]
+    for upload_id in ids:
+        drop_session_file(upload_id)
+    return len(ids)
+
+
+def _sweep_tmp(grace: timedelta):
+    """temp-файлы оборванных загрузок."""
+    try:
+        _, files = default_storage.listdir(TMP_PREFIX)
+    except FileNotFoundError:
+        return
+    # файлы живых сессий моложе их TTL — их не трогаем
+    cutoff = time.time() - max(grace, session_ttl()).total_seconds()
+    for name in files:
+        path = default_storage.path(TMP_PREFIX + name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,3 +1,40 @@
-from django.test import TestCase
+import random
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from . import similarity
+
+
+class SimilarityTests(SimpleTestCase):
+    """MinHash/LSH без БД: оценка Жаккара и отбор кандидатов."""
+
+    def setUp(self):
+        rng = random.Random(7)
+        vocab = [f"w{i}" for i in range(5000)]
+        self.base = rng.choices(vocab, k=600)
+        edited = list(self.base)
+        for i in rng.sample(range(len(edited)), 20):
+            edited[i] = rng.choice(vocab)
+        self.edited = edited
+        self.other = rng.choices(vocab, k=600)
+
+    def _sig(self, words):
+        return similarity.signature(similarity.shingles(" ".join(words)))
+
+    def test_estimate_tracks_jaccard(self):
+        a, b = similarity.shingles(" ".join(self.base)), similarity.shingles(" ".join(self.edited))
+        jaccard = len(a & b) / len(a | b)
+        self.assertAlmostEqual(similarity.estimate(self._sig(self.base), self._sig(self.edited)), jaccard, delta=0.12)
+        self.assertLess(similarity.estimate(self._sig(self.base), self._sig(self.other)), 0.1)
+
+    def test_short_text_is_densified(self):
+        sig = self._sig(self.base[:30])
+        self.assertNotIn(1 << 32, sig)
+        self.assertEqual(similarity.unpack(similarity.pack(sig)), sig)
+
+    def test_candidates(self):
+        buckets = {
+            name: similarity.bands(self._sig(words))
+            for name, words in (("a", self.base), ("b", self.edited), ("c", self.other))
+        }
+        self.assertEqual(similarity.candidate_pairs(buckets), {("a", "b")})
@@ -1,8 +1,25 @@
 from django.urls import path
-from .views import submit_report, moderate_task
+from .views import (
+    archive_project,
+    archive_task,
+    download_report,
+    moderate_task,
+    preview_report,
+    search_reports,
+    submit_report,
+    upload_create,
+    upload_session,
+)
 
 app_name = "reports"
 urlpatterns = [
     path("submit/<int:task_id>", submit_report, name="submit"),
     path("moderate/<int:task_id>", moderate_task, name="moderate"),
+    path("file/<int:report_id>", download_report, name="download"),
+    path("preview/<int:report_id>", preview_report, name="preview"),
+    path("archive/project/<int:project_id>", archive_project, name="archive-project"),
+    path("archive/task/<int:task_id>", archive_task, name="archive-task"),
+    path("search/", search_reports, name="search"),
+    path("upload/<int:task_id>", upload_create, name="upload"),
+    path("upload/s/<uuid:upload_id>", upload_session, name="upload-session"),
 ]
@@ -1,12 +1,25 @@
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
-from django.shortcuts import redirect
-from django.http import Http404, HttpResponseForbidden
+from django.views.decorators.http import require_POST, require_safe
+from django.shortcuts import redirect, render
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotAllowed,
+    StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.utils.http import http_date
 from django.contrib import messages
-from django.db import connection
-from django.core.files.storage import default_storage
+from django.core.exceptions import PermissionDenied
+from django.db import DatabaseError, connection, transaction
+from apps.common import audit, sendfile
+from apps.jobs import queue as jobs
+from apps.projects import membership
+from apps.projects.repo import report_archive_query
+from . import archive, fulltext, storage
 from uuid import uuid4
-import json
+import base64
 
 MAX_UPLOAD = 10 * 1024 * 1024  # 10 MB
 ALLOWED_EXT = {"pdf", "doc", "docx", "txt", "md", "png", "jpg", "jpeg", "zip"}
@@ -15,52 +28,18 @@ ALLOWED_EXT = {"pdf", "doc", "docx", "txt", "md", "png", "jpg", "jpeg", "zip"}
 # --- helpers ---------------------------------------------------------------
 
 
-def _get_student_id_by_user(user_id: int):
-    with connection.cursor() as cur:
-        cur.execute("SELECT student_id FROM students WHERE user_id=%s", [user_id])
-        row = cur.fetchone()
-        return row[0] if row else None
-
-
-def _get_professor_id_by_user(user_id: int):
-    with connection.cursor() as cur:
-        cur.execute("SELECT professor_id FROM professors WHERE user_id=%s", [user_id])
-        row = cur.fetchone()
-        return row[0] if row else None
-
-
 def _task_core(task_id: int):
-    """Вернёт (project_id, executor_student) или (None, None)."""
-    with connection.cursor() as cur:
-        cur.execute(
-            "SELECT project_id, executor_student FROM tasks WHERE task_id=%s", [task_id]
-        )
-        row = cur.fetchone()
-        return (row[0], row[1]) if row else (None, None)
-
-
-def _student_on_project(student_id: int, project_id: int) -> bool:
+    """Вернёт (project_id, executor_student, last_report_id) или (None, None, None)."""
     with connection.cursor() as cur:
         cur.execute(
             """
-            SELECT 1 FROM project_members
-            WHERE project_id=%s AND member_student=%s
+            SELECT project_id, executor_student, last_report_id
+            FROM tasks WHERE task_id=%s
             """,
-            [project_id, student_id],
-        )
-        return cur.fetchone() is not None
-
-
-def _prof_on_project(professor_id: int, project_id: int) -> bool:
-    with connection.cursor() as cur:
-        cur.execute(
-            """
-            SELECT 1 FROM project_members
-            WHERE project_id=%s AND member_prof=%s
-            """,
-            [project_id, professor_id],
+            [task_id],
         )
-        return cur.fetchone() is not None
+        row = cur.fetchone()
+        return tuple(row) if row else (None, None, None)
 
 
 def _project_id_by_task(task_id: int) -> int:
@@ -70,50 +49,24 @@ def _project_id_by_task(task_id: int) -> int:
         return row[0] if row else 0
 
 
-def _insert_log(
-    action: str, actor_user_id: int | None, admin_id: int | None, details: dict
-):
-    """Безопасное логирование: при любых ошибках прав/схемы просто выходим."""
-    details_json = json.dumps(details, ensure_ascii=False)
-    try:
-        with connection.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO admin_logs (admin_id, admin_action, log_created_at, actor_user_id, details)
-                VALUES (%s, %s, now(), %s, %s::jsonb)
-                """,
-                [admin_id, action, actor_user_id, details_json],
-            )
-    except Exception as e:
-        # Сбросим соединение из "ошибочного" состояния и не мешаем основному сценарию
-        try:
-            connection.rollback()
-        except Exception:
-            pass
-        # Если хочешь, можно залогировать в stdout: print(f"admin_log skipped: {e}")
-        return
-
-
-# --- endpoints -------------------------------------------------------------
-
-
-@require_POST
-@login_required
-def submit_report(request, task_id: int):
+def _submit_denial(request, task_id: int):
+    """
+    Проверка права сдать отчёт по задаче: (project_id, student_id, отказ).
+    Отказ — (HTTP-статус, сообщение) или None.
+    """
     # Только студент может сдавать отчёт
     if getattr(request.user, "role", None) != "STUDENT":
-        return HttpResponseForbidden("Только студент может сдавать отчёт")
+        return None, None, (403, "Только студент может сдавать отчёт")
 
     # Текущий студент
-    user_pk = getattr(request.user, "user_id", None) or request.user.pk
-    sid = _get_student_id_by_user(user_pk)
+    sid = request.identity.student_id
     if not sid:
-        raise Http404("Студент не найден")
+        return None, None, (404, "Студент не найден")
 
     # Задача и назначенный исполнитель
-    project_id, executor_sid = _task_core(task_id)
+    project_id, executor_sid, _ = _task_core(task_id)
     if not project_id:
-        raise Http404("Задача не найдена")
+        return None, sid, (404, "Задача не найдена")
 
     # Запрещаем сдачу по архивной задаче/проекту
     with connection.cursor() as cur:
@@ -129,16 +82,68 @@ def submit_report(request, task_id: int):
             [task_id],
         )
         if not cur.fetchone():
-            messages.error(
-                request, "Задача или проект в архиве — сдача отчёта недоступна."
-            )
-            return redirect("projects:project-detail", project_id=project_id)
+            return project_id, sid, (409, "Задача или проект в архиве — сдача отчёта недоступна.")
 
     # Право сдачи: если исполнитель назначен — только он; иначе — любой студент-участник проекта
     if executor_sid and executor_sid != sid:
-        return HttpResponseForbidden("Вы не исполнитель этой задачи")
-    if not executor_sid and not _student_on_project(sid, project_id):
-        return HttpResponseForbidden("Вы не являетесь участником проекта")
+        return project_id, sid, (403, "Вы не исполнитель этой задачи")
+    if not executor_sid and not membership.is_member(request.identity, project_id):
+        return project_id, sid, (403, "Вы не являетесь участником проекта")
+    return project_id, sid, None
+
+
+def _file_ext(name: str) -> str:
+    return name.rsplit(".", 1)[-1].lower() if "." in name else "bin"
+
+
+def _create_report(task_id: int, sid: int, staged, external_url) -> int:
+    """
+    INSERT отчёта (общий для формы и возобновляемой загрузки); блоб встаёт
+    на место только после коммита ссылки на него. DatabaseError — наружу.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO reports (task_id, student_id, file_path, external_url, status, submitted_at)
+                VALUES (%s, %s, %s, %s, 'submitted', now())
+                RETURNING report_id
+                """,
+                [task_id, sid, staged.path if staged else None, external_url],
+            )
+            report_id = cur.fetchone()[0]
+        if staged:
+            storage.publish_on_commit(staged)
+            # превью и текст — в фоне; один файл, сданный повторно, обрабатывается один раз
+            jobs.enqueue(
+                "reports.process_file", {"file_path": staged.path}, dedup_key=staged.path
+            )
+    return report_id
+
+
+def _log_submit(request, task_id, project_id, sid, stored_path, external_url):
+    audit.log_request(
+        request, "REPORT_SUBMIT",
+        task_id=task_id, project_id=project_id, student_id=sid,
+        file_path=stored_path, external_url=external_url,
+    )
+
+
+# --- endpoints -------------------------------------------------------------
+
+
+@require_POST
+@login_required
+def submit_report(request, task_id: int):
+    project_id, sid, denial = _submit_denial(request, task_id)
+    if denial:
+        status, message = denial
+        if status == 403:
+            return HttpResponseForbidden(message)
+        if status == 404:
+            raise Http404(message)
+        messages.error(request, message)
+        return redirect("projects:project-detail", project_id=project_id)
 
     # Данные формы: файл ИЛИ ссылка (строго одно из двух)
     file = request.FILES.get("file")
@@ -151,63 +156,31 @@ def submit_report(request, task_id: int):
         messages.error(request, "Либо файл, либо ссылка — не оба сразу")
         return redirect("projects:project-detail", project_id=project_id)
 
-    # Валидация и сохранение файла (если есть)
-    stored_path = None
+    # Валидация файла (если есть) и запись во временный файл с подсчётом SHA-256
+    staged = None
     if file:
         if file.size > MAX_UPLOAD:
             messages.error(request, "Файл больше 10 MB")
             return redirect("projects:project-detail", project_id=project_id)
-        ext = file.name.rsplit(".", 1)[-1].lower() if "." in file.name else "bin"
+        ext = _file_ext(file.name)
         if ext not in ALLOWED_EXT:
             messages.error(request, f"Недопустимое расширение: .{ext}")
             return redirect("projects:project-detail", project_id=project_id)
 
-        stored_path = f"uploads/reports/{uuid4()}.{ext}"
-        # сохраняем потоково (как у тебя было)
-        with default_storage.open(stored_path, "wb+") as dst:
-            for chunk in file.chunks():
-                dst.write(chunk)
+        staged = storage.stage_upload(file, ext)
 
-    # Пишем отчёт в БД
     try:
-        with connection.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO reports (task_id, student_id, file_path, external_url, status, submitted_at)
-                VALUES (%s, %s, %s, %s, 'submitted', now())
-                """,
-                [task_id, sid, stored_path, external_url],
-            )
+        _create_report(task_id, sid, staged, external_url)
     except DatabaseError as e:
         # Наиболее частый случай при SET ROLE — нет прав на таблицу/sequence
-        try:
-            connection.rollback()
-        except Exception:
-            pass
+        if staged:
+            storage.discard(staged)
         messages.error(request, f"Не смог сохранить отчёт: {e}")
         return redirect("projects:project-detail", project_id=project_id)
 
-    # Логирование: не должно мешать основному сценарию, поэтому «тихо»
-    try:
-        _insert_log(
-            action="REPORT_SUBMIT",
-            actor_user_id=user_pk,
-            admin_id=None,
-            details={
-                "task_id": task_id,
-                "project_id": project_id,
-                "student_id": sid,
-                "file_path": stored_path,
-                "external_url": external_url,
-            },
-        )
-    except Exception:
-        try:
-            connection.rollback()
-        except Exception:
-            pass
-        # пропускаем лог при любой ошибке прав/схемы
-
+    _log_submit(
+        request, task_id, project_id, sid, staged.path if staged else None, external_url
+    )
     messages.success(request, "Отчёт отправлен")
     return redirect("projects:project-detail", project_id=project_id)
 
@@ -219,36 +192,22 @@ def moderate_task(request, task_id: int):
     if getattr(request.user, "role", None) != "PROFESSOR":
         return HttpResponseForbidden("Недостаточно прав")
 
-    pid = _get_professor_id_by_user(
-        getattr(request.user, "user_id", None) or request.user.pk
-    )
+    pid = request.identity.professor_id
     if not pid:
         raise Http404("Преподаватель не найден")
 
-    project_id, _ = _task_core(task_id)
+    # последний (неархивный) отчёт хранится в самой задаче
+    project_id, _, report_id = _task_core(task_id)
     if not project_id:
         raise Http404("Задача не найдена")
 
-    if not _prof_on_project(pid, project_id):
+    if not membership.is_member(request.identity, project_id):
         return HttpResponseForbidden("Вы не являетесь преподавателем проекта")
 
-    # последний отчёт по задаче
-    with connection.cursor() as cur:
-        cur.execute(
-            """
-            SELECT report_id FROM reports
-            WHERE task_id=%s
-            ORDER BY submitted_at DESC
-            LIMIT 1
-            """,
-            [task_id],
-        )
-        row = cur.fetchone()
-    if not row:
+    if not report_id:
         messages.error(request, "Нет отчётов для модерации")
         return redirect("projects:project-detail", project_id=project_id)
 
-    report_id = row[0]
     action = request.POST.get("action")
     comment = (request.POST.get("comment") or "").strip()
 
@@ -262,15 +221,9 @@ def moderate_task(request, task_id: int):
                 """,
                 [pid, report_id],
             )
-        _insert_log(
-            action="REPORT_APPROVE",
-            actor_user_id=getattr(request.user, "user_id", None) or request.user.pk,
-            admin_id=None,
-            details={
-                "report_id": report_id,
-                "task_id": task_id,
-                "project_id": project_id,
-            },
+        audit.log_request(
+            request, "REPORT_APPROVE",
+            report_id=report_id, task_id=task_id, project_id=project_id,
         )
         messages.success(request, "Отчёт принят")
 
@@ -287,16 +240,9 @@ def moderate_task(request, task_id: int):
                 """,
                 [pid, report_id],
             )
-        _insert_log(
-            action="REPORT_COMMENT",
-            actor_user_id=getattr(request.user, "user_id", None) or request.user.pk,
-            admin_id=None,
-            details={
-                "report_id": report_id,
-                "task_id": task_id,
-                "project_id": project_id,
-                "comment": comment,
-            },
+        audit.log_request(
+            request, "REPORT_COMMENT",
+            report_id=report_id, task_id=task_id, project_id=project_id, comment=comment,
         )
         messages.info(request, "Отчёт возвращён на доработку")
 
@@ -304,3 +250,321 @@ def moderate_task(request, task_id: int):
         messages.error(request, "Неизвестное действие")
 
     return redirect("projects:project-detail", project_id=project_id)
+
+
+def _report_file(request, report_id: int):
+    """(file_path, preview_path) отчёта с проверкой доступа: админ или участник проекта."""
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT r.file_path, a.preview_path, t.project_id
+            FROM reports r
+            JOIN tasks t ON t.task_id = r.task_id
+            LEFT JOIN report_artifacts a ON a.file_path = r.file_path
+            WHERE r.report_id=%s
+            """,
+            [report_id],
+        )
+        row = cur.fetchone()
+    if not row or not row[0]:
+        raise Http404("Файл не найден")
+    file_path, preview_path, project_id = row
+    if not membership.can_access(request.identity, project_id):
+        raise PermissionDenied("Нет доступа к отчётам проекта")
+    return file_path, preview_path
+
+
+@require_safe
+@login_required
+def download_report(request, report_id: int):
+    """Файл отчёта; саму передачу делает sendfile."""
+    file_path, _ = _report_file(request, report_id)
+    ext = file_path.rsplit(".", 1)[-1] if "." in file_path else "bin"
+    return sendfile.serve(request, file_path, f"report-{report_id}.{ext}")
+
+
+@require_safe
+@login_required
+def preview_report(request, report_id: int):
+    """PNG-превью из report_artifacts (картинка в карточке задачи)."""
+    _, preview_path = _report_file(request, report_id)
+    if not preview_path:
+        raise Http404("Превью нет")
+    return sendfile.serve(
+        request, preview_path, f"report-{report_id}.png", "image/png", inline=True
+    )
+
+
+def _archive_response(request, project_id: int, task_id: int | None, filename: str):
+    if request.identity.role not in ("PROFESSOR", "ADMIN"):
+        raise PermissionDenied("Выгрузка отчётов доступна преподавателям и администратору")
+    if not membership.can_access(request.identity, project_id):
+        raise PermissionDenied("Нет доступа к отчётам проекта")
+    latest = request.GET.get("all") != "1"
+    sql, params = report_archive_query(project_id, task_id, latest)
+    response = StreamingHttpResponse(archive.stream(request, sql, params), content_type="application/zip")
+    suffix = "" if latest else "-all"
+    response["Content-Disposition"] = f'attachment; filename="{filename}{suffix}.zip"'
+    return response
+
+
+@require_safe
+@login_required
+def archive_project(request, project_id: int):
+    """ZIP отчётов проекта: последние по каждой задаче и студенту, ?all=1 — все версии."""
+    return _archive_response(request, project_id, None, f"project-{project_id}-reports")
+
+
+@require_safe
+@login_required
+def archive_task(request, task_id: int):
+    """То же для одной задачи."""
+    project_id, _, _ = _task_core(task_id)
+    if project_id is None:
+        raise Http404("Задача не найдена")
+    return _archive_response(request, project_id, task_id, f"task-{task_id}-reports")
+
+
+@require_safe
+@login_required
+def search_reports(request):
+    """
+    Поиск по тексту файлов отчётов. Видимость — как у ProjectAccessMixin:
+    ADMIN ищет везде, остальные — только в проектах, где они участники.
+    """
+    identity = request.identity
+    q = fulltext.normalize(request.GET.get("q"))
+    faculty = (request.GET.get("faculty") or "").strip()[:100]
+    project_id = request.GET.get("project_id") or ""
+    project_id = int(project_id) if project_id.isdigit() else None
+
+    if project_id and not membership.can_access(identity, project_id):
+        raise PermissionDenied("Доступ к отчётам проекта ограничен участниками и администратором.")
+    scope = None if identity.role == "ADMIN" else membership.identity_project_ids(identity)
+
+    page, snippets = None, {}
+    if q:
+        page = fulltext.search(q, scope, project_id, faculty, request.GET.get("cursor"))
+        snippets = fulltext.headlines(q, [r["report_id"] for r in page.items])
+        for r in page.items:
+            r["snippet"] = snippets.get(r["report_id"], "")
+
+    ctx = {
+        "q": q,
+        "faculty": faculty,
+        "project_id": project_id or "",
+        "page": page,
+        "hits": page.items if page else [],
+    }
+    return render(request, "reports/search.html", ctx)
+
+
+# --- возобновляемая загрузка -------------------------------------------------
+# Подмножество tus 1.0 (core + creation):
+#   POST  /reports/upload/<task_id>   Upload-Length, Upload-Metadata: filename <base64>
+#         → 201, Location: /reports/upload/s/<upload_id>
+#   HEAD  Location → Upload-Offset, Upload-Length
+#   PATCH Location  Upload-Offset, Content-Type: application/offset+octet-stream
+#         → 204, Upload-Offset; после последнего куска — отчёт и Upload-Report-Id
+# Тело PATCH читается потоком прямо в temp-файл сессии, в памяти не копится;
+# оборванный PATCH засчитывается до последнего записанного байта.
+
+TUS_VERSION = "1.0.0"
+
+
+def _tus(response):
+    response["Tus-Resumable"] = TUS_VERSION
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def _tus_error(status: int, message: str):
+    return _tus(
+        HttpResponse(message, status=status, content_type="text/plain; charset=utf-8")
+    )
+
+
+def _int_header(request, name: str) -> int | None:
+    value = request.headers.get(name, "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def _upload_filename(metadata: str) -> str:
+    """filename из Upload-Metadata: пары «ключ base64(значение)» через запятую."""
+    for pair in metadata.split(","):
+        key, _, value = pair.strip().partition(" ")
+        if key == "filename" and value:
+            try:
+                return base64.b64decode(value, validate=True).decode("utf-8")[:255]
+            except (ValueError, UnicodeDecodeError):
+                return ""
+    return ""
+
+
+def _upload_session(cur, upload_id, sid, lock: bool = False):
+    """(task_id, file_ext, upload_length, upload_offset, expired) или None."""
+    cur.execute(
+        f"""
+        SELECT task_id, file_ext, upload_length, upload_offset, expires_at < now()
+        FROM upload_sessions
+        WHERE upload_id=%s AND student_id=%s
+        {"FOR UPDATE SKIP LOCKED" if lock else ""}
+        """,
+        [str(upload_id), sid],
+    )
+    return cur.fetchone()
+
+
+def _upload_missing(cur, upload_id, sid):
+    """Сессии нет (404) или её держит параллельный PATCH (423)."""
+    if _upload_session(cur, upload_id, sid):
+        return _tus_error(423, "Загрузка уже идёт в другом запросе")
+    return _tus_error(404, "Сессия загрузки не найдена")
+
+
+@require_POST
+@login_required
+def upload_create(request, task_id: int):
+    _, sid, denial = _submit_denial(request, task_id)
+    if denial:
+        return _tus_error(*denial)
+
+    length = _int_header(request, "Upload-Length")
+    if not length:
+        return _tus_error(400, "Нужен Upload-Length")
+    if length > MAX_UPLOAD:
+        return _tus_error(413, "Файл больше 10 MB")
+    name = _upload_filename(request.headers.get("Upload-Metadata", ""))
+    ext = _file_ext(name)
+    if ext not in ALLOWED_EXT:
+        return _tus_error(415, f"Недопустимое расширение: .{ext}")
+
+    upload_id = uuid4()
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO upload_sessions
+              (upload_id, task_id, student_id, file_name, file_ext, upload_length, expires_at)
+            VALUES (%s, %s, %s, %s, %s, %s, now() + %s)
+            RETURNING expires_at
+            """,
+            [str(upload_id), task_id, sid, name, ext, length, storage.session_ttl()],
+        )
+        expires_at = cur.fetchone()[0]
+
+    response = _tus(HttpResponse(status=201))
+    response["Location"] = reverse("reports:upload-session", args=[upload_id])
+    response["Upload-Expires"] = http_date(expires_at.timestamp())
+    return response
+
+
+@login_required
+def upload_session(request, upload_id):
+    if request.method == "HEAD":
+        return _upload_head(request, upload_id)
+    if request.method == "PATCH":
+        return _upload_patch(request, upload_id)
+    return _tus(HttpResponseNotAllowed(["HEAD", "PATCH"]))
+
+
+def _upload_head(request, upload_id):
+    with connection.cursor() as cur:
+        row = _upload_session(cur, upload_id, request.identity.student_id)
+    if not row:
+        return _tus_error(404, "Сессия загрузки не найдена")
+    _, _, length, offset, expired = row
+    if expired:
+        return _tus_error(410, "Сессия загрузки истекла")
+    response = _tus(HttpResponse())
+    response["Upload-Offset"] = str(offset)
+    response["Upload-Length"] = str(length)
+    return response
+
+
+def _upload_patch(request, upload_id):
+    if request.content_type != "application/offset+octet-stream":
+        return _tus_error(415, "Ожидается application/offset+octet-stream")
+    client_offset = _int_header(request, "Upload-Offset")
+    body_len = _int_header(request, "Content-Length")
+    if client_offset is None or body_len is None:
+        return _tus_error(400, "Нужны Upload-Offset и Content-Length")
+
+    sid = request.identity.student_id
+    # строка сессии заблокирована, пока кусок пишется на диск: параллельный
+    # PATCH той же сессии получит 423, а не перемешает байты
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            row = _upload_session(cur, upload_id, sid, lock=True)
+            if not row:
+                return _upload_missing(cur, upload_id, sid)
+            task_id, ext, length, offset, expired = row
+            if expired:
+                return _tus_error(410, "Сессия загрузки истекла")
+            if client_offset != offset:
+                response = _tus_error(409, "Upload-Offset не совпадает с сервером")
+                response["Upload-Offset"] = str(offset)
+                return response
+            if body_len > length - offset:
+                return _tus_error(413, "Кусок выходит за Upload-Length")
+
+            offset += storage.append_chunk(upload_id, offset, request, body_len)
+            cur.execute(
+                """
+                UPDATE upload_sessions SET upload_offset=%s, updated_at=now()
+                WHERE upload_id=%s
+                """,
+                [offset, str(upload_id)],
+            )
+
+    if offset < length:
+        response = _tus(HttpResponse(status=204))
+        response["Upload-Offset"] = str(offset)
+        return response
+    return _upload_finish(request, upload_id, task_id, sid, ext, length)
+
+
+def _upload_finish(request, upload_id, task_id: int, sid: int, ext: str, length: int):
+    """Все байты на диске: хеш, отчёт, сессия удаляется (повтор — PATCH с пустым телом)."""
+    # за время загрузки задачу могли заархивировать или сменить исполнителя
+    project_id, _, denial = _submit_denial(request, task_id)
+    if denial:
+        return _tus_error(*denial)
+
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cur:
+                row = _upload_session(cur, upload_id, sid, lock=True)
+                if not row:
+                    return _upload_missing(cur, upload_id, sid)
+                staged = storage.stage_file(storage.session_path(upload_id), ext)
+                if staged.size != length:
+                    # temp-файл потерян/обрезан — клиент догрузит с фактического смещения
+                    cur.execute(
+                        "UPDATE upload_sessions SET upload_offset=%s WHERE upload_id=%s",
+                        [staged.size, str(upload_id)],
+                    )
+                    response = _tus_error(409, "Файл загрузки неполный")
+                    response["Upload-Offset"] = str(staged.size)
+                    return response
+                report_id = _create_report(task_id, sid, staged, None)
+                cur.execute(
+                    "DELETE FROM upload_sessions WHERE upload_id=%s", [str(upload_id)]
+                )
+    except FileNotFoundError:
+        with connection.cursor() as cur:
+            cur.execute(
+                "UPDATE upload_sessions SET upload_offset=0 WHERE upload_id=%s",
+                [str(upload_id)],
+            )
+        response = _tus_error(409, "Файл загрузки потерян")
+        response["Upload-Offset"] = "0"
+        return response
+    except DatabaseError as e:
+        return _tus_error(403, f"Не смог сохранить отчёт: {e}")
+
+    _log_submit(request, task_id, project_id, sid, staged.path, None)
+    messages.success(request, "Отчёт отправлен")
+    response = _tus(HttpResponse(status=204))
+    response["Upload-Offset"] = str(length)
+    response["Upload-Report-Id"] = str(report_id)
+    return response
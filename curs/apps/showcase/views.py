@@ -1,18 +1,32 @@
 from django.views.generic import TemplateView
 from django.db import connection
 
+from apps.common import pagination, search
+from apps.common.pagination import Key
+
 
 PAGE_SIZE = 24
 PROJECT_STATUSES = ("active", "paused", "archived")
 
+# белый список сортировок → ключи keyset-пагинации (последний — уникальный id)
+SORT_KEYS = {
+    "release_desc": [
+        Key("release_date", desc=True, nullable=True),
+        Key("project_id", desc=True),
+    ],
+    "release_asc": [Key("release_date", nullable=True), Key("project_id")],
+    "name_asc": [Key("project_name"), Key("project_id")],
+    "name_desc": [Key("project_name", desc=True), Key("project_id", desc=True)],
+    "created_desc": [Key("created_at", desc=True), Key("project_id", desc=True)],
+    "created_asc": [Key("created_at"), Key("project_id")],
+    "id_desc": [Key("project_id", desc=True)],
+    "id_asc": [Key("project_id")],
+}
+
 
 class ShowcaseListView(TemplateView):
     template_name = "showcase/list.html"
 
-    def _fetchall_dict(self, cur):
-        cols = [c[0] for c in cur.description]
-        return [dict(zip(cols, r)) for r in cur.fetchall()]
-
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
 
@@ -24,12 +38,8 @@ class ShowcaseListView(TemplateView):
             (self.request.GET.get("show") or "active").strip().lower()
         )  # active|archived|all
         sort = (self.request.GET.get("sort") or "release_desc").strip()
-
-        try:
-            page = max(int(self.request.GET.get("page", 1) or 1), 1)
-        except Exception:
-            page = 1
-        offset = (page - 1) * PAGE_SIZE
+        if sort not in SORT_KEYS:
+            sort = "release_desc"
 
         # --- динамические части (строго по белым спискам!)
         arch_sql = {
@@ -38,57 +48,47 @@ class ShowcaseListView(TemplateView):
             "all": "TRUE",
         }.get(show, "p.archived_at IS NULL")
 
-        order_by = {
-            "release_desc": "p.release_date DESC NULLS LAST",
-            "release_asc": "p.release_date ASC  NULLS LAST",
-            "name_asc": "p.project_name ASC",
-            "name_desc": "p.project_name DESC",
-            "created_desc": "p.created_at DESC",
-            "created_asc": "p.created_at ASC",
-            "id_desc": "p.project_id DESC",
-            "id_asc": "p.project_id ASC",
-        }.get(sort, "p.release_date DESC NULLS LAST")
-
         status_param = status if status in PROJECT_STATUSES else None
+        # при поиске сначала самые релевантные, затем выбранная сортировка
+        s = search.build(q, ["p.search_text"], "p.project_id DESC")
 
         # --- запрос
         with connection.cursor() as cur:
-            cur.execute(
+            page = pagination.paginate(
+                cur,
                 f"""
                 SELECT p.project_id,
                        p.project_name,
                        p.project_status,
+                       p.created_at,
                        p.release_date,
                        p.specialization,
-                       p.archived_at
+                       p.archived_at,
+                       {s.rank} AS rank
                   FROM projects p
                  WHERE ({arch_sql})
-                   AND (%s = '' OR p.project_name ILIKE '%%'||%s||'%%'
-                               OR p.specialization ILIKE '%%'||%s||'%%')
+                   AND {s.where}
                    AND (%s = '' OR p.specialization ILIKE '%%'||%s||'%%')
                    AND (%s IS NULL OR p.project_status = %s::project_status)
-                 ORDER BY {order_by}
-                 LIMIT %s OFFSET %s
                 """,
                 [
-                    q,
-                    q,
-                    q,  # поиск по имени/специализации
+                    *s.rank_params,
+                    *s.where_params,  # поиск по имени/специализации
                     spec,
                     spec,  # фильтр по спецу (отдельное поле)
                     status_param,
                     status_param,
-                    PAGE_SIZE,
-                    offset,
                 ],
+                s.keys(*SORT_KEYS[sort]),
+                self.request.GET.get("cursor"),
+                PAGE_SIZE,
             )
-            ctx["items"] = self._fetchall_dict(cur)
+            ctx["items"] = page.items
 
         # --- контекст для шаблона
         ctx.update(
             {
                 "page": page,
-                "page_size": PAGE_SIZE,
                 "q": q,
                 "status": status if status in PROJECT_STATUSES else "",
                 "spec": spec,
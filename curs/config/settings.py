@@ -58,6 +58,7 @@ INSTALLED_APPS = [
     "apps.reports",
     "apps.showcase",
     "apps.adminboard",
+    "apps.jobs",
 ]
 
 MIDDLEWARE = [
@@ -68,6 +69,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.accounts.middleware.attach_identity",
     "apps.accounts.middleware.set_db_role",
 ]
 
@@ -106,10 +108,31 @@ DATABASES = {
         "OPTIONS": {
             "connect_timeout": 5,
         },
+        # Постоянные соединения: состояние роли сбрасывается в
+        # apps.accounts.db_hygiene, битые соединения отсекает health check.
+        "CONN_MAX_AGE": int(os.getenv("PG_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
 
+# Cache: по умолчанию в памяти процесса. Для нескольких воркеров задайте REDIS_URL,
+# иначе инвалидация кеша членства видна только своему процессу (остальные — по TTL).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+if os.getenv("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+    }
+
+# Сколько секунд кешируется набор активных проектов участника (apps.projects.membership)
+MEMBERSHIP_CACHE_TTL = int(os.getenv("MEMBERSHIP_CACHE_TTL", "60"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 AUTH_USER_MODEL = "accounts.User"
@@ -152,13 +175,57 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Через сколько часов без ссылок файл отчёта удаляет manage.py gc_report_blobs
+REPORT_BLOB_GC_GRACE_HOURS = int(os.getenv("REPORT_BLOB_GC_GRACE_HOURS", "24"))
+# Отдача файлов отчётов (apps.common.sendfile): "" — сам Django, nginx — X-Accel-Redirect, apache — X-Sendfile
+SENDFILE_BACKEND = os.getenv("SENDFILE_BACKEND", "")
+# internal-location nginx, смотрящий в MEDIA_ROOT
+SENDFILE_NGINX_PREFIX = os.getenv("SENDFILE_NGINX_PREFIX", "/protected-media/")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
-FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
+# Всё крупнее — во временный файл на диске, а не в память воркера
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024
+# Сколько часов живёт сессия возобновляемой загрузки отчёта (upload_sessions)
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+
+# Переключение роли БД в apps.accounts.middleware.set_db_role: local | session | off
+DB_ROLE_MODE = os.getenv("DB_ROLE_MODE", "local")
+# URL-префиксы, которым роль БД не нужна (например, публичная витрина)
+DB_ROLE_SKIP_PREFIXES = tuple(
+    p for p in os.getenv("DB_ROLE_SKIP_PREFIXES", "").split(",") if p
+)
+
+# Сколько секунд контекст личности (request.identity) живёт в сессии без перечитывания
+IDENTITY_MAX_AGE = int(os.getenv("IDENTITY_MAX_AGE", "300"))
+
+# Фоновая очередь apps.jobs (manage.py run_workers)
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "2"))
+# Как часто воркер проверяет очередь без NOTIFY (отложенные задачи, повторы)
+JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", "5"))
+# running дольше этого — воркер считается умершим, задача идёт на повтор
+JOBS_STALE_SECONDS = int(os.getenv("JOBS_STALE_SECONDS", "900"))
+# Задержка повтора: base·2^(попытка-1), не больше max
+JOBS_BACKOFF_BASE_SECONDS = int(os.getenv("JOBS_BACKOFF_BASE_SECONDS", "10"))
+JOBS_BACKOFF_MAX_SECONDS = int(os.getenv("JOBS_BACKOFF_MAX_SECONDS", "3600"))
+# Сколько дней хранить выполненные/упавшие задачи
+JOBS_KEEP_DAYS = int(os.getenv("JOBS_KEEP_DAYS", "14"))
+
+# Журнал admin_logs (apps.common.audit): buffered — пачками после коммита, sync — в транзакции действия
+AUDIT_LOG_DURABILITY = os.getenv("AUDIT_LOG_DURABILITY", "buffered")
+# Пачка пишется при AUDIT_BATCH_SIZE событиях или через AUDIT_FLUSH_SECONDS после первого
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "2"))
+# Предел очереди процесса; при переполнении запрос ждёт AUDIT_BLOCK_SECONDS и пишет сам
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+AUDIT_BLOCK_SECONDS = float(os.getenv("AUDIT_BLOCK_SECONDS", "0.5"))
+# Сколько месяцев хранить секции admin_logs и на сколько вперёд их создавать
+AUDIT_LOG_RETENTION_MONTHS = int(os.getenv("AUDIT_LOG_RETENTION_MONTHS", "24"))
+AUDIT_LOG_PARTITIONS_AHEAD = int(os.getenv("AUDIT_LOG_PARTITIONS_AHEAD", "3"))
 
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/login/"
@@ -17,8 +17,6 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 from apps.accounts.views import RootRedirect
 
 urlpatterns = [
@@ -39,6 +37,7 @@ urlpatterns = [
         "adminboard/",
         include(("apps.adminboard.urls", "adminboard"), namespace="adminboard"),
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+# MEDIA_ROOT наружу не публикуется: файлы отчётов отдаёт reports:download с проверкой прав
 
 handler403 = "config.views.error_403"
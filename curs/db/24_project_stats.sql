@@ -0,0 +1,217 @@
+-- =========================
+-- PROJECT_STATS: счётчики задач/отчётов по проекту для прогресса и рейтинга
+-- =========================
+-- Поддерживаются statement-level триггерами на tasks/reports: за один оператор
+-- пересчитываются только затронутые проекты (через transition tables).
+-- overdue_tasks зависит от now(), поэтому дополнительно освежается
+-- fn_project_stats_rebuild() (manage.py rebuild_project_stats).
+
+CREATE TABLE IF NOT EXISTS project_stats (
+  project_id     BIGINT PRIMARY KEY REFERENCES projects(project_id) ON DELETE CASCADE,
+  total_tasks    INTEGER NOT NULL DEFAULT 0,
+  done_tasks     INTEGER NOT NULL DEFAULT 0,
+  overdue_tasks  INTEGER NOT NULL DEFAULT 0,
+  open_reviews   INTEGER NOT NULL DEFAULT 0,
+  last_activity  TIMESTAMPTZ,
+  ratio_pct      NUMERIC(5,2) GENERATED ALWAYS AS (
+                   CASE WHEN total_tasks = 0 THEN 0
+                        ELSE ROUND(100.0 * done_tasks / total_tasks, 2)
+                   END) STORED,
+  updated_at     TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Порядок рейтинга ProjectsRankingView: ORDER BY ... LIMIT идёт по индексу
+CREATE INDEX IF NOT EXISTS idx_project_stats_ranking
+  ON project_stats (ratio_pct DESC, total_tasks DESC, last_activity DESC NULLS LAST, project_id DESC);
+
+-- Пересчёт набора проектов
+CREATE OR REPLACE FUNCTION fn_project_stats_refresh(p_project_ids BIGINT[])
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+  IF p_project_ids IS NULL OR cardinality(p_project_ids) = 0 THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO project_stats AS ps
+    (project_id, total_tasks, done_tasks, overdue_tasks, open_reviews, last_activity, updated_at)
+  SELECT p.project_id,
+         COALESCE(t.total, 0),
+         COALESCE(t.done, 0),
+         COALESCE(t.overdue, 0),
+         COALESCE(rv.open_reviews, 0),
+         ra.last_activity,
+         now()
+  FROM projects p
+  LEFT JOIN LATERAL (
+    SELECT COUNT(*) AS total,
+           COUNT(*) FILTER (WHERE t.task_status = 'done') AS done,
+           COUNT(*) FILTER (WHERE t.task_status <> 'done'
+                              AND t.archived_at IS NULL
+                              AND t.task_deadline < now()) AS overdue
+    FROM tasks t
+    WHERE t.project_id = p.project_id
+  ) t ON TRUE
+  LEFT JOIN LATERAL (
+    SELECT MAX(COALESCE(r.reviewed_at, r.submitted_at)) AS last_activity
+    FROM tasks t
+    JOIN reports r ON r.task_id = t.task_id
+    WHERE t.project_id = p.project_id
+  ) ra ON TRUE
+  LEFT JOIN LATERAL (
+    -- задачи, чей последний (неархивный) отчёт ждёт проверки
+    SELECT COUNT(*) AS open_reviews
+    FROM tasks t
+    WHERE t.project_id = p.project_id
+      AND (SELECT r.status
+             FROM reports r
+            WHERE r.task_id = t.task_id AND r.archived_at IS NULL
+            ORDER BY r.submitted_at DESC, r.report_id DESC
+            LIMIT 1) = 'submitted'
+  ) rv ON TRUE
+  WHERE p.project_id = ANY (p_project_ids)
+  ON CONFLICT (project_id) DO UPDATE
+    SET total_tasks   = EXCLUDED.total_tasks,
+        done_tasks    = EXCLUDED.done_tasks,
+        overdue_tasks = EXCLUDED.overdue_tasks,
+        open_reviews  = EXCLUDED.open_reviews,
+        last_activity = EXCLUDED.last_activity,
+        updated_at    = EXCLUDED.updated_at;
+END $$;
+
+-- Полный пересчёт (разовый backfill и периодическое обновление overdue)
+CREATE OR REPLACE FUNCTION fn_project_stats_rebuild()
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_ids BIGINT[];
+BEGIN
+  SELECT array_agg(project_id) INTO v_ids FROM projects;
+  PERFORM fn_project_stats_refresh(v_ids);
+  RETURN COALESCE(cardinality(v_ids), 0);
+END $$;
+
+-- TASKS → затронутые проекты
+CREATE OR REPLACE FUNCTION fn_project_stats_on_tasks()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_ids BIGINT[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(DISTINCT project_id) INTO v_ids FROM new_rows;
+  ELSIF TG_OP = 'UPDATE' THEN
+    SELECT array_agg(DISTINCT project_id) INTO v_ids
+    FROM (SELECT project_id FROM new_rows UNION SELECT project_id FROM old_rows) x;
+  ELSE
+    SELECT array_agg(DISTINCT project_id) INTO v_ids FROM old_rows;
+  END IF;
+  PERFORM fn_project_stats_refresh(v_ids);
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_project_stats_tasks_ins ON tasks;
+CREATE TRIGGER trg_project_stats_tasks_ins
+AFTER INSERT ON tasks
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_project_stats_on_tasks();
+
+DROP TRIGGER IF EXISTS trg_project_stats_tasks_upd ON tasks;
+CREATE TRIGGER trg_project_stats_tasks_upd
+AFTER UPDATE ON tasks
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_project_stats_on_tasks();
+
+DROP TRIGGER IF EXISTS trg_project_stats_tasks_del ON tasks;
+CREATE TRIGGER trg_project_stats_tasks_del
+AFTER DELETE ON tasks
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_project_stats_on_tasks();
+
+-- REPORTS → задачи → затронутые проекты
+CREATE OR REPLACE FUNCTION fn_project_stats_on_reports()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_ids BIGINT[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(DISTINCT t.project_id) INTO v_ids
+    FROM new_rows r JOIN tasks t ON t.task_id = r.task_id;
+  ELSIF TG_OP = 'UPDATE' THEN
+    SELECT array_agg(DISTINCT t.project_id) INTO v_ids
+    FROM (SELECT task_id FROM new_rows UNION SELECT task_id FROM old_rows) r
+    JOIN tasks t ON t.task_id = r.task_id;
+  ELSE
+    SELECT array_agg(DISTINCT t.project_id) INTO v_ids
+    FROM old_rows r JOIN tasks t ON t.task_id = r.task_id;
+  END IF;
+  PERFORM fn_project_stats_refresh(v_ids);
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_project_stats_reports_ins ON reports;
+CREATE TRIGGER trg_project_stats_reports_ins
+AFTER INSERT ON reports
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_project_stats_on_reports();
+
+DROP TRIGGER IF EXISTS trg_project_stats_reports_upd ON reports;
+CREATE TRIGGER trg_project_stats_reports_upd
+AFTER UPDATE ON reports
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_project_stats_on_reports();
+
+DROP TRIGGER IF EXISTS trg_project_stats_reports_del ON reports;
+CREATE TRIGGER trg_project_stats_reports_del
+AFTER DELETE ON reports
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_project_stats_on_reports();
+
+-- PROJECTS: строка статистики появляется вместе с проектом
+CREATE OR REPLACE FUNCTION fn_project_stats_on_projects()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+  INSERT INTO project_stats (project_id)
+  SELECT project_id FROM new_rows
+  ON CONFLICT (project_id) DO NOTHING;
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_project_stats_projects_ins ON projects;
+CREATE TRIGGER trg_project_stats_projects_ins
+AFTER INSERT ON projects
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_project_stats_on_projects();
+
+-- Права
+REVOKE ALL ON FUNCTION fn_project_stats_refresh(bigint[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION fn_project_stats_rebuild() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION fn_project_stats_rebuild() TO role_admin;
+GRANT SELECT ON project_stats TO role_student, role_professor, role_admin;
+
+-- Первичное наполнение
+SELECT fn_project_stats_rebuild();
@@ -0,0 +1,148 @@
+-- =========================
+-- TASKS: последний (неархивный) отчёт прямо в строке задачи
+-- =========================
+-- Списки задач и ui_status строятся по одной таблице, без LATERAL по reports.
+-- Колонки поддерживает fn_sync_task_status_from_reports (триггеры на reports
+-- и fn_archive_report / fn_unarchive_report из 21_func.sql).
+-- 21_func.sql уже применён на существующих базах, поэтому функция и триггеры
+-- переопределяются здесь.
+
+ALTER TABLE tasks
+  ADD COLUMN IF NOT EXISTS last_report_id     BIGINT,
+  ADD COLUMN IF NOT EXISTS last_report_status report_status,
+  ADD COLUMN IF NOT EXISTS last_report_at     TIMESTAMPTZ;
+-- Без FK на reports: ON DELETE SET NULL упёрся бы в блокировку архивных задач,
+-- а актуальность и так поддерживается триггерами.
+
+-- История отчётов задачи и выбор последнего — по индексу
+CREATE INDEX IF NOT EXISTS idx_reports_task_submitted
+  ON reports (task_id, submitted_at DESC, report_id DESC);
+
+-- TASK STATUS + последний отчёт
+-- SECURITY DEFINER: студент сдаёт отчёт, но UPDATE на tasks у него нет.
+CREATE OR REPLACE FUNCTION fn_sync_task_status_from_reports(p_task_id BIGINT)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_id     BIGINT;
+  v_status report_status;
+  v_at     TIMESTAMPTZ;
+BEGIN
+  -- раньше здесь было archived_at = NULL (всегда NULL), и статус задачи не синхронизировался
+  SELECT r.report_id, r.status, r.submitted_at
+  INTO v_id, v_status, v_at
+  FROM reports r
+  WHERE r.task_id = p_task_id AND r.archived_at IS NULL
+  ORDER BY r.submitted_at DESC, r.report_id DESC
+  LIMIT 1;
+
+  -- архивные задачи не трогаем (их блокирует trg_block_updates_on_archived_task)
+  UPDATE tasks t
+     SET last_report_id     = v_id,
+         last_report_status = v_status,
+         last_report_at     = v_at,
+         task_status = CASE
+                         WHEN v_status IS NULL       THEN t.task_status
+                         WHEN v_status = 'approved'  THEN 'done'::task_status
+                         ELSE 'in_review'::task_status
+                       END
+   WHERE t.task_id = p_task_id
+     AND t.archived_at IS NULL
+     AND (t.last_report_id     IS DISTINCT FROM v_id
+       OR t.last_report_status IS DISTINCT FROM v_status
+       OR t.last_report_at     IS DISTINCT FROM v_at
+       OR (v_status = 'approved' AND t.task_status <> 'done')
+       OR (v_status IN ('submitted', 'needs_fix') AND t.task_status <> 'in_review'));
+END $$;
+
+CREATE OR REPLACE FUNCTION fn_after_report_delete_sync_task()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM fn_sync_task_status_from_reports(OLD.task_id);
+  RETURN OLD;
+END $$;
+
+-- archived_at тоже: отчёт могут архивировать прямым UPDATE, минуя fn_archive_report
+DROP TRIGGER IF EXISTS trg_after_report_update_sync_task ON reports;
+CREATE TRIGGER trg_after_report_update_sync_task
+AFTER UPDATE OF status, submitted_at, archived_at ON reports
+FOR EACH ROW
+EXECUTE FUNCTION fn_after_report_upsert_sync_task();
+
+DROP TRIGGER IF EXISTS trg_after_report_delete_sync_task ON reports;
+CREATE TRIGGER trg_after_report_delete_sync_task
+AFTER DELETE ON reports
+FOR EACH ROW
+EXECUTE FUNCTION fn_after_report_delete_sync_task();
+
+-- open_reviews в project_stats — тоже по колонкам задачи
+CREATE OR REPLACE FUNCTION fn_project_stats_refresh(p_project_ids BIGINT[])
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+  IF p_project_ids IS NULL OR cardinality(p_project_ids) = 0 THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO project_stats AS ps
+    (project_id, total_tasks, done_tasks, overdue_tasks, open_reviews, last_activity, updated_at)
+  SELECT p.project_id,
+         COALESCE(t.total, 0),
+         COALESCE(t.done, 0),
+         COALESCE(t.overdue, 0),
+         COALESCE(t.open_reviews, 0),
+         ra.last_activity,
+         now()
+  FROM projects p
+  LEFT JOIN LATERAL (
+    SELECT COUNT(*) AS total,
+           COUNT(*) FILTER (WHERE t.task_status = 'done') AS done,
+           COUNT(*) FILTER (WHERE t.task_status <> 'done'
+                              AND t.archived_at IS NULL
+                              AND t.task_deadline < now()) AS overdue,
+           COUNT(*) FILTER (WHERE t.last_report_status = 'submitted') AS open_reviews
+    FROM tasks t
+    WHERE t.project_id = p.project_id
+  ) t ON TRUE
+  LEFT JOIN LATERAL (
+    SELECT MAX(COALESCE(r.reviewed_at, r.submitted_at)) AS last_activity
+    FROM tasks t
+    JOIN reports r ON r.task_id = t.task_id
+    WHERE t.project_id = p.project_id
+  ) ra ON TRUE
+  WHERE p.project_id = ANY (p_project_ids)
+  ON CONFLICT (project_id) DO UPDATE
+    SET total_tasks   = EXCLUDED.total_tasks,
+        done_tasks    = EXCLUDED.done_tasks,
+        overdue_tasks = EXCLUDED.overdue_tasks,
+        open_reviews  = EXCLUDED.open_reviews,
+        last_activity = EXCLUDED.last_activity,
+        updated_at    = EXCLUDED.updated_at;
+END $$;
+
+-- Первичное наполнение. Архивные задачи тоже заполняем, поэтому блокировку
+-- на время backfill выключаем (всё в одной транзакции apply_sql).
+ALTER TABLE tasks DISABLE TRIGGER trg_block_updates_on_archived_task;
+
+UPDATE tasks t
+   SET last_report_id     = lr.report_id,
+       last_report_status = lr.status,
+       last_report_at     = lr.submitted_at
+  FROM (
+    SELECT DISTINCT ON (r.task_id) r.task_id, r.report_id, r.status, r.submitted_at
+    FROM reports r
+    WHERE r.archived_at IS NULL
+    ORDER BY r.task_id, r.submitted_at DESC, r.report_id DESC
+  ) lr
+ WHERE lr.task_id = t.task_id;
+
+ALTER TABLE tasks ENABLE TRIGGER trg_block_updates_on_archived_task;
+
+SELECT fn_project_stats_rebuild();
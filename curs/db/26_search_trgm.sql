@@ -0,0 +1,60 @@
+-- =========================
+-- ПОИСК: pg_trgm по сгенерированным search_text
+-- =========================
+-- Подстрочный поиск (ILIKE '%q%') в админке и витрине идёт по GIN-индексам
+-- триграмм, ранжирование — word_similarity(). Запросы строит apps/common/search.py.
+-- search_text хранится в нижнем регистре; чужие таблицы в генерированную
+-- колонку не попадают, поэтому ФИО студента ищется по users.search_text.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- USERS
+ALTER TABLE users
+  ADD COLUMN IF NOT EXISTS full_name TEXT GENERATED ALWAYS AS (
+    last_name || ' ' || first_name || COALESCE(' ' || middle_name, '')
+  ) STORED;
+
+ALTER TABLE users
+  ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+    lower(last_name || ' ' || first_name || COALESCE(' ' || middle_name, '')
+          || ' ' || login::text)
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_users_search_trgm
+  ON users USING gin (search_text gin_trgm_ops);
+
+-- STUDENTS
+ALTER TABLE students
+  ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+    lower(group_number || ' ' || faculty)
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_students_search_trgm
+  ON students USING gin (search_text gin_trgm_ops);
+
+-- PROFESSORS
+ALTER TABLE professors
+  ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+    lower(department || ' ' || faculty)
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_professors_search_trgm
+  ON professors USING gin (search_text gin_trgm_ops);
+
+-- PROJECTS (id тоже: в админке ищут по номеру проекта)
+ALTER TABLE projects
+  ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+    lower(project_name || COALESCE(' ' || specialization, '') || ' ' || project_id::text)
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_projects_search_trgm
+  ON projects USING gin (search_text gin_trgm_ops);
+
+-- TASKS
+ALTER TABLE tasks
+  ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+    lower(task_name)
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_search_trgm
+  ON tasks USING gin (search_text gin_trgm_ops);
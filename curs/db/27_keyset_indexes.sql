@@ -0,0 +1,31 @@
+-- =========================
+-- KEYSET-ПАГИНАЦИЯ: составные индексы под порядок страниц
+-- =========================
+-- Ключи задаются во views (apps/common/pagination.py); последний ключ — id,
+-- поэтому он входит в каждый индекс. Btree читается и в обратную сторону,
+-- так что «Назад» использует тот же индекс.
+
+-- users_list: фильтр по роли + user_id DESC (без роли хватает PK)
+CREATE INDEX IF NOT EXISTS idx_users_role_keyset
+  ON users (role, user_id DESC);
+
+-- кандидаты в project_members_admin: (full_name, user_id)
+CREATE INDEX IF NOT EXISTS idx_users_full_name_keyset
+  ON users (full_name, user_id);
+
+-- tasks_list с фильтром по проекту: (project_id, task_id DESC); заменяет idx_tasks_project
+CREATE INDEX IF NOT EXISTS idx_tasks_project_keyset
+  ON tasks (project_id, task_id DESC);
+DROP INDEX IF EXISTS idx_tasks_project;
+
+-- витрина: сортировки release_* / name_* / created_*
+CREATE INDEX IF NOT EXISTS idx_projects_release_keyset
+  ON projects (release_date DESC NULLS LAST, project_id DESC);
+CREATE INDEX IF NOT EXISTS idx_projects_release_asc_keyset
+  ON projects (release_date ASC NULLS LAST, project_id ASC);
+CREATE INDEX IF NOT EXISTS idx_projects_name_keyset
+  ON projects (project_name, project_id);
+CREATE INDEX IF NOT EXISTS idx_projects_created_keyset
+  ON projects (created_at, project_id);
+
+-- рейтинг: idx_project_stats_ranking из 24_project_stats.sql уже совпадает с ключами
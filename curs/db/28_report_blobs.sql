@@ -0,0 +1,79 @@
+-- =========================
+-- REPORT_BLOBS: счётчик ссылок на файлы отчётов
+-- =========================
+-- Файл отчёта хранится один раз под SHA-256 содержимого
+-- (uploads/blobs/<2 символа>/<sha256>.<ext>, apps/reports/storage.py).
+-- Ссылка = неархивный отчёт с таким file_path. Когда последняя ссылка уходит
+-- (fn_archive_report, прямой UPDATE archived_at, DELETE отчёта/задачи каскадом),
+-- блоб помечается orphaned_at, файл удаляет manage.py gc_report_blobs
+-- после grace-периода. Старые файлы uploads/reports/<uuid>.* не считаются.
+
+CREATE TABLE IF NOT EXISTS report_blobs (
+  file_path   VARCHAR(512) PRIMARY KEY,
+  ref_count   INTEGER NOT NULL DEFAULT 0 CHECK (ref_count >= 0),
+  created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  orphaned_at TIMESTAMPTZ
+);
+
+-- очередь GC: только блобы без ссылок
+CREATE INDEX IF NOT EXISTS idx_report_blobs_orphaned
+  ON report_blobs (orphaned_at) WHERE ref_count = 0;
+
+-- SECURITY DEFINER: студент вставляет отчёт, но писать в report_blobs не может
+CREATE OR REPLACE FUNCTION fn_report_blobs_refs()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_old VARCHAR(512);
+  v_new VARCHAR(512);
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE')
+     AND OLD.archived_at IS NULL AND OLD.file_path LIKE 'uploads/blobs/%' THEN
+    v_old := OLD.file_path;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE')
+     AND NEW.archived_at IS NULL AND NEW.file_path LIKE 'uploads/blobs/%' THEN
+    v_new := NEW.file_path;
+  END IF;
+
+  IF v_old IS NOT DISTINCT FROM v_new THEN
+    RETURN NULL;
+  END IF;
+
+  IF v_old IS NOT NULL THEN
+    UPDATE report_blobs
+       SET ref_count   = GREATEST(ref_count - 1, 0),
+           orphaned_at = CASE WHEN ref_count <= 1 THEN now() END
+     WHERE file_path = v_old;
+  END IF;
+
+  IF v_new IS NOT NULL THEN
+    INSERT INTO report_blobs AS b (file_path, ref_count)
+    VALUES (v_new, 1)
+    ON CONFLICT (file_path) DO UPDATE
+      SET ref_count = b.ref_count + 1, orphaned_at = NULL;
+  END IF;
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_report_blobs_refs ON reports;
+CREATE TRIGGER trg_report_blobs_refs
+AFTER INSERT OR UPDATE OF file_path, archived_at OR DELETE ON reports
+FOR EACH ROW
+EXECUTE FUNCTION fn_report_blobs_refs();
+
+-- Бэкфилл для баз, где уже есть отчёты с путями в uploads/blobs/
+INSERT INTO report_blobs AS b (file_path, ref_count, orphaned_at)
+SELECT r.file_path,
+       COUNT(*) FILTER (WHERE r.archived_at IS NULL),
+       CASE WHEN COUNT(*) FILTER (WHERE r.archived_at IS NULL) = 0 THEN now() END
+FROM reports r
+WHERE r.file_path LIKE 'uploads/blobs/%'
+GROUP BY r.file_path
+ON CONFLICT (file_path) DO UPDATE
+  SET ref_count = EXCLUDED.ref_count, orphaned_at = EXCLUDED.orphaned_at;
+
+GRANT SELECT ON report_blobs TO role_admin;
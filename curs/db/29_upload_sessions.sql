@@ -0,0 +1,27 @@
+-- =========================
+-- UPLOAD_SESSIONS: возобновляемая загрузка файла отчёта
+-- =========================
+-- Сессия создаётся POST /reports/upload/<task_id>, тело собирается
+-- PATCH-запросами во временном файле uploads/tmp/<upload_id> (см.
+-- apps/reports/views.py, upload_*). upload_offset — сколько байт уже на диске;
+-- когда он доходит до upload_length, файл хешируется, вставляется отчёт,
+-- а строка сессии удаляется. Просроченные сессии чистит manage.py gc_report_blobs.
+
+CREATE TABLE IF NOT EXISTS upload_sessions (
+  upload_id     UUID PRIMARY KEY,
+  task_id       BIGINT NOT NULL REFERENCES tasks(task_id) ON DELETE CASCADE,
+  student_id    BIGINT NOT NULL REFERENCES students(student_id) ON DELETE CASCADE,
+  file_name     VARCHAR(255) NOT NULL,
+  file_ext      VARCHAR(16) NOT NULL,
+  upload_length BIGINT NOT NULL CHECK (upload_length > 0),
+  upload_offset BIGINT NOT NULL DEFAULT 0,
+  created_at    TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at    TIMESTAMPTZ NOT NULL DEFAULT now(),
+  expires_at    TIMESTAMPTZ NOT NULL,
+  CONSTRAINT upload_sessions_offset_chk CHECK (upload_offset BETWEEN 0 AND upload_length)
+);
+
+CREATE INDEX IF NOT EXISTS idx_upload_sessions_expires ON upload_sessions (expires_at);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON upload_sessions TO role_student;
+GRANT SELECT, DELETE ON upload_sessions TO role_admin;
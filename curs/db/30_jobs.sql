@@ -0,0 +1,99 @@
+-- =========================
+-- JOBS: фоновая очередь задач в PostgreSQL (apps/jobs)
+-- =========================
+-- Постановка — fn_job_enqueue в транзакции вызывающего: задача видна воркерам
+-- только после коммита (и не появится вовсе при откате).
+-- Воркеры (manage.py run_workers) забирают по одной через
+-- FOR UPDATE SKIP LOCKED в порядке (priority, run_at, job_id); упавшая задача
+-- возвращается в queued с run_at в будущем (экспоненциальная задержка),
+-- после max_attempts — failed. Зависшие running (умерший воркер)
+-- возвращаются в очередь по locked_at.
+
+DO $$ BEGIN
+  CREATE TYPE job_status AS ENUM ('queued','running','done','failed');
+EXCEPTION WHEN duplicate_object THEN NULL; END $$;
+
+CREATE TABLE IF NOT EXISTS jobs (
+  job_id       BIGSERIAL PRIMARY KEY,
+  job_type     VARCHAR(100) NOT NULL,
+  payload      JSONB NOT NULL DEFAULT '{}'::jsonb,
+  priority     SMALLINT NOT NULL DEFAULT 100,  -- меньше — раньше
+  status       job_status NOT NULL DEFAULT 'queued',
+  attempts     INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 5 CHECK (max_attempts > 0),
+  dedup_key    VARCHAR(200),
+  run_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+  created_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  started_at   TIMESTAMPTZ,
+  finished_at  TIMESTAMPTZ,
+  locked_by    VARCHAR(100),
+  locked_at    TIMESTAMPTZ,
+  last_error   TEXT
+);
+
+-- выбор следующей задачи — по частичному индексу, done/failed его не раздувают
+CREATE INDEX IF NOT EXISTS idx_jobs_claim
+  ON jobs (priority, run_at, job_id) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_jobs_running
+  ON jobs (locked_at) WHERE status = 'running';
+-- статистика (job_stats) и чистка старых done/failed
+CREATE INDEX IF NOT EXISTS idx_jobs_finished
+  ON jobs (finished_at, job_type) WHERE finished_at IS NOT NULL;
+-- не больше одной живой (ждёт или выполняется) задачи на (job_type, dedup_key):
+-- периодические задачи не копятся, пока предыдущая ещё работает,
+-- а повтор упавшей (running -> queued) не конфликтует сам с собой
+CREATE UNIQUE INDEX IF NOT EXISTS ux_jobs_dedup
+  ON jobs (job_type, dedup_key)
+  WHERE status IN ('queued', 'running') AND dedup_key IS NOT NULL;
+
+-- Постановка из кода под любой ролью: прямого доступа к jobs у ролей нет.
+-- Возвращает job_id или NULL, если задача с такой dedup_key уже ждёт или выполняется.
+CREATE OR REPLACE FUNCTION fn_job_enqueue(
+  p_job_type     VARCHAR,
+  p_payload      JSONB DEFAULT '{}'::jsonb,
+  p_priority     SMALLINT DEFAULT 100,
+  p_run_at       TIMESTAMPTZ DEFAULT now(),
+  p_max_attempts INTEGER DEFAULT 5,
+  p_dedup_key    VARCHAR DEFAULT NULL
+)
+RETURNS BIGINT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_id BIGINT;
+BEGIN
+  INSERT INTO jobs (job_type, payload, priority, run_at, max_attempts, dedup_key)
+  VALUES (p_job_type, COALESCE(p_payload, '{}'::jsonb), p_priority,
+          COALESCE(p_run_at, now()), p_max_attempts, p_dedup_key)
+  ON CONFLICT (job_type, dedup_key)
+    WHERE status IN ('queued', 'running') AND dedup_key IS NOT NULL
+  DO NOTHING
+  RETURNING job_id INTO v_id;
+
+  -- разбудить воркеры, ждущие в LISTEN (доставится после коммита)
+  IF v_id IS NOT NULL THEN
+    PERFORM pg_notify('jobs', p_job_type);
+  END IF;
+  RETURN v_id;
+END $$;
+
+REVOKE ALL ON FUNCTION fn_job_enqueue(VARCHAR, JSONB, SMALLINT, TIMESTAMPTZ, INTEGER, VARCHAR) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION fn_job_enqueue(VARCHAR, JSONB, SMALLINT, TIMESTAMPTZ, INTEGER, VARCHAR)
+  TO role_student, role_professor, role_admin;
+
+-- =========================
+-- JOB_SCHEDULES: периодические задачи
+-- =========================
+-- Строки синхронизирует run_workers из реестра (@job(..., every=...)).
+-- Срок забирает один воркер (SKIP LOCKED) и ставит задачу в очередь.
+
+CREATE TABLE IF NOT EXISTS job_schedules (
+  job_type      VARCHAR(100) PRIMARY KEY,
+  every_seconds INTEGER NOT NULL CHECK (every_seconds > 0),
+  next_run_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  last_run_at   TIMESTAMPTZ
+);
+
+GRANT SELECT ON jobs, job_schedules TO role_admin;
@@ -0,0 +1,23 @@
+-- =========================
+-- REPORT_ARTIFACTS: результаты обработки файлов отчётов
+-- =========================
+-- Заполняет фоновая задача reports.process_file (apps/reports/artifacts.py),
+-- которую _create_report ставит в той же транзакции, что и INSERT отчёта.
+-- Ключ — file_path: блобы контентно-адресуемые, поэтому одинаковый файл,
+-- сданный несколько раз, обрабатывается один раз.
+-- processed_at IS NULL — ещё не обработан; error — обработка не удалась.
+
+CREATE TABLE IF NOT EXISTS report_artifacts (
+  file_path    VARCHAR(512) PRIMARY KEY,
+  mime_type    VARCHAR(100),
+  size_bytes   BIGINT,
+  page_count   INTEGER,
+  text_content TEXT,                          -- извлечённый текст (с ограничением длины)
+  preview_path VARCHAR(512),                  -- PNG первой страницы / картинки
+  meta         JSONB NOT NULL DEFAULT '{}'::jsonb,  -- размеры картинки, оглавление zip и т.п.
+  error        TEXT,
+  created_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  processed_at TIMESTAMPTZ
+);
+
+GRANT SELECT ON report_artifacts TO role_student, role_professor, role_admin;
@@ -0,0 +1,24 @@
+-- =========================
+-- REPORT_ARTIFACTS: полнотекстовый поиск по содержимому отчётов
+-- =========================
+-- Текст извлекает reports.process_file (apps/reports/artifacts.py); индексируются
+-- только текстовые форматы (txt, md, pdf, docx) — оглавление zip сюда не идёт.
+-- Две конфигурации: russian (кириллица + english_stem для латиницы) и english
+-- (английские стоп-слова). Текст режется до 100k символов: tsvector ограничен 1 МБ.
+
+ALTER TABLE report_artifacts
+  ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (
+    CASE WHEN mime_type IN (
+           'text/plain',
+           'text/markdown',
+           'application/pdf',
+           'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+         )
+    THEN to_tsvector('russian'::regconfig, left(COALESCE(text_content, ''), 100000))
+      || to_tsvector('english'::regconfig, left(COALESCE(text_content, ''), 100000))
+    END
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_report_artifacts_tsv
+  ON report_artifacts USING GIN (search_tsv);
@@ -0,0 +1,45 @@
+-- =========================
+-- REPORT_SIMILARITY: MinHash-сигнатуры и LSH для поиска похожих отчётов
+-- =========================
+-- Считает reports.process_file после извлечения текста (apps/reports/similarity.py),
+-- пакетно — manage.py scan_report_similarity. Ключ, как и у report_artifacts, —
+-- file_path: удаление артефактов сборщиком блобов каскадом чистит и эти таблицы.
+--
+-- report_signatures  — 128 × uint32 (little-endian) = 512 байт на файл;
+--                      sig_version меняется вместе с параметрами MinHash.
+-- report_lsh_buckets — по строке на полосу (32 на файл): кандидаты в похожие —
+--                      файлы с той же (band, bucket), поиск идёт по PK.
+-- report_similar_pairs — пары с оценкой Жаккара ≥ порога, file_a < file_b.
+
+CREATE TABLE IF NOT EXISTS report_signatures (
+  file_path   VARCHAR(512) PRIMARY KEY REFERENCES report_artifacts(file_path) ON DELETE CASCADE,
+  sig_version SMALLINT NOT NULL,
+  shingles    INTEGER NOT NULL,
+  signature   BYTEA NOT NULL,
+  created_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS report_lsh_buckets (
+  band      SMALLINT NOT NULL,
+  bucket    BIGINT NOT NULL,
+  file_path VARCHAR(512) NOT NULL REFERENCES report_signatures(file_path) ON DELETE CASCADE,
+  PRIMARY KEY (band, bucket, file_path)
+);
+
+CREATE INDEX IF NOT EXISTS idx_report_lsh_buckets_file
+  ON report_lsh_buckets(file_path);
+
+CREATE TABLE IF NOT EXISTS report_similar_pairs (
+  file_a     VARCHAR(512) NOT NULL REFERENCES report_signatures(file_path) ON DELETE CASCADE,
+  file_b     VARCHAR(512) NOT NULL REFERENCES report_signatures(file_path) ON DELETE CASCADE,
+  similarity REAL NOT NULL,
+  found_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (file_a, file_b),
+  CONSTRAINT report_similar_pairs_order_chk CHECK (file_a < file_b COLLATE "C")
+);
+
+CREATE INDEX IF NOT EXISTS idx_report_similar_pairs_b
+  ON report_similar_pairs(file_b);
+
+-- панель «похожие отчёты» у проверки
+GRANT SELECT ON report_similar_pairs TO role_professor, role_admin;
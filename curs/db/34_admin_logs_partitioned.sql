@@ -0,0 +1,107 @@
+-- =========================
+-- ADMIN_LOGS: помесячные секции, хранение — удалением старых секций
+-- =========================
+-- Таблица становится секционированной по log_created_at (RANGE, месяц на секцию,
+-- имя admin_logs_YYYY_MM). Секции наперёд создаёт fn_admin_logs_ensure_partitions,
+-- старые удаляет fn_admin_logs_drop_partitions — оба зовёт ежедневная задача
+-- adminboard.audit_partitions (apps/adminboard/jobs.py). DROP секции — мгновенно
+-- и без раздувания, в отличие от DELETE по дате.
+-- Секции DEFAULT нет: строка вне существующих секций — ошибка, поэтому секции
+-- создаются на несколько месяцев вперёд.
+-- PK обязан включать ключ секционирования: (admin_log_id, log_created_at).
+-- Последовательность admin_log_id переезжает со старой таблицы вместе с правами.
+
+ALTER TABLE admin_logs RENAME TO admin_logs_old;
+ALTER INDEX IF EXISTS idx_admin_logs_action  RENAME TO idx_admin_logs_old_action;
+ALTER INDEX IF EXISTS idx_admin_logs_created RENAME TO idx_admin_logs_old_created;
+ALTER INDEX IF EXISTS idx_admin_logs_details RENAME TO idx_admin_logs_old_details;
+ALTER TABLE admin_logs_old RENAME CONSTRAINT admin_logs_pkey TO admin_logs_old_pkey;
+
+CREATE TABLE admin_logs (
+  admin_log_id    BIGINT NOT NULL DEFAULT nextval('admin_logs_admin_log_id_seq'),
+  admin_id        BIGINT REFERENCES admins(admin_id) ON DELETE SET NULL,
+  admin_action    VARCHAR(100) NOT NULL,
+  log_created_at  TIMESTAMPTZ  NOT NULL DEFAULT now(),
+  actor_user_id   BIGINT REFERENCES users(user_id) ON DELETE SET NULL,
+  details         JSONB NOT NULL DEFAULT '{}'::jsonb,
+  PRIMARY KEY (admin_log_id, log_created_at)
+) PARTITION BY RANGE (log_created_at);
+
+ALTER SEQUENCE admin_logs_admin_log_id_seq OWNED BY admin_logs.admin_log_id;
+
+-- индексы родителя создаются и на каждой секции
+-- просмотр журнала: keyset по (log_created_at, admin_log_id)
+CREATE INDEX IF NOT EXISTS idx_admin_logs_created ON admin_logs (log_created_at, admin_log_id);
+CREATE INDEX IF NOT EXISTS idx_admin_logs_action  ON admin_logs (admin_action, log_created_at);
+-- фильтры details @> '{"project_id": …}'
+CREATE INDEX IF NOT EXISTS idx_admin_logs_details ON admin_logs USING GIN (details);
+
+
+-- Секции с месяца p_from до текущего месяца + p_ahead. Вернёт число созданных.
+CREATE OR REPLACE FUNCTION fn_admin_logs_ensure_partitions(
+  p_ahead INTEGER DEFAULT 3,
+  p_from  TIMESTAMPTZ DEFAULT now()
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  m       DATE := date_trunc('month', p_from)::date;
+  m_last  DATE := (date_trunc('month', now()) + make_interval(months => p_ahead))::date;
+  part    TEXT;
+  created INTEGER := 0;
+BEGIN
+  WHILE m <= m_last LOOP
+    part := format('admin_logs_%s', to_char(m, 'YYYY_MM'));
+    IF to_regclass(part) IS NULL THEN
+      EXECUTE format(
+        'CREATE TABLE %I PARTITION OF admin_logs FOR VALUES FROM (%L) TO (%L)',
+        part, m::timestamptz, (m + INTERVAL '1 month')::timestamptz
+      );
+      created := created + 1;
+    END IF;
+    m := (m + INTERVAL '1 month')::date;
+  END LOOP;
+  RETURN created;
+END $$;
+
+-- Удалить секции, целиком старше p_keep_months месяцев. Вернёт имена удалённых.
+CREATE OR REPLACE FUNCTION fn_admin_logs_drop_partitions(p_keep_months INTEGER)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  cutoff DATE := (date_trunc('month', now()) - make_interval(months => p_keep_months))::date;
+  part   TEXT;
+BEGIN
+  FOR part IN
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'admin_logs'::regclass
+      AND c.relname ~ '^admin_logs_\d{4}_\d{2}$'
+      AND to_date(substr(c.relname, 12), 'YYYY_MM') < cutoff
+    ORDER BY c.relname
+  LOOP
+    EXECUTE format('DROP TABLE %I', part);
+    RETURN NEXT part;
+  END LOOP;
+END $$;
+
+REVOKE EXECUTE ON FUNCTION fn_admin_logs_ensure_partitions(INTEGER, TIMESTAMPTZ) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION fn_admin_logs_drop_partitions(INTEGER) FROM PUBLIC;
+
+-- перенос истории: секции от самой старой записи
+SELECT fn_admin_logs_ensure_partitions(
+  3, COALESCE((SELECT min(log_created_at) FROM admin_logs_old), now())
+);
+
+INSERT INTO admin_logs (admin_log_id, admin_id, admin_action, log_created_at, actor_user_id, details)
+SELECT admin_log_id, admin_id, admin_action, log_created_at, actor_user_id, details
+FROM admin_logs_old;
+
+DROP TABLE admin_logs_old;
+
+-- права как у прежней таблицы (db/22_roles_seed.sql): пишут все, читает админ
+GRANT INSERT ON admin_logs TO role_student, role_professor, role_admin;
+GRANT SELECT, UPDATE, DELETE ON admin_logs TO role_admin;
@@ -0,0 +1,217 @@
+-- =========================
+-- REVIEW_LATENCY_DAILY: время проверки отчётов (submitted_at → reviewed_at)
+-- =========================
+-- Ячейка — (день проверки, проект, преподаватель): число проверок, сумма секунд
+-- и гистограмма по логарифмическим корзинам. Гистограммы складываются
+-- поэлементно (агрегат review_hist_sum), так что p50/p90/p99 за любой период
+-- считаются по сотням строк сводки, а не по reports (apps/analytics/latency.py).
+--
+-- Корзина 0 — до минуты включительно, корзина i — (60·2^((i-1)/4), 60·2^(i/4)] секунд:
+-- четыре корзины на удвоение, относительная ошибка квантиля не больше ~19%,
+-- последняя (79) собирает всё дольше ~1,5 лет. Границы повторяет latency.py.
+--
+-- Заполняется дельтами из statement-level триггеров на reports: старая версия
+-- строки вычитается, новая прибавляется (UPSERT складывает, а не перезаписывает,
+-- поэтому параллельные проверки не теряют друг друга). Перенос задачи в другой
+-- проект и удаление задачи вместе с отчётами дельтами не ловятся — их догоняет
+-- ежедневный fn_review_latency_rebuild() (задача analytics.rebuild_review_latency).
+-- День — по Europe/Moscow (settings.TIME_ZONE), professor_id 0 — проверяющий удалён.
+
+CREATE TABLE IF NOT EXISTS review_latency_daily (
+  day            DATE    NOT NULL,
+  project_id     BIGINT  NOT NULL REFERENCES projects(project_id) ON DELETE CASCADE,
+  professor_id   BIGINT  NOT NULL,
+  reviews        INTEGER NOT NULL,
+  total_seconds  BIGINT  NOT NULL,
+  buckets        INTEGER[] NOT NULL,
+  PRIMARY KEY (day, project_id, professor_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_review_latency_professor ON review_latency_daily (professor_id, day);
+CREATE INDEX IF NOT EXISTS idx_review_latency_project   ON review_latency_daily (project_id, day);
+
+
+CREATE OR REPLACE FUNCTION fn_review_latency_bucket(p_seconds DOUBLE PRECISION)
+RETURNS INTEGER
+LANGUAGE sql IMMUTABLE
+AS $$
+  SELECT CASE WHEN p_seconds <= 60 THEN 0
+              ELSE LEAST(79, ceil(4 * ln(p_seconds / 60) / ln(2)))::int
+         END
+$$;
+
+-- Плотная гистограмма из пар (корзина, вес); веса одной корзины складываются
+CREATE OR REPLACE FUNCTION fn_review_latency_histogram(p_buckets INTEGER[], p_weights INTEGER[])
+RETURNS INTEGER[]
+LANGUAGE sql IMMUTABLE
+AS $$
+  SELECT array_agg(COALESCE(h.n, 0)::int ORDER BY g.i)
+  FROM generate_series(0, 79) g(i)
+  LEFT JOIN (
+    SELECT b, SUM(w) AS n FROM unnest(p_buckets, p_weights) x(b, w) GROUP BY b
+  ) h ON h.b = g.i
+$$;
+
+-- Поэлементная сумма гистограмм
+CREATE OR REPLACE FUNCTION fn_review_latency_add(a INTEGER[], b INTEGER[])
+RETURNS INTEGER[]
+LANGUAGE sql IMMUTABLE STRICT
+AS $$
+  SELECT array_agg(COALESCE(a[i], 0) + COALESCE(b[i], 0) ORDER BY i)
+  FROM generate_series(1, 80) i
+$$;
+
+CREATE OR REPLACE AGGREGATE review_hist_sum(INTEGER[]) (
+  SFUNC = fn_review_latency_add,
+  STYPE = INTEGER[]
+);
+
+
+DO $$ BEGIN
+  CREATE TYPE review_latency_delta AS (
+    task_id       BIGINT,
+    professor_id  BIGINT,
+    submitted_at  TIMESTAMPTZ,
+    reviewed_at   TIMESTAMPTZ,
+    sign          INTEGER
+  );
+EXCEPTION WHEN duplicate_object THEN NULL; END $$;
+
+-- Применить дельты проверок (sign = +1 / -1) к сводке
+CREATE OR REPLACE FUNCTION fn_review_latency_apply(p_deltas review_latency_delta[])
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+  IF p_deltas IS NULL OR cardinality(p_deltas) = 0 THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO review_latency_daily AS d
+    (day, project_id, professor_id, reviews, total_seconds, buckets)
+  SELECT x.day, x.project_id, x.professor_id,
+         SUM(x.sign), SUM(x.sign * x.seconds),
+         fn_review_latency_histogram(array_agg(fn_review_latency_bucket(x.seconds)), array_agg(x.sign))
+  FROM (
+    SELECT (r.reviewed_at AT TIME ZONE 'Europe/Moscow')::date AS day,
+           t.project_id,
+           r.professor_id,
+           r.sign,
+           GREATEST(round(extract(epoch FROM r.reviewed_at - r.submitted_at)), 0)::bigint AS seconds
+    FROM unnest(p_deltas) r
+    JOIN tasks t ON t.task_id = r.task_id
+  ) x
+  GROUP BY x.day, x.project_id, x.professor_id
+  ORDER BY x.day, x.project_id, x.professor_id   -- один порядок блокировок у всех
+  ON CONFLICT (day, project_id, professor_id) DO UPDATE
+    SET reviews       = d.reviews + EXCLUDED.reviews,
+        total_seconds = d.total_seconds + EXCLUDED.total_seconds,
+        buckets       = fn_review_latency_add(d.buckets, EXCLUDED.buckets);
+
+  DELETE FROM review_latency_daily
+  WHERE reviews <= 0
+    AND day IN (SELECT DISTINCT (reviewed_at AT TIME ZONE 'Europe/Moscow')::date FROM unnest(p_deltas));
+END $$;
+
+-- REPORTS → дельты. В UPDATE учитываются только строки, у которых поменялось
+-- что-то из ключа или времени (архивация, смена файла сводку не трогают).
+CREATE OR REPLACE FUNCTION fn_review_latency_on_reports()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_deltas review_latency_delta[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(ROW(task_id, COALESCE(reviewed_by_prof, 0), submitted_at, reviewed_at, 1)::review_latency_delta)
+      INTO v_deltas
+    FROM new_rows WHERE reviewed_at IS NOT NULL;
+  ELSIF TG_OP = 'UPDATE' THEN
+    WITH o AS (
+      SELECT report_id, task_id, COALESCE(reviewed_by_prof, 0) AS professor_id, submitted_at, reviewed_at
+      FROM old_rows WHERE reviewed_at IS NOT NULL
+    ), n AS (
+      SELECT report_id, task_id, COALESCE(reviewed_by_prof, 0) AS professor_id, submitted_at, reviewed_at
+      FROM new_rows WHERE reviewed_at IS NOT NULL
+    )
+    SELECT array_agg(ROW(task_id, professor_id, submitted_at, reviewed_at, sign)::review_latency_delta)
+      INTO v_deltas
+    FROM (
+      SELECT *, -1 AS sign FROM (SELECT * FROM o EXCEPT ALL SELECT * FROM n) gone
+      UNION ALL
+      SELECT *, 1 FROM (SELECT * FROM n EXCEPT ALL SELECT * FROM o) came
+    ) d;
+  ELSE
+    SELECT array_agg(ROW(task_id, COALESCE(reviewed_by_prof, 0), submitted_at, reviewed_at, -1)::review_latency_delta)
+      INTO v_deltas
+    FROM old_rows WHERE reviewed_at IS NOT NULL;
+  END IF;
+  PERFORM fn_review_latency_apply(v_deltas);
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_review_latency_reports_ins ON reports;
+CREATE TRIGGER trg_review_latency_reports_ins
+AFTER INSERT ON reports
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_review_latency_on_reports();
+
+DROP TRIGGER IF EXISTS trg_review_latency_reports_upd ON reports;
+CREATE TRIGGER trg_review_latency_reports_upd
+AFTER UPDATE ON reports
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_review_latency_on_reports();
+
+DROP TRIGGER IF EXISTS trg_review_latency_reports_del ON reports;
+CREATE TRIGGER trg_review_latency_reports_del
+AFTER DELETE ON reports
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_review_latency_on_reports();
+
+
+-- Полный пересчёт из reports (backfill и ежедневная сверка). Вернёт число ячеек.
+-- EXCLUSIVE: чтение сводки идёт, дельты триггеров ждут конца пересчёта.
+CREATE OR REPLACE FUNCTION fn_review_latency_rebuild()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_cells INTEGER;
+BEGIN
+  LOCK TABLE review_latency_daily IN EXCLUSIVE MODE;
+  DELETE FROM review_latency_daily;
+
+  INSERT INTO review_latency_daily (day, project_id, professor_id, reviews, total_seconds, buckets)
+  SELECT x.day, x.project_id, x.professor_id,
+         COUNT(*), SUM(x.seconds),
+         fn_review_latency_histogram(array_agg(fn_review_latency_bucket(x.seconds)),
+                                     array_fill(1, ARRAY[COUNT(*)::int]))
+  FROM (
+    SELECT (r.reviewed_at AT TIME ZONE 'Europe/Moscow')::date AS day,
+           t.project_id,
+           COALESCE(r.reviewed_by_prof, 0) AS professor_id,
+           GREATEST(round(extract(epoch FROM r.reviewed_at - r.submitted_at)), 0)::bigint AS seconds
+    FROM reports r
+    JOIN tasks t ON t.task_id = r.task_id
+    WHERE r.reviewed_at IS NOT NULL
+  ) x
+  GROUP BY x.day, x.project_id, x.professor_id;
+
+  GET DIAGNOSTICS v_cells = ROW_COUNT;
+  RETURN v_cells;
+END $$;
+
+REVOKE EXECUTE ON FUNCTION fn_review_latency_rebuild() FROM PUBLIC;
+
+SELECT fn_review_latency_rebuild();
+
+GRANT SELECT ON review_latency_daily TO role_professor, role_admin;
@@ -0,0 +1,188 @@
+-- =========================
+-- PROJECT_ACTIVITY_DAILY: события по проекту за день (для спарклайнов)
+-- =========================
+-- Счётчики только растут: каждое событие прибавляет единицу в ячейку
+-- (проект, день) и больше не меняется — повторная проверка того же отчёта
+-- это новое событие, удаление отчёта старую активность не стирает.
+-- Поддерживается statement-level триггерами на reports/tasks, читается
+-- по PK диапазоном дней (apps/analytics/activity.py), сырые таблицы не трогаются.
+--
+--   submissions    — сданные отчёты (день submitted_at);
+--   approvals      — отчёт принят (день reviewed_at);
+--   needs_fix      — отчёт возвращён на доработку (день reviewed_at);
+--   tasks_created  — новые задачи (день вставки: времени создания в tasks нет,
+--                    поэтому история задач начинается с этой миграции).
+--
+-- fn_project_activity_backfill() восстанавливает отчётные колонки из reports
+-- по текущему состоянию: промежуточные возвраты, уже перезаписанные
+-- повторной проверкой, из reports не восстановить.
+-- День — по Europe/Moscow (settings.TIME_ZONE).
+
+CREATE TABLE IF NOT EXISTS project_activity_daily (
+  project_id     BIGINT  NOT NULL REFERENCES projects(project_id) ON DELETE CASCADE,
+  day            DATE    NOT NULL,
+  submissions    INTEGER NOT NULL DEFAULT 0,
+  approvals      INTEGER NOT NULL DEFAULT 0,
+  needs_fix      INTEGER NOT NULL DEFAULT 0,
+  tasks_created  INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (project_id, day)
+);
+
+
+-- Прибавить события: (проект, момент, вид) → ячейки дня
+CREATE OR REPLACE FUNCTION fn_project_activity_add(
+  p_project_ids BIGINT[],
+  p_at          TIMESTAMPTZ[],
+  p_kinds       TEXT[]
+)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+  IF p_project_ids IS NULL OR cardinality(p_project_ids) = 0 THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO project_activity_daily AS a
+    (project_id, day, submissions, approvals, needs_fix, tasks_created)
+  SELECT e.project_id,
+         (e.at AT TIME ZONE 'Europe/Moscow')::date,
+         COUNT(*) FILTER (WHERE e.kind = 'submitted'),
+         COUNT(*) FILTER (WHERE e.kind = 'approved'),
+         COUNT(*) FILTER (WHERE e.kind = 'needs_fix'),
+         COUNT(*) FILTER (WHERE e.kind = 'task')
+  FROM unnest(p_project_ids, p_at, p_kinds) e(project_id, at, kind)
+  GROUP BY 1, 2
+  ORDER BY 1, 2   -- один порядок блокировок у всех
+  ON CONFLICT (project_id, day) DO UPDATE
+    SET submissions   = a.submissions   + EXCLUDED.submissions,
+        approvals     = a.approvals     + EXCLUDED.approvals,
+        needs_fix     = a.needs_fix     + EXCLUDED.needs_fix,
+        tasks_created = a.tasks_created + EXCLUDED.tasks_created;
+END $$;
+
+-- REPORTS: вставка — сдача (и проверка, если отчёт вставлен уже проверенным);
+-- обновление — проверка, если поменялись статус или время проверки
+CREATE OR REPLACE FUNCTION fn_project_activity_on_reports()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_ids   BIGINT[];
+  v_at    TIMESTAMPTZ[];
+  v_kinds TEXT[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(t.project_id), array_agg(e.at), array_agg(e.kind)
+      INTO v_ids, v_at, v_kinds
+    FROM new_rows r
+    JOIN tasks t ON t.task_id = r.task_id
+    CROSS JOIN LATERAL (
+      VALUES ('submitted', r.submitted_at), (r.status::text, r.reviewed_at)
+    ) e(kind, at)
+    WHERE e.kind IN ('submitted', 'approved', 'needs_fix') AND e.at IS NOT NULL;
+  ELSE
+    SELECT array_agg(t.project_id), array_agg(n.reviewed_at), array_agg(n.status::text)
+      INTO v_ids, v_at, v_kinds
+    FROM new_rows n
+    JOIN old_rows o ON o.report_id = n.report_id
+    JOIN tasks t ON t.task_id = n.task_id
+    WHERE n.status IN ('approved', 'needs_fix')
+      AND (o.status IS DISTINCT FROM n.status OR o.reviewed_at IS DISTINCT FROM n.reviewed_at);
+  END IF;
+  PERFORM fn_project_activity_add(v_ids, v_at, v_kinds);
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_project_activity_reports_ins ON reports;
+CREATE TRIGGER trg_project_activity_reports_ins
+AFTER INSERT ON reports
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_project_activity_on_reports();
+
+DROP TRIGGER IF EXISTS trg_project_activity_reports_upd ON reports;
+CREATE TRIGGER trg_project_activity_reports_upd
+AFTER UPDATE ON reports
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_project_activity_on_reports();
+
+-- TASKS: новая задача
+CREATE OR REPLACE FUNCTION fn_project_activity_on_tasks()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_ids   BIGINT[];
+  v_at    TIMESTAMPTZ[];
+  v_kinds TEXT[];
+BEGIN
+  SELECT array_agg(project_id), array_agg(now()), array_agg('task'::text)
+    INTO v_ids, v_at, v_kinds
+  FROM new_rows;
+  PERFORM fn_project_activity_add(v_ids, v_at, v_kinds);
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_project_activity_tasks_ins ON tasks;
+CREATE TRIGGER trg_project_activity_tasks_ins
+AFTER INSERT ON tasks
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_project_activity_on_tasks();
+
+
+-- Восстановить submissions/approvals/needs_fix из reports (tasks_created не трогает).
+-- Вернёт число ячеек с отчётной активностью.
+CREATE OR REPLACE FUNCTION fn_project_activity_backfill()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_cells INTEGER;
+BEGIN
+  -- триггеры ждут: иначе их прибавка потеряется при перезаписи ячейки
+  LOCK TABLE project_activity_daily IN EXCLUSIVE MODE;
+
+  UPDATE project_activity_daily
+     SET submissions = 0, approvals = 0, needs_fix = 0
+   WHERE submissions <> 0 OR approvals <> 0 OR needs_fix <> 0;
+
+  INSERT INTO project_activity_daily AS a (project_id, day, submissions, approvals, needs_fix)
+  SELECT e.project_id,
+         (e.at AT TIME ZONE 'Europe/Moscow')::date,
+         COUNT(*) FILTER (WHERE e.kind = 'submitted'),
+         COUNT(*) FILTER (WHERE e.kind = 'approved'),
+         COUNT(*) FILTER (WHERE e.kind = 'needs_fix')
+  FROM (
+    SELECT t.project_id, 'submitted' AS kind, r.submitted_at AS at
+    FROM reports r JOIN tasks t ON t.task_id = r.task_id
+    UNION ALL
+    SELECT t.project_id, r.status::text, r.reviewed_at
+    FROM reports r JOIN tasks t ON t.task_id = r.task_id
+    WHERE r.status IN ('approved', 'needs_fix') AND r.reviewed_at IS NOT NULL
+  ) e
+  GROUP BY 1, 2
+  ON CONFLICT (project_id, day) DO UPDATE
+    SET submissions = EXCLUDED.submissions,
+        approvals   = EXCLUDED.approvals,
+        needs_fix   = EXCLUDED.needs_fix;
+
+  GET DIAGNOSTICS v_cells = ROW_COUNT;
+  RETURN v_cells;
+END $$;
+
+REVOKE EXECUTE ON FUNCTION fn_project_activity_backfill() FROM PUBLIC;
+
+SELECT fn_project_activity_backfill();
+
+GRANT SELECT ON project_activity_daily TO role_student, role_professor, role_admin;
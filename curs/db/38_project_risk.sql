@@ -0,0 +1,35 @@
+-- =========================
+-- PROJECT_RISK: риск не успеть к release_date (страница adminboard)
+-- =========================
+-- Таблицу целиком перезаписывает задача adminboard.project_risk
+-- (apps/adminboard/risk.py): все задачи активных проектов читаются одним
+-- запросом, признаки и балл считаются векторно в NumPy.
+-- score 0..100; компоненты 0..1 — вклад каждого признака до весов:
+--   pace    — хватит ли текущей скорости закрытия задач до релиза;
+--   overdue — доля открытых задач с прошедшим дедлайном;
+--   backlog — доля открытых задач, чей последний отчёт ждёт проверки;
+--   idle    — давно ли по проекту не было отчётов.
+
+CREATE TABLE IF NOT EXISTS project_risk (
+  project_id         BIGINT PRIMARY KEY REFERENCES projects(project_id) ON DELETE CASCADE,
+  score              REAL    NOT NULL,
+  main_factor        VARCHAR(16) NOT NULL,
+  pace               REAL    NOT NULL,
+  overdue            REAL    NOT NULL,
+  backlog            REAL    NOT NULL,
+  idle               REAL    NOT NULL,
+  total_tasks        INTEGER NOT NULL,
+  open_tasks         INTEGER NOT NULL,
+  overdue_tasks      INTEGER NOT NULL,
+  pending_reviews    INTEGER NOT NULL,
+  velocity_per_week  REAL    NOT NULL,  -- принятых задач в неделю за окно скорости
+  weeks_needed       REAL,              -- NULL — скорость нулевая, а задачи есть
+  weeks_left         REAL    NOT NULL,  -- до release_date, < 0 — релиз прошёл
+  idle_days          REAL,              -- NULL — отчётов не было
+  computed_at        TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- страница: самые рискованные сверху, keyset по (score, project_id)
+CREATE INDEX IF NOT EXISTS idx_project_risk_score ON project_risk (score DESC, project_id DESC);
+
+GRANT SELECT ON project_risk TO role_admin;
@@ -0,0 +1,9 @@
+-- =========================
+-- Последний отчёт студента по задаче (ведомость, apps/projects/gradebook.py)
+-- =========================
+-- DISTINCT ON (task_id, student_id) ... ORDER BY task_id, student_id,
+-- submitted_at DESC, report_id DESC идёт по индексу без сортировки.
+-- idx_reports_task_submitted для этого не годится: в нём нет student_id.
+CREATE INDEX IF NOT EXISTS idx_reports_task_student_submitted
+  ON reports (task_id, student_id, submitted_at DESC, report_id DESC)
+  WHERE archived_at IS NULL;
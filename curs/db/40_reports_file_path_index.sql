@@ -0,0 +1,7 @@
+-- =========================
+-- REPORTS: поиск отчёта по file_path
+-- =========================
+-- Артефакты, поиск и похожие отчёты ищут отчёты по file_path
+-- (artifacts.process, fulltext.search, similarity.similar_for_reports).
+CREATE INDEX IF NOT EXISTS idx_reports_file_path
+  ON reports (file_path) WHERE file_path IS NOT NULL;
@@ -0,0 +1,70 @@
+-- =========================
+-- PROJECT_STATS: пересчёт под блокировкой проекта
+-- =========================
+-- fn_project_stats_refresh пересчитывает счётчики целиком и перезаписывает
+-- строку. Без блокировки две параллельные транзакции по одному проекту
+-- (две новые задачи, сдача + проверка) считали каждая по своему снимку, и
+-- вторая перезаписывала строку счётчиками без изменений первой — до
+-- ежечасного fn_project_stats_rebuild().
+-- Теперь проекты сначала блокируются (по порядку project_id, чтобы не было
+-- взаимоблокировок), а считается уже следующим оператором: в READ COMMITTED
+-- он берёт новый снимок и видит всё, что закоммитил прежний держатель.
+-- FOR NO KEY UPDATE, а не FOR UPDATE: не конфликтует с FOR KEY SHARE, который
+-- берут проверки FK при вставке задач, — иначе две вставки задач в один
+-- проект взаимно блокировались бы.
+-- Тело — из 25_task_last_report.sql, добавлена только блокировка.
+
+CREATE OR REPLACE FUNCTION fn_project_stats_refresh(p_project_ids BIGINT[])
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+  IF p_project_ids IS NULL OR cardinality(p_project_ids) = 0 THEN
+    RETURN;
+  END IF;
+
+  PERFORM 1
+  FROM projects
+  WHERE project_id = ANY (p_project_ids)
+  ORDER BY project_id
+  FOR NO KEY UPDATE;
+
+  INSERT INTO project_stats AS ps
+    (project_id, total_tasks, done_tasks, overdue_tasks, open_reviews, last_activity, updated_at)
+  SELECT p.project_id,
+         COALESCE(t.total, 0),
+         COALESCE(t.done, 0),
+         COALESCE(t.overdue, 0),
+         COALESCE(t.open_reviews, 0),
+         ra.last_activity,
+         now()
+  FROM projects p
+  LEFT JOIN LATERAL (
+    SELECT COUNT(*) AS total,
+           COUNT(*) FILTER (WHERE t.task_status = 'done') AS done,
+           COUNT(*) FILTER (WHERE t.task_status <> 'done'
+                              AND t.archived_at IS NULL
+                              AND t.task_deadline < now()) AS overdue,
+           COUNT(*) FILTER (WHERE t.last_report_status = 'submitted') AS open_reviews
+    FROM tasks t
+    WHERE t.project_id = p.project_id
+  ) t ON TRUE
+  LEFT JOIN LATERAL (
+    SELECT MAX(COALESCE(r.reviewed_at, r.submitted_at)) AS last_activity
+    FROM tasks t
+    JOIN reports r ON r.task_id = t.task_id
+    WHERE t.project_id = p.project_id
+  ) ra ON TRUE
+  WHERE p.project_id = ANY (p_project_ids)
+  ON CONFLICT (project_id) DO UPDATE
+    SET total_tasks   = EXCLUDED.total_tasks,
+        done_tasks    = EXCLUDED.done_tasks,
+        overdue_tasks = EXCLUDED.overdue_tasks,
+        open_reviews  = EXCLUDED.open_reviews,
+        last_activity = EXCLUDED.last_activity,
+        updated_at    = EXCLUDED.updated_at;
+END $$;
+
+REVOKE ALL ON FUNCTION fn_project_stats_refresh(bigint[]) FROM PUBLIC;
@@ -0,0 +1,124 @@
+-- =========================
+-- ANALYTICS: время обновления — в отдельной таблице, а не в строках представлений
+-- =========================
+-- В 35_analytics_mv.sql в каждой строке было now() AS refreshed_at.
+-- REFRESH ... CONCURRENTLY сопоставляет старые и новые строки целиком,
+-- а со свежим now() не совпадала ни одна: каждое обновление удаляло и
+-- вставляло всё представление заново (раздувание, WAL, дороже обычного
+-- REFRESH). Представления пересоздаются без этой колонки; время обновления
+-- пишет fn_analytics_refresh() в однострочную analytics_refresh.
+
+DROP MATERIALIZED VIEW IF EXISTS mv_project_ranking;
+DROP MATERIALIZED VIEW IF EXISTS mv_specialization_totals;
+DROP MATERIALIZED VIEW IF EXISTS mv_faculty_completion;
+
+-- Рейтинг проектов: position — место в общем порядке, по нему и листается
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_project_ranking AS
+SELECT row_number() OVER w AS position,
+       s.project_id,
+       p.project_name,
+       p.project_status,
+       p.release_date,
+       p.specialization,
+       s.total_tasks AS total,
+       s.done_tasks  AS done,
+       s.overdue_tasks AS overdue,
+       s.ratio_pct,
+       s.last_activity
+FROM project_stats s
+JOIN projects p ON p.project_id = s.project_id
+WINDOW w AS (ORDER BY s.ratio_pct DESC, s.total_tasks DESC,
+                      s.last_activity DESC NULLS LAST, s.project_id DESC);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_project_ranking_project
+  ON mv_project_ranking (project_id);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_project_ranking_position
+  ON mv_project_ranking (position);
+
+-- Итоги по специализациям проектов
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_specialization_totals AS
+SELECT COALESCE(NULLIF(p.specialization, ''), '—') AS specialization,
+       COUNT(*) AS projects,
+       COUNT(*) FILTER (WHERE p.project_status = 'active') AS active_projects,
+       COALESCE(SUM(s.total_tasks), 0) AS total_tasks,
+       COALESCE(SUM(s.done_tasks), 0) AS done_tasks,
+       COALESCE(SUM(s.overdue_tasks), 0) AS overdue_tasks,
+       CASE WHEN COALESCE(SUM(s.total_tasks), 0) = 0 THEN 0
+            ELSE ROUND(100.0 * SUM(s.done_tasks) / SUM(s.total_tasks), 2)
+       END AS ratio_pct
+FROM projects p
+LEFT JOIN project_stats s ON s.project_id = p.project_id
+GROUP BY 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_specialization_totals
+  ON mv_specialization_totals (specialization);
+
+-- Выполнение задач по факультетам исполнителей
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_faculty_completion AS
+WITH task_f AS (
+  SELECT st.faculty,
+         COUNT(t.task_id) AS tasks,
+         COUNT(t.task_id) FILTER (WHERE t.task_status = 'done') AS done_tasks,
+         COUNT(t.task_id) FILTER (WHERE t.task_status <> 'done'
+                                    AND t.task_deadline < now()) AS overdue_tasks
+  FROM tasks t
+  JOIN students st ON st.student_id = t.executor_student
+  WHERE t.archived_at IS NULL
+  GROUP BY st.faculty
+), report_f AS (
+  SELECT st.faculty,
+         COUNT(*) AS reports,
+         COUNT(*) FILTER (WHERE r.status = 'approved') AS approved_reports,
+         COUNT(*) FILTER (WHERE r.status = 'needs_fix') AS returned_reports
+  FROM reports r
+  JOIN students st ON st.student_id = r.student_id
+  WHERE r.archived_at IS NULL
+  GROUP BY st.faculty
+)
+SELECT st.faculty,
+       COUNT(*) AS students,
+       COALESCE(tf.tasks, 0) AS tasks,
+       COALESCE(tf.done_tasks, 0) AS done_tasks,
+       COALESCE(tf.overdue_tasks, 0) AS overdue_tasks,
+       CASE WHEN COALESCE(tf.tasks, 0) = 0 THEN 0
+            ELSE ROUND(100.0 * tf.done_tasks / tf.tasks, 2)
+       END AS ratio_pct,
+       COALESCE(rf.reports, 0) AS reports,
+       COALESCE(rf.approved_reports, 0) AS approved_reports,
+       COALESCE(rf.returned_reports, 0) AS returned_reports
+FROM students st
+LEFT JOIN task_f tf   ON tf.faculty = st.faculty
+LEFT JOIN report_f rf ON rf.faculty = st.faculty
+GROUP BY st.faculty, tf.tasks, tf.done_tasks, tf.overdue_tasks,
+         rf.reports, rf.approved_reports, rf.returned_reports;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_faculty_completion
+  ON mv_faculty_completion (faculty);
+
+CREATE TABLE IF NOT EXISTS analytics_refresh (
+  id            BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),  -- ровно одна строка
+  refreshed_at  TIMESTAMPTZ NOT NULL
+);
+
+-- представления только что построены заново
+INSERT INTO analytics_refresh (id, refreshed_at) VALUES (TRUE, now())
+ON CONFLICT (id) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at;
+
+-- Обновить все представления; вернёт время обновления.
+-- Только владельцу (воркер, manage.py): REFRESH требует прав владельца.
+CREATE OR REPLACE FUNCTION fn_analytics_refresh()
+RETURNS TIMESTAMPTZ
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  REFRESH MATERIALIZED VIEW CONCURRENTLY mv_project_ranking;
+  REFRESH MATERIALIZED VIEW CONCURRENTLY mv_specialization_totals;
+  REFRESH MATERIALIZED VIEW CONCURRENTLY mv_faculty_completion;
+  UPDATE analytics_refresh SET refreshed_at = now();
+  RETURN now();
+END $$;
+
+REVOKE EXECUTE ON FUNCTION fn_analytics_refresh() FROM PUBLIC;
+
+GRANT SELECT ON mv_project_ranking, mv_specialization_totals, mv_faculty_completion, analytics_refresh
+  TO role_student, role_professor, role_admin;
@@ -0,0 +1,114 @@
+// Возобновляемая сдача отчёта: форма с data-upload-url отправляет файл кусками
+// (протокол — apps/reports/views.py, «возобновляемая загрузка»). Без JS форма
+// уходит обычным multipart на reports:submit.
+(function () {
+  "use strict";
+
+  const CHUNK = 1024 * 1024;
+  const RETRIES = 5;
+
+  function sleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms));
+  }
+
+  function b64(text) {
+    return btoa(String.fromCharCode(...new TextEncoder().encode(text)));
+  }
+
+  async function fail(response) {
+    throw new Error((await response.text()) || response.statusText);
+  }
+
+  async function createSession(form, file, headers) {
+    const response = await fetch(form.dataset.uploadUrl, {
+      method: "POST",
+      headers: {
+        ...headers,
+        "Upload-Length": String(file.size),
+        "Upload-Metadata": "filename " + b64(file.name),
+      },
+    });
+    if (response.status !== 201) await fail(response);
+    return response.headers.get("Location");
+  }
+
+  async function serverOffset(url, headers) {
+    const response = await fetch(url, { method: "HEAD", headers });
+    return response.ok ? Number(response.headers.get("Upload-Offset")) : null;
+  }
+
+  async function upload(form, file, onProgress) {
+    const headers = {
+      "Tus-Resumable": "1.0.0",
+      "X-CSRFToken": form.querySelector("[name=csrfmiddlewaretoken]").value,
+    };
+    // одна и та же загрузка переживает перезагрузку страницы
+    const key = ["upload", form.dataset.uploadUrl, file.name, file.size, file.lastModified].join(":");
+    let url = localStorage.getItem(key);
+    let offset = url ? await serverOffset(url, headers) : null;
+    if (offset === null) {
+      url = await createSession(form, file, headers);
+      localStorage.setItem(key, url);
+      offset = 0;
+    }
+
+    let attempt = 0;
+    for (;;) {
+      let response;
+      try {
+        response = await fetch(url, {
+          method: "PATCH",
+          headers: {
+            ...headers,
+            "Content-Type": "application/offset+octet-stream",
+            "Upload-Offset": String(offset),
+          },
+          body: file.slice(offset, offset + CHUNK),
+        });
+      } catch (err) {
+        // сеть пропала: ждём и сверяемся с сервером, сколько байт дошло
+        if (++attempt > RETRIES) throw err;
+        await sleep(1000 * 2 ** attempt);
+        const known = await serverOffset(url, headers).catch(() => null);
+        if (known !== null) offset = known;
+        continue;
+      }
+      if (response.status === 409 && response.headers.has("Upload-Offset")) {
+        offset = Number(response.headers.get("Upload-Offset"));
+        continue;
+      }
+      if (response.status !== 204) {
+        if (response.status === 404 || response.status === 410) localStorage.removeItem(key);
+        await fail(response);
+      }
+      attempt = 0;
+      offset = Number(response.headers.get("Upload-Offset"));
+      onProgress(offset / file.size);
+      if (response.headers.has("Upload-Report-Id")) break;
+    }
+    localStorage.removeItem(key);
+  }
+
+  document.addEventListener("submit", async (event) => {
+    const form = event.target;
+    if (!form.dataset || !form.dataset.uploadUrl) return;
+    const file = form.querySelector("input[type=file]").files[0];
+    const url = form.querySelector("input[name=external_url]");
+    if (!file || (url && url.value.trim())) return; // ссылка и ошибки ввода — обычной формой
+
+    event.preventDefault();
+    const button = form.querySelector("button[type=submit]");
+    const label = button.textContent;
+    button.disabled = true;
+    try {
+      await upload(form, file, (part) => {
+        button.textContent = Math.floor(part * 100) + "%";
+      });
+      window.location.reload();
+    } catch (err) {
+      alert("Не удалось загрузить файл: " + err.message);
+      button.disabled = false;
+      button.textContent = label;
+    }
+  });
+})();
@@ -0,0 +1,57 @@
+// Спарклайны активности проектов: элементы с data-sparkline="<project_id>"
+// внутри контейнера с data-sparkline-url получают ряды одним запросом
+// (apps/analytics/views.py, activity_series) и рисуются inline-SVG.
+// Линия — сданные отчёты, столбики под ней — проверки (принято + возвращено).
+(function () {
+  "use strict";
+
+  const W = 120;
+  const H = 28;
+  const SVG = "http://www.w3.org/2000/svg";
+
+  function node(name, attrs) {
+    const el = document.createElementNS(SVG, name);
+    for (const [k, v] of Object.entries(attrs)) el.setAttribute(k, v);
+    return el;
+  }
+
+  function draw(el, s) {
+    const reviews = s.approvals.map((n, i) => n + s.needs_fix[i]);
+    const top = Math.max(1, ...s.submissions, ...reviews);
+    const step = W / Math.max(s.submissions.length - 1, 1);
+    const y = (n) => (H - 1 - ((H - 2) * n) / top).toFixed(1);
+
+    const svg = node("svg", { viewBox: `0 0 ${W} ${H}`, width: W, height: H, class: "sparkline" });
+    reviews.forEach((n, i) => {
+      if (n) {
+        svg.appendChild(node("rect", { x: (i * step - 1).toFixed(1), y: y(n), width: 2, height: (H - 1 - y(n)).toFixed(1), class: "sparkline__bar" }));
+      }
+    });
+    svg.appendChild(node("polyline", {
+      points: s.submissions.map((n, i) => `${(i * step).toFixed(1)},${y(n)}`).join(" "),
+      class: "sparkline__line",
+    }));
+
+    const total = (a) => a.reduce((x, n) => x + n, 0);
+    el.title = `Сдано: ${total(s.submissions)}, принято: ${total(s.approvals)}, возвращено: ${total(s.needs_fix)}, новых задач: ${total(s.tasks_created)}`;
+    el.replaceChildren(svg);
+  }
+
+  async function load(box) {
+    const els = [...box.querySelectorAll("[data-sparkline]")];
+    if (!els.length) return;
+    const url = new URL(box.dataset.sparklineUrl, location.href);
+    url.searchParams.set("ids", [...new Set(els.map((el) => el.dataset.sparkline))].join(","));
+    const response = await fetch(url, { credentials: "same-origin" });
+    if (!response.ok) return;
+    const data = await response.json();
+    for (const el of els) {
+      const s = data.projects[el.dataset.sparkline];
+      if (s) draw(el, s);
+    }
+  }
+
+  document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll("[data-sparkline-url]").forEach((box) => load(box).catch(() => {}));
+  });
+})();